@@ -10,6 +10,7 @@ import atexit
 import datetime
 import logging
 import os
+import sys
 
 # === 서드파티 패키지 임포트 === #
 
@@ -19,20 +20,41 @@ from flask.logging                     import default_handler
 
 # === 사용자 정의 모듈 임포트 === #
 
+from cache.person       import isEnabled as isPersonEngineEnabled, refreshPerson
+from cache.statistic    import REFRESH_INTERVAL as STATISTIC_REFRESH_INTERVAL, loadStatistic, refreshStatistic
+from constant.concept   import refreshConcept
 from constant.condition import refreshCondition
 from constant.drug      import refreshDrug
 from constant.ethnicity import refreshEthnicity
 from constant.gender    import refreshGender
 from constant.race      import refreshRace
+from constant.shared    import isEnabled as isSharedLookupEnabled, loadSharedLookup, synchronizeLookup
 from constant.visitType import refreshVisitType
+from database.database  import pool
+from router             import admin            as admin
+from router             import health           as health
+from router             import metric           as metric
+from router.search      import batch            as search_batch
 from router.search      import concept          as search_concept
 from router.search      import condition        as search_condition
 from router.search      import death            as search_death
 from router.search      import drug             as search_drug
 from router.search      import person           as search_person
 from router.search      import visit            as search_visit
+from router.statistic   import cube             as statistic_cube
 from router.statistic   import person           as statistic_person
 from router.statistic   import visit            as statistic_visit
+from utility.metric     import timeJob
+from utility.warmup     import getReadiness, warmUp
+
+import cache.person
+import cache.response
+import cache.total
+import config.application
+import database.query
+import database.slowQuery
+import utility.admission
+import utility.metric
 
 # === 로거 설정 === #
 
@@ -48,37 +70,92 @@ app.config.update(
     SECRET_KEY=os.getenv('CDM_LOOKUP_SECRET_KEY')
 )
 
+app.register_blueprint(admin.blueprint)
+app.register_blueprint(health.blueprint)
+app.register_blueprint(metric.blueprint)
+app.register_blueprint(search_batch.blueprint)
 app.register_blueprint(search_concept.blueprint)
 app.register_blueprint(search_condition.blueprint)
 app.register_blueprint(search_death.blueprint)
 app.register_blueprint(search_drug.blueprint)
 app.register_blueprint(search_person.blueprint)
 app.register_blueprint(search_visit.blueprint)
+app.register_blueprint(statistic_cube.blueprint)
 app.register_blueprint(statistic_person.blueprint)
 app.register_blueprint(statistic_visit.blueprint)
 
 # === 스케줄러 등록 === #
 
-refreshCondition()
-refreshDrug()
-refreshEthnicity()
-refreshGender()
-refreshRace()
-refreshVisitType()
+LOOKUP_REFRESHER = [refreshCondition, refreshDrug, refreshEthnicity, refreshGender, refreshRace, refreshVisitType]
 
 scheduler = BackgroundScheduler()
-scheduler.add_job(refreshCondition, trigger='interval', hours=1)
-scheduler.add_job(refreshDrug, trigger='interval', hours=1)
-scheduler.add_job(refreshEthnicity, trigger='interval', hours=1)
-scheduler.add_job(refreshGender, trigger='interval', hours=1)
-scheduler.add_job(refreshRace, trigger='interval', hours=1)
-scheduler.add_job(refreshVisitType, trigger='interval', hours=1)
+scheduler.add_job(timeJob('refreshConcept', refreshConcept), trigger='interval', hours=1)
+
+if isSharedLookupEnabled():
+    # 조회 테이블은 하나의 프로세스만 갱신하고, 나머지 프로세스는 공유 메모리에 기록된 테이블을 매핑합니다.
+    WARMUP_TASK = {
+        'concept': refreshConcept,
+        'lookup': lambda: synchronizeLookup(LOOKUP_REFRESHER, blocking=True)
+    }
+
+    scheduler.add_job(timeJob('synchronizeLookup', synchronizeLookup), args=[LOOKUP_REFRESHER], trigger='interval', seconds=config.application.config['shared_refresh_interval'])
+    scheduler.add_job(timeJob('loadSharedLookup', loadSharedLookup), trigger='interval', seconds=config.application.config['shared_poll_interval'])
+else:
+    WARMUP_TASK = {
+        'concept': refreshConcept,
+        **{ refresher.__name__: refresher for refresher in LOOKUP_REFRESHER }
+    }
+
+    for refresher in LOOKUP_REFRESHER:
+        scheduler.add_job(timeJob(refresher.__name__, refresher), trigger='interval', hours=1)
+
+# 지연 시작 모드에서는 데이터베이스 조회 없이 애플리케이션을 먼저 시작하고, 준비 작업은 백그라운드에서 실행합니다.
+# 준비가 끝나기 전까지 /health/ready는 503을 반환합니다.
+if config.application.config['lazy_startup']:
+    warmUp(WARMUP_TASK, background=True)
+elif not warmUp(WARMUP_TASK):
+    sys.exit('failed to warm up lookup tables')
+
+scheduler.add_job(timeJob('refreshStatistic', refreshStatistic), trigger='interval', seconds=STATISTIC_REFRESH_INTERVAL, next_run_time=datetime.datetime.now())
+
+# 통계도 하나의 프로세스만 집계하므로, 나머지 프로세스는 집계가 끝나 기록된 스냅샷을 주기적으로 확인하여 읽습니다.
+if isSharedLookupEnabled():
+    scheduler.add_job(timeJob('loadStatistic', loadStatistic), trigger='interval', seconds=config.application.config['shared_poll_interval'])
+
+# person 테이블은 추가된 행만 자주 읽고, 기존 행의 수정을 반영하기 위해 1시간마다 전체를 다시 읽습니다.
+# 적재가 끝나기 전까지 환자 통계와 검색은 통계 스냅샷과 데이터베이스를 사용합니다.
+if isPersonEngineEnabled():
+    scheduler.add_job(timeJob('refreshPerson', refreshPerson), trigger='interval', seconds=config.application.config['person_refresh_interval'], next_run_time=datetime.datetime.now())
+    scheduler.add_job(timeJob('refreshPersonFull', refreshPerson), kwargs={ 'full': True }, trigger='interval', hours=1)
+
 scheduler.start()
 
 atexit.register(lambda: scheduler.shutdown())
+atexit.register(lambda: pool.close())
+
+# === 지표 수집 함수 등록 === #
+
+utility.metric.register('pool', pool.statistic, counters=['created', 'discarded', 'checkouts', 'waits', 'timeouts', 'health_checks'])
+utility.metric.register('response_cache', cache.response.statistic, counters=['hits', 'misses', 'not_modified', 'evictions'])
+utility.metric.register('search_total', cache.total.statistic, counters=['hits', 'misses', 'exact', 'estimates'])
+utility.metric.register('prepared_statement', database.query.statistic, counters=['hits', 'misses', 'bypasses'])
+utility.metric.register('person_table', cache.person.statistic)
+utility.metric.register('slow_query', database.slowQuery.statistic, counters=['recorded', 'explained', 'explain_dropped', 'explain_failed'])
+utility.metric.register('admission', utility.admission.statistic, counters=[
+    f'{name}_{key}' for name in utility.admission.COST_CLASS for key in ['admitted', 'queued', 'rejected', 'timeouts']
+])
+utility.metric.register('warmup', lambda: { 'ready': getReadiness()['ready'] })
 
 # === Flask 핸들러 정의 === #
 
+@app.before_request
+def beforeRequest() -> None:
+    '''
+    Flask 요청이 처리되기 전에 실행되는 핸들러입니다.
+    '''
+
+    utility.metric.begin()
+
 @app.after_request
 def afterRequest(response: Any) -> Any:
     '''
@@ -100,6 +177,14 @@ def afterRequest(response: Any) -> Any:
 
     app.logger.info(log)
 
+    # --- 요청에 대한 지표 기록 --- #
+
+    # 경로 변수의 값마다 다른 지표가 생기지 않도록 경로 대신 경로 규칙을 사용합니다.
+    route = request.url_rule.rule if request.url_rule != None else 'unmatched'
+    size  = None if response.is_streamed else response.calculate_content_length()
+
+    utility.metric.finish(route, request.method, response.status_code, size)
+
     return response
 
 # === 메인 정의 === #
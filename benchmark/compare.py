@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+import argparse
+import json
+import sys
+
+# === 상수 정의 === #
+
+# 비교할 측정 값과 값이 클수록 좋은지 여부
+METRIC = {
+    'p50_ms': False,
+    'p95_ms': False,
+    'p99_ms': False,
+    'rps': True,
+    'rows_per_second': True,
+    'peak_rss_mb': False
+}
+
+# === 함수 정의 === #
+
+def load(path: str) -> dict:
+    '''
+    benchmark/endpoint.py의 결과 파일을 읽어 (메서드, 경로)별 결과를 반환합니다.
+    '''
+
+    with open(path) as file:
+        report = json.load(file)
+
+    return { (result['method'], result['path']): result for result in report['results'] }
+
+def getChange(before: float, after: float) -> float:
+    '''
+    이전 값 대비 변화율 (%)을 반환합니다 (비교할 수 없을 경우 None).
+    '''
+
+    if before == None or after == None or before == 0:
+        return None
+
+    return (after - before) / before * 100
+
+# === 메인 정의 === #
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='두 벤치마크 결과를 비교하여 성능이 나빠진 라우터를 출력합니다.')
+    parser.add_argument('before', help='기준 결과 파일')
+    parser.add_argument('after', help='비교할 결과 파일')
+    parser.add_argument('--threshold', type=float, default=10, help='성능 저하로 판단할 변화율 (%%, 기본 값: 10)')
+    argument = parser.parse_args()
+
+    before      = load(argument.before)
+    after       = load(argument.after)
+    regressions = 0
+
+    print(f'{"route":<66} {"metric":<16} {"before":>10} {"after":>10} {"change":>9}')
+
+    for key in sorted(before.keys() & after.keys()):
+        for metric, higherIsBetter in METRIC.items():
+            change = getChange(before[key].get(metric), after[key].get(metric))
+
+            if change == None:
+                continue
+
+            regressed = (change < -argument.threshold) if higherIsBetter else (change > argument.threshold)
+            regressions += regressed
+
+            print(
+                f'{key[0] + " " + key[1]:<66} {metric:<16} {before[key][metric]:>10} {after[key][metric]:>10} {change:>+8.1f}%'
+                + ('  REGRESSION' if regressed else '')
+            )
+
+    for key in sorted(before.keys() - after.keys()):
+        print(f'{key[0] + " " + key[1]:<66} missing in {argument.after}')
+
+    for key in sorted(after.keys() - before.keys()):
+        print(f'{key[0] + " " + key[1]:<66} new in {argument.after}')
+
+    # 성능 저하가 있을 경우 CI에서 실패로 처리할 수 있도록 종료 코드 1을 반환합니다.
+    sys.exit(1 if regressions else 0)
+
+if __name__ == '__main__':
+    main()
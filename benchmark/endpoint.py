@@ -0,0 +1,505 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime           import datetime
+from typing             import Callable, Iterator, List, Tuple
+
+import argparse
+import glob
+import http.client
+import importlib
+import json
+import math
+import os
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# === 상수 정의 === #
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # 저장소 경로
+
+READY_TIMEOUT   = 600 # uWSGI 인스턴스가 준비될 때까지 기다리는 최대 시간 (초)
+STOP_TIMEOUT    = 30  # uWSGI 인스턴스가 종료될 때까지 기다리는 최대 시간 (초)
+SAMPLE_INTERVAL = 0.2 # 메모리 사용량 측정 주기 (초)
+TREE_INTERVAL   = 2   # 측정할 프로세스 (자식 프로세스) 목록을 다시 확인하는 주기 (초)
+
+# 경로 변수별 기본 값 (--param으로 변경 가능)
+PARAMETER = {
+    'gender': 'FEMALE',
+    'race': 'White',
+    'ethnicity': 'west_indian',
+    'visitType': 'Inpatient Visit',
+    'age': '30',
+    'personID': '1'
+}
+
+# 라우터별 기본 쿼리 문자열
+QUERY = {
+    'search_concept.index': 'keyword=heart',
+    'search_condition.index': 'page_size=100',
+    'search_death.index': 'page_size=100',
+    'search_drug.index': 'page_size=100',
+    'search_person.index': 'page_size=100',
+    'search_visit.index': 'page_size=100',
+    'search_person.timeline': 'page_size=100',
+    'statistic_cube.index': 'measure=visit&dimensions=gender,age'
+}
+
+# POST 라우터별 기본 요청 본문
+BODY = {
+    'search_batch.index': { 'person_ids': list(range(1, 101)) }
+}
+
+# === 클래스 정의 === #
+
+class MemorySampler(threading.Thread):
+    '''
+    프로세스 (및 자식 프로세스)의 메모리 사용량 (RSS)을 주기적으로 측정하여 최대 값을 기록하는 스레드입니다.
+
+    측정 스레드가 벤치마크 요청과 같은 프로세스에서 실행되므로, 자식 프로세스 목록은 TREE_INTERVAL마다 확인하고
+    SAMPLE_INTERVAL마다 목록에 있는 프로세스의 RSS만 읽습니다.
+    /proc을 사용하므로 Linux에서만 측정되며, 그 외의 환경에서는 peak가 None으로 유지됩니다.
+
+    Args:
+        pid (int): 측정할 프로세스 ID
+    '''
+
+    def __init__(self, pid: int) -> None:
+        super().__init__(daemon=True)
+
+        self.pid     = pid
+        self.peak    = None
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        tree    = None
+        checked = 0
+
+        while not self.stopped.is_set():
+            if tree == None or time.monotonic() - checked >= TREE_INTERVAL:
+                tree    = getTree(self.pid)
+                checked = time.monotonic()
+
+            rss = getRSS(tree)
+
+            if rss != None and (self.peak == None or rss > self.peak):
+                self.peak = rss
+
+            self.stopped.wait(SAMPLE_INTERVAL)
+
+    def stop(self) -> int:
+        '''
+        측정을 멈추고 최대 메모리 사용량 (바이트)을 반환합니다.
+        '''
+
+        self.stopped.set()
+        self.join()
+
+        return self.peak
+
+# === 함수 정의 === #
+
+def getTree(pid: int) -> set:
+    '''
+    프로세스와 모든 자식 프로세스의 ID 집합을 반환합니다 (측정할 수 없을 경우 None).
+
+    /proc/<pid>/task/*/children을 지원하는 커널에서는 측정할 프로세스 트리의 항목만 읽으며,
+    지원하지 않을 경우 /proc 전체를 한 번 읽어 부모 프로세스 ID로 트리를 구성합니다.
+    '''
+
+    if not os.path.isdir('/proc'):
+        return None
+
+    tree = { pid }
+
+    if glob.glob(f'/proc/{pid}/task/*/children'):
+        pending = [pid]
+
+        while pending:
+            for path in glob.glob(f'/proc/{pending.pop()}/task/*/children'):
+                try:
+                    with open(path) as file:
+                        children = [int(child) for child in file.read().split()]
+                except (OSError, ValueError):
+                    continue
+
+                tree.update(children)
+                pending.extend(children)
+
+        return tree
+
+    parents = {}
+
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+
+        try:
+            with open(f'/proc/{entry}/stat') as file:
+                # 프로세스 이름에 공백이 있을 수 있으므로, 마지막 괄호 이후의 필드만 사용합니다.
+                parents[int(entry)] = int(file.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+
+    for child in sorted(parents):
+        if parents[child] in tree:
+            tree.add(child)
+
+    return tree
+
+def getRSS(tree: set) -> int:
+    '''
+    프로세스들의 RSS 합계를 반환합니다 (바이트, 측정할 수 없을 경우 None).
+    '''
+
+    if tree == None:
+        return None
+
+    pageSize = os.sysconf('SC_PAGE_SIZE')
+    total    = 0
+
+    for member in tree:
+        try:
+            with open(f'/proc/{member}/statm') as file:
+                total += int(file.read().split()[1]) * pageSize
+        except (OSError, IndexError, ValueError):
+            continue
+
+    return total
+
+def getRoutes(app: object) -> List[Tuple[str, str, str]]:
+    '''
+    애플리케이션에 등록된 라우터 목록을 (엔드포인트, 메서드, 경로 규칙) 형식으로 반환합니다.
+    '''
+
+    routes = []
+
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint == 'static':
+            continue
+
+        method = 'GET' if 'GET' in rule.methods else 'POST'
+
+        routes.append((rule.endpoint, method, rule.rule))
+
+    return sorted(routes, key=lambda route: route[2])
+
+def getBlueprintApplication() -> object:
+    '''
+    router 패키지의 모든 블루프린트를 등록한 애플리케이션을 반환합니다.
+
+    uWSGI 인스턴스를 측정할 때 application을 임포트하면 벤치마크 프로세스에서도 준비 작업과 스케줄러가 실행되므로, 라우터 목록만 얻기 위해 사용합니다.
+    '''
+
+    from flask import Flask
+
+    app = Flask(__name__)
+
+    # router 패키지는 __init__.py가 없는 네임스페이스 패키지이므로, 파일 목록으로 모듈을 찾습니다.
+    for directory, _, files in sorted(os.walk(os.path.join(ROOT, 'router'))):
+        for file in sorted(files):
+            if not file.endswith('.py'):
+                continue
+
+            name   = os.path.relpath(os.path.join(directory, file[:-3]), ROOT).replace(os.sep, '.')
+            module = importlib.import_module(name)
+
+            if hasattr(module, 'blueprint'):
+                app.register_blueprint(module.blueprint)
+
+    return app
+
+def makePath(endpoint: str, rule: str, parameter: dict) -> str:
+    '''
+    경로 규칙의 변수를 채워 요청 경로를 생성합니다.
+
+    Raises:
+        KeyError: 값이 없는 경로 변수가 있는 경우
+    '''
+
+    path  = re.sub(r'<(?:[^:<>]+:)?([^<>]+)>', lambda match: urllib.parse.quote(parameter[match.group(1)]), rule)
+    query = QUERY.get(endpoint)
+
+    return path if query == None else f'{path}?{query}'
+
+def countRows(body: bytes) -> int:
+    '''
+    응답 메시지의 data 아래에 있는 목록의 행 개수 합계를 반환합니다.
+    '''
+
+    try:
+        data = json.loads(body).get('data')
+    except (ValueError, AttributeError):
+        return 0
+
+    if isinstance(data, list):
+        return len(data)
+
+    if isinstance(data, dict):
+        return sum(len(value) for value in data.values() if isinstance(value, list))
+
+    return 0
+
+def makeTestClientRequester(app: object) -> Callable[[str, str, dict], Tuple[int, bytes]]:
+    '''
+    Flask 테스트 클라이언트로 요청을 보내는 함수를 반환합니다. 스레드마다 별도의 클라이언트를 사용합니다.
+    '''
+
+    local = threading.local()
+
+    def request(method: str, path: str, body: dict) -> Tuple[int, bytes]:
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+
+        response = local.client.open(path, method=method, json=body)
+
+        return response.status_code, response.get_data()
+
+    return request
+
+def makeHTTPRequester(url: str) -> Callable[[str, str, dict], Tuple[int, bytes]]:
+    '''
+    HTTP로 요청을 보내는 함수를 반환합니다. 스레드마다 연결을 유지하여 재사용합니다.
+    '''
+
+    target = urllib.parse.urlsplit(url)
+    local  = threading.local()
+
+    def request(method: str, path: str, body: dict) -> Tuple[int, bytes]:
+        headers = {}
+        payload = None
+
+        if body != None:
+            headers['Content-Type'] = 'application/json'
+            payload                 = json.dumps(body)
+
+        for attempt in range(2):
+            if not hasattr(local, 'connection'):
+                local.connection = http.client.HTTPConnection(target.hostname, target.port or 80)
+
+            try:
+                local.connection.request(method, path, body=payload, headers=headers)
+                response = local.connection.getresponse()
+
+                return response.status, response.read()
+            except (http.client.HTTPException, OSError):
+                # 서버가 유지된 연결을 닫은 경우, 한 번만 새 연결로 다시 요청합니다.
+                local.connection.close()
+                del local.connection
+
+                if attempt == 1:
+                    raise
+
+    return request
+
+def percentile(timings: List[float], rank: float) -> float:
+    '''
+    정렬된 측정 값에서 백분위 수를 반환합니다 (nearest-rank).
+    '''
+
+    if not timings:
+        return None
+
+    return timings[max(0, math.ceil(rank / 100 * len(timings)) - 1)]
+
+def measure(request: Callable, method: str, path: str, body: dict, count: int, concurrency: int, pid: int) -> dict:
+    '''
+    한 라우터에 count개의 요청을 concurrency개씩 동시에 보내고 지연 시간, 처리량과 최대 메모리 사용량을 측정합니다.
+    '''
+
+    timings = []
+    rows    = [0]
+    errors  = [0]
+    lock    = threading.Lock()
+    counter = iter(range(count))
+
+    def worker() -> None:
+        for index in counter:
+            start          = time.perf_counter()
+            status, answer = request(method, path, body)
+            elapsed        = time.perf_counter() - start
+
+            with lock:
+                timings.append(elapsed * 1000)
+                rows[0] += countRows(answer)
+
+                if status >= 400:
+                    errors[0] += 1
+
+    sampler = MemorySampler(pid) if pid != None else None
+
+    if sampler != None:
+        sampler.start()
+
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(worker) for _ in range(concurrency)]:
+            future.result()
+
+    elapsed = time.perf_counter() - start
+    peak    = sampler.stop() if sampler != None else None
+
+    timings.sort()
+
+    return {
+        'requests': count,
+        'errors': errors[0],
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'mean_ms': round(sum(timings) / len(timings), 3),
+        'rps': round(count / elapsed, 1),
+        'rows_per_second': round(rows[0] / elapsed, 1),
+        'peak_rss_mb': None if peak == None else round(peak / 1024 / 1024, 1)
+    }
+
+def waitReady(url: str, process: subprocess.Popen) -> None:
+    '''
+    uWSGI 인스턴스의 /health/ready가 200을 반환할 때까지 기다립니다.
+
+    Raises:
+        RuntimeError: 인스턴스가 종료되었거나 READY_TIMEOUT 안에 준비되지 않은 경우
+    '''
+
+    request  = makeHTTPRequester(url)
+    deadline = time.monotonic() + READY_TIMEOUT
+
+    while time.monotonic() < deadline:
+        if process.poll() != None:
+            raise RuntimeError(f'uWSGI exited with code {process.returncode}')
+
+        try:
+            if request('GET', '/health/ready', None)[0] == 200:
+                return
+        except OSError:
+            pass
+
+        time.sleep(1)
+
+    raise RuntimeError('uWSGI did not become ready')
+
+def run(request: Callable, routes: Iterator[Tuple[str, str, str]], argument: argparse.Namespace, pid: int) -> List[dict]:
+    '''
+    모든 라우터를 차례로 측정합니다.
+    '''
+
+    parameter = { **PARAMETER, **dict(item.split('=', 1) for item in argument.param) }
+    results   = []
+
+    for endpoint, method, rule in routes:
+        if argument.filter != None and re.search(argument.filter, rule) == None:
+            continue
+
+        try:
+            path = makePath(endpoint, rule, parameter)
+        except KeyError as error:
+            print(f'skip {rule}: no value for {error}', file=sys.stderr)
+            continue
+
+        body = BODY.get(endpoint) if method == 'POST' else None
+
+        # 응답 캐시를 우회할 경우, 요청마다 다른 쿼리 문자열을 붙입니다.
+        if argument.bust_cache:
+            separator = '&' if '?' in path else '?'
+            sequence  = iter(range(sys.maxsize))
+            target    = lambda method, path, body: request(method, f'{path}{separator}_={next(sequence)}', body)
+        else:
+            target = request
+
+        for _ in range(argument.warmup):
+            target(method, path, body)
+
+        result = {
+            'endpoint': endpoint,
+            'method': method,
+            'path': path,
+            **measure(target, method, path, body, argument.requests, argument.concurrency, pid)
+        }
+
+        results.append(result)
+
+        if not argument.quiet:
+            print(
+                f'{method:<5} {path:<60} p50 {result["p50_ms"]:>9} ms  p95 {result["p95_ms"]:>9} ms  p99 {result["p99_ms"]:>9} ms  '
+                f'{result["rps"]:>9} rps  {result["rows_per_second"]:>11} rows/s  errors {result["errors"]}',
+                file=sys.stderr
+            )
+
+    return results
+
+# === 메인 정의 === #
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='등록된 모든 라우터의 지연 시간 백분위 수, 처리량과 최대 메모리 사용량을 측정합니다.')
+    parser.add_argument('--target', choices=['client', 'uwsgi', 'url'], default='client', help='측정 대상 (Flask 테스트 클라이언트 | uWSGI 인스턴스 실행 | 실행 중인 서버, 기본 값: client)')
+    parser.add_argument('--url', default='http://127.0.0.1:5050', help='uwsgi, url 대상의 주소 (기본 값: http://127.0.0.1:5050)')
+    parser.add_argument('--ini', default=os.path.join(ROOT, 'uWSGI.ini'), help='uwsgi 대상의 설정 파일 (기본 값: uWSGI.ini)')
+    parser.add_argument('--requests', type=int, default=200, help='라우터 당 요청 개수 (기본 값: 200)')
+    parser.add_argument('--concurrency', type=int, default=4, help='동시 요청 개수 (기본 값: 4)')
+    parser.add_argument('--warmup', type=int, default=5, help='측정 전 요청 개수 (기본 값: 5)')
+    parser.add_argument('--filter', default=None, help='측정할 경로 규칙의 정규 표현식')
+    parser.add_argument('--param', action='append', default=[], help='경로 변수 값 (name=value, 여러 번 지정 가능)')
+    parser.add_argument('--bust-cache', action='store_true', help='요청마다 다른 쿼리 문자열을 붙여 응답 캐시를 우회')
+    parser.add_argument('--output', default=None, help='결과를 저장할 JSON 파일')
+    parser.add_argument('--quiet', action='store_true', help='라우터별 진행 상황을 출력하지 않음')
+    argument = parser.parse_args()
+
+    meta = {
+        'target': argument.target,
+        'url': None if argument.target == 'client' else argument.url,
+        'requests': argument.requests,
+        'concurrency': argument.concurrency,
+        'bust_cache': argument.bust_cache,
+        'started_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+    if argument.target == 'client':
+        from application import app
+
+        results = run(makeTestClientRequester(app), getRoutes(app), argument, os.getpid())
+    elif argument.target == 'uwsgi':
+        # uWSGI 2.0은 die-on-term 없이 SIGTERM을 받으면 종료하지 않고 다시 시작하므로, SIGTERM으로 종료되도록 옵션을 추가합니다.
+        # 종료되지 않을 경우 워커까지 함께 강제 종료할 수 있도록, 별도의 프로세스 그룹으로 실행합니다.
+        process = subprocess.Popen(['uwsgi', '--ini', argument.ini, '--die-on-term'], cwd=ROOT, start_new_session=True)
+
+        try:
+            waitReady(argument.url, process)
+
+            results = run(makeHTTPRequester(argument.url), getRoutes(getBlueprintApplication()), argument, process.pid)
+        finally:
+            process.terminate()
+
+            try:
+                process.wait(STOP_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                os.killpg(process.pid, signal.SIGKILL)
+                process.wait()
+    else:
+        # 원격 서버의 메모리 사용량은 측정할 수 없습니다.
+        results = run(makeHTTPRequester(argument.url), getRoutes(getBlueprintApplication()), argument, None)
+
+    report = {
+        'meta': meta,
+        'results': results
+    }
+
+    if argument.output != None:
+        with open(argument.output, 'w') as file:
+            json.dump(report, file, indent=4)
+    else:
+        print(json.dumps(report, indent=4))
+
+if __name__ == '__main__':
+    main()
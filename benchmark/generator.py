@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from datetime  import date
+from itertools import accumulate
+from typing    import Dict, List
+
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# === 서드파티 패키지 임포트 === #
+
+import psycopg2
+
+# === 사용자 정의 모듈 임포트 === #
+
+import config.database
+
+# === 상수 정의 === #
+
+FLUSH_SIZE = 100000 # COPY로 한 번에 적재하는 행 개수 (테이블 전체 합계)
+
+CONDITION_CONCEPT_ID = 40000000 # 진단병명 concept_id의 시작 값
+DRUG_CONCEPT_ID      = 41000000 # 처방 의약품 concept_id의 시작 값
+OTHER_CONCEPT_ID     = 42000000 # 그 외 concept_id의 시작 값
+
+# (concept_id, concept_name, 가중치)
+GENDER = [(8507, 'MALE', 49), (8532, 'FEMALE', 51)]
+RACE   = [
+    (8527, 'White', 60), (8516, 'Black or African American', 13), (8515, 'Asian', 6),
+    (8657, 'American Indian or Alaska Native', 1), (8557, 'Native Hawaiian or Other Pacific Islander', 1), (0, 'No matching concept', 19)
+]
+VISIT_TYPE = [(9202, 'Outpatient Visit', 70), (9203, 'Emergency Room Visit', 20), (9201, 'Inpatient Visit', 10)]
+
+# (ethnicity_source_value, 가중치)
+ETHNICITY = [('nonhispanic', 70), ('hispanic', 15), ('west_indian', 5), ('irish', 4), ('italian', 3), ('chinese', 2), ('korean', 1)]
+
+# 진단병명과 처방 의약품 이름을 구성하는 단어 (키워드 검색이 실제와 비슷한 비율로 일치하도록 조합)
+CONDITION_WORD = [
+    ['Acute', 'Chronic', 'Benign', 'Malignant', 'Congenital', 'Recurrent', 'Primary', 'Secondary'],
+    ['heart', 'lung', 'kidney', 'liver', 'skin', 'bone', 'brain', 'stomach', 'colon', 'eye', 'ear', 'joint'],
+    ['disease', 'disorder', 'infection', 'inflammation', 'neoplasm', 'injury', 'failure', 'syndrome']
+]
+DRUG_WORD = [
+    ['acetaminophen', 'amoxicillin', 'aspirin', 'atorvastatin', 'ibuprofen', 'insulin', 'lisinopril', 'metformin', 'omeprazole', 'prednisone'],
+    ['5', '10', '20', '50', '100', '250', '500'],
+    ['Oral Tablet', 'Oral Capsule', 'Injectable Solution', 'Topical Cream', 'Oral Suspension']
+]
+
+# 생성하는 테이블의 열 목록
+TABLE = {
+    'concept': [
+        'concept_id', 'concept_name', 'domain_id', 'vocabulary_id', 'concept_class_id', 'standard_concept',
+        'concept_code', 'valid_start_date', 'valid_end_date', 'invalid_reason'
+    ],
+    'person': [
+        'person_id', 'gender_concept_id', 'year_of_birth', 'month_of_birth', 'day_of_birth', 'birth_datetime',
+        'race_concept_id', 'ethnicity_concept_id', 'ethnicity_source_value'
+    ],
+    'visit_occurrence': [
+        'visit_occurrence_id', 'person_id', 'visit_concept_id', 'visit_start_date', 'visit_start_datetime',
+        'visit_end_date', 'visit_end_datetime', 'visit_type_concept_id'
+    ],
+    'condition_occurrence': [
+        'condition_occurrence_id', 'person_id', 'condition_concept_id', 'condition_start_date', 'condition_start_datetime',
+        'condition_end_date', 'condition_end_datetime', 'condition_type_concept_id', 'visit_occurrence_id'
+    ],
+    'drug_exposure': [
+        'drug_exposure_id', 'person_id', 'drug_concept_id', 'drug_exposure_start_date', 'drug_exposure_start_datetime',
+        'drug_exposure_end_date', 'drug_exposure_end_datetime', 'drug_type_concept_id', 'visit_occurrence_id'
+    ],
+    'death': ['person_id', 'death_date', 'death_datetime', 'death_type_concept_id']
+}
+
+# 테이블 생성 쿼리 (OMOP CDM v5.3 중 라우터가 조회하는 열과 필수 열)
+DDL = {
+    'concept': '''
+        CREATE TABLE IF NOT EXISTS concept (
+            concept_id integer NOT NULL, concept_name varchar(255) NOT NULL, domain_id varchar(20) NOT NULL,
+            vocabulary_id varchar(20) NOT NULL, concept_class_id varchar(20) NOT NULL, standard_concept varchar(1),
+            concept_code varchar(50) NOT NULL, valid_start_date date NOT NULL, valid_end_date date NOT NULL, invalid_reason varchar(1)
+        )
+    ''',
+    'person': '''
+        CREATE TABLE IF NOT EXISTS person (
+            person_id bigint NOT NULL, gender_concept_id integer NOT NULL, year_of_birth integer NOT NULL,
+            month_of_birth integer, day_of_birth integer, birth_datetime timestamp,
+            race_concept_id integer NOT NULL, ethnicity_concept_id integer NOT NULL, ethnicity_source_value varchar(50)
+        )
+    ''',
+    'visit_occurrence': '''
+        CREATE TABLE IF NOT EXISTS visit_occurrence (
+            visit_occurrence_id bigint NOT NULL, person_id bigint NOT NULL, visit_concept_id integer NOT NULL,
+            visit_start_date date NOT NULL, visit_start_datetime timestamp, visit_end_date date NOT NULL,
+            visit_end_datetime timestamp, visit_type_concept_id integer NOT NULL
+        )
+    ''',
+    'condition_occurrence': '''
+        CREATE TABLE IF NOT EXISTS condition_occurrence (
+            condition_occurrence_id bigint NOT NULL, person_id bigint NOT NULL, condition_concept_id integer NOT NULL,
+            condition_start_date date NOT NULL, condition_start_datetime timestamp, condition_end_date date,
+            condition_end_datetime timestamp, condition_type_concept_id integer NOT NULL, visit_occurrence_id bigint
+        )
+    ''',
+    'drug_exposure': '''
+        CREATE TABLE IF NOT EXISTS drug_exposure (
+            drug_exposure_id bigint NOT NULL, person_id bigint NOT NULL, drug_concept_id integer NOT NULL,
+            drug_exposure_start_date date NOT NULL, drug_exposure_start_datetime timestamp, drug_exposure_end_date date NOT NULL,
+            drug_exposure_end_datetime timestamp, drug_type_concept_id integer NOT NULL, visit_occurrence_id bigint
+        )
+    ''',
+    'death': '''
+        CREATE TABLE IF NOT EXISTS death (
+            person_id bigint NOT NULL, death_date date NOT NULL, death_datetime timestamp, death_type_concept_id integer NOT NULL
+        )
+    '''
+}
+
+TYPE_CONCEPT_ID = 32817 # 기록 유형 concept_id (EHR)
+
+# === 클래스 정의 === #
+
+class Sampler:
+    '''
+    가중치에 따라 값을 뽑는 표본 추출기입니다. 누적 가중치를 미리 계산하여 random.choices에 전달합니다.
+
+    Args:
+        values (list): 값 목록
+        weights (List[float]): 값별 가중치
+    '''
+
+    def __init__(self, values: list, weights: List[float]) -> None:
+        self.values     = values
+        self.cumulative = list(accumulate(weights))
+
+    def sample(self, generator: random.Random, count: int = 1) -> list:
+        return generator.choices(self.values, cum_weights=self.cumulative, k=count)
+
+def makeZipfSampler(values: list, exponent: float, generator: random.Random) -> Sampler:
+    '''
+    k번째로 흔한 값의 빈도가 1 / k^exponent에 비례하는 표본 추출기를 반환합니다. 흔한 값이 concept_id 순서와 무관하도록 순위는 섞습니다.
+    '''
+
+    ranked = list(values)
+    generator.shuffle(ranked)
+
+    return Sampler(ranked, [1 / (rank ** exponent) for rank in range(1, len(ranked) + 1)])
+
+# === 함수 정의 === #
+
+def makeConcepts(argument: argparse.Namespace) -> List[tuple]:
+    '''
+    concept 테이블의 행을 생성합니다. 성별, 인종, 방문 유형은 표준 concept_id를 사용하며, 진단병명과 처방 의약품은 단어를 조합하여 이름을 만듭니다.
+    '''
+
+    concepts = []
+    valid    = ('1970-01-01', '2099-12-31')
+
+    for domain, vocabulary, table in [('Gender', 'Gender', GENDER), ('Race', 'Race', RACE), ('Visit', 'Visit', VISIT_TYPE)]:
+        for conceptID, name, _ in table:
+            concepts.append((conceptID, name, domain, vocabulary, domain, 'S', str(conceptID), *valid, None))
+
+    for index in range(argument.condition_concepts):
+        words = [group[(index // divisor) % len(group)] for group, divisor in zip(CONDITION_WORD, [96, 8, 1])]
+        name  = ' '.join(words) + ('' if index < 768 else f' type {index // 768}')
+
+        concepts.append((CONDITION_CONCEPT_ID + index, name, 'Condition', 'SNOMED', 'Clinical Finding', 'S', f'C{index}', *valid, None))
+
+    for index in range(argument.drug_concepts):
+        words = [group[(index // divisor) % len(group)] for group, divisor in zip(DRUG_WORD, [35, 5, 1])]
+        name  = f'{words[0]} {words[1]} MG {words[2]}' + ('' if index < 350 else f' [{index // 350}]')
+
+        concepts.append((DRUG_CONCEPT_ID + index, name, 'Drug', 'RxNorm', 'Clinical Drug', 'S', f'D{index}', *valid, None))
+
+    # 검색 API가 조회하는 concept 테이블의 크기를 실제와 비슷하게 맞추기 위한 나머지 concept (일부는 만료)
+    for index in range(max(0, argument.concepts - len(concepts))):
+        end = '2015-12-31' if index % 10 == 0 else valid[1]
+
+        concepts.append((OTHER_CONCEPT_ID + index, f'Observation {index}', 'Observation', 'LOINC', 'Clinical Observation', None, f'O{index}', valid[0], end, None))
+
+    return concepts
+
+def formatRow(row: tuple) -> str:
+    '''
+    한 행을 COPY의 텍스트 형식으로 변환합니다 (NULL은 \\N).
+    '''
+
+    return '\t'.join('\\N' if value == None else str(value) for value in row) + '\n'
+
+def copy(cursor: psycopg2.extensions.cursor, table: str, lines: List[str]) -> None:
+    '''
+    COPY FROM STDIN으로 여러 행을 한 번에 적재합니다.
+    '''
+
+    if lines:
+        cursor.copy_expert(f'COPY {table} ({", ".join(TABLE[table])}) FROM STDIN', io.StringIO(''.join(lines)))
+
+def generate(cursor: psycopg2.extensions.cursor, argument: argparse.Namespace) -> Dict[str, int]:
+    '''
+    환자 한 명씩 person, visit_occurrence, condition_occurrence, drug_exposure, death 행을 생성하여 FLUSH_SIZE 행마다 COPY로 적재합니다.
+
+    모든 난수는 하나의 시드에서 같은 순서로 뽑으므로, 시드와 옵션이 같으면 항상 같은 데이터가 생성됩니다.
+
+    Returns:
+        counts (Dict[str, int]): 테이블별 생성된 행 개수
+    '''
+
+    generator = random.Random(argument.seed)
+
+    concepts = makeConcepts(argument)
+    copy(cursor, 'concept', [formatRow(concept) for concept in concepts])
+
+    gender     = Sampler([conceptID for conceptID, _, _ in GENDER], [weight for _, _, weight in GENDER])
+    race       = Sampler([conceptID for conceptID, _, _ in RACE], [weight for _, _, weight in RACE])
+    visitType  = Sampler([conceptID for conceptID, _, _ in VISIT_TYPE], [weight for _, _, weight in VISIT_TYPE])
+    ethnicity  = Sampler([value for value, _ in ETHNICITY], [weight for _, weight in ETHNICITY])
+    condition  = makeZipfSampler(range(CONDITION_CONCEPT_ID, CONDITION_CONCEPT_ID + argument.condition_concepts), argument.zipf, generator)
+    drug       = makeZipfSampler(range(DRUG_CONCEPT_ID, DRUG_CONCEPT_ID + argument.drug_concepts), argument.zipf, generator)
+
+    start = date.fromisoformat(argument.start_date).toordinal()
+    end   = date.fromisoformat(argument.end_date).toordinal()
+    first = date(1925, 1, 1).toordinal()
+
+    days   = {}
+    counts = { table: 0 for table in TABLE }
+    buffer = { table: [] for table in TABLE if table != 'concept' }
+    size   = 0
+
+    counts['concept'] = len(concepts)
+
+    def day(ordinal: int) -> str:
+        # 날짜 문자열은 종류가 적으므로 변환 결과를 재사용합니다.
+        if ordinal not in days:
+            days[ordinal] = date.fromordinal(ordinal).isoformat()
+
+        return days[ordinal]
+
+    def clock(seconds: int) -> str:
+        return f'{seconds // 3600:02}:{seconds // 60 % 60:02}:{seconds % 60:02}'
+
+    visitID = conditionID = drugID = 0
+
+    for personID in range(1, argument.persons + 1):
+        birth = generator.randint(first, end - 1)
+        born  = date.fromordinal(birth)
+
+        buffer['person'].append(formatRow((
+            personID, gender.sample(generator)[0], born.year, born.month, born.day, f'{day(birth)} 00:00:00',
+            race.sample(generator)[0], 0, ethnicity.sample(generator)[0]
+        )))
+
+        # 방문 횟수는 평균이 --visits인 지수 분포를 따르므로, 소수의 환자가 많은 방문을 가집니다.
+        visits = int(generator.expovariate(1 / argument.visits))
+        lower  = max(birth, start)
+        last   = lower
+
+        for visitStart in sorted(generator.randint(lower, end) for _ in range(visits)):
+            visitID  += 1
+            concept   = visitType.sample(generator)[0]
+            visitEnd  = visitStart + (generator.randint(1, 14) if concept == 9201 else 0)
+            seconds   = generator.randrange(86400)
+            last      = max(last, visitEnd)
+
+            buffer['visit_occurrence'].append(formatRow((
+                visitID, personID, concept, day(visitStart), f'{day(visitStart)} {clock(seconds)}',
+                day(visitEnd), f'{day(visitEnd)} 23:59:59', TYPE_CONCEPT_ID
+            )))
+
+            for conceptID in condition.sample(generator, int(generator.expovariate(1 / argument.conditions))):
+                conditionID += 1
+                conditionEnd = visitStart + generator.randint(0, 30)
+
+                buffer['condition_occurrence'].append(formatRow((
+                    conditionID, personID, conceptID, day(visitStart), f'{day(visitStart)} {clock(seconds)}',
+                    day(conditionEnd), f'{day(conditionEnd)} 00:00:00', TYPE_CONCEPT_ID, visitID
+                )))
+
+            for conceptID in drug.sample(generator, int(generator.expovariate(1 / argument.drugs))):
+                drugID += 1
+                drugEnd = visitStart + generator.randint(1, 90)
+
+                buffer['drug_exposure'].append(formatRow((
+                    drugID, personID, conceptID, day(visitStart), f'{day(visitStart)} {clock(seconds)}',
+                    day(drugEnd), f'{day(drugEnd)} 00:00:00', TYPE_CONCEPT_ID, visitID
+                )))
+
+        if generator.random() < argument.death_rate:
+            death = generator.randint(last, end) if last < end else end
+
+            buffer['death'].append(formatRow((personID, day(death), f'{day(death)} 00:00:00', TYPE_CONCEPT_ID)))
+
+        size = sum(len(lines) for lines in buffer.values())
+
+        if size >= FLUSH_SIZE or personID == argument.persons:
+            for table, lines in buffer.items():
+                copy(cursor, table, lines)
+
+                counts[table] += len(lines)
+                lines.clear()
+
+            print(f'\r{personID} / {argument.persons} persons', end='', file=sys.stderr)
+
+    print(file=sys.stderr)
+
+    return counts
+
+# === 메인 정의 === #
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='부하 테스트를 위한 가상의 OMOP CDM 데이터를 생성하여 COPY로 적재합니다. 대상 테이블의 기존 데이터는 삭제되며, 데이터베이스 접속 정보는 애플리케이션과 같은 환경 변수를 사용합니다.')
+    parser.add_argument('--persons', type=int, default=10000, help='환자 수 (기본 값: 10000)')
+    parser.add_argument('--seed', type=int, default=0, help='난수 시드 (기본 값: 0)')
+    parser.add_argument('--visits', type=float, default=5, help='환자당 평균 방문 수 (기본 값: 5)')
+    parser.add_argument('--conditions', type=float, default=2, help='방문당 평균 진단 수 (기본 값: 2)')
+    parser.add_argument('--drugs', type=float, default=2, help='방문당 평균 처방 수 (기본 값: 2)')
+    parser.add_argument('--death-rate', type=float, default=0.05, help='사망 환자 비율 (기본 값: 0.05)')
+    parser.add_argument('--zipf', type=float, default=1.1, help='진단병명과 처방 의약품 빈도의 Zipf 지수 (기본 값: 1.1)')
+    parser.add_argument('--concepts', type=int, default=100000, help='concept 테이블의 전체 행 개수 (기본 값: 100000)')
+    parser.add_argument('--condition-concepts', type=int, default=10000, help='진단병명 concept 개수 (기본 값: 10000)')
+    parser.add_argument('--drug-concepts', type=int, default=10000, help='처방 의약품 concept 개수 (기본 값: 10000)')
+    parser.add_argument('--start-date', default='2000-01-01', help='방문 기간의 시작 날짜 (기본 값: 2000-01-01)')
+    parser.add_argument('--end-date', default='2024-12-31', help='방문 기간의 종료 날짜 (기본 값: 2024-12-31)')
+    parser.add_argument('--drop', action='store_true', help='테이블을 삭제한 후 다시 생성')
+    argument = parser.parse_args()
+
+    if not 1 <= argument.persons <= 10 ** 8:
+        parser.error('--persons must be between 1 and 100000000')
+
+    started = time.perf_counter()
+
+    connection = psycopg2.connect(**config.database.config)
+
+    try:
+        with connection, connection.cursor() as cursor:
+            for table in TABLE:
+                if argument.drop:
+                    cursor.execute(f'DROP TABLE IF EXISTS {table}')
+
+                cursor.execute(DDL[table])
+                cursor.execute(f'TRUNCATE {table}')
+
+            counts = generate(cursor, argument)
+
+        # 적재 직후의 실행 계획이 실제 분포를 반영하도록 통계를 갱신합니다.
+        connection.autocommit = True
+
+        with connection.cursor() as cursor:
+            for table in TABLE:
+                cursor.execute(f'ANALYZE {table}')
+    finally:
+        connection.close()
+
+    for table, count in counts.items():
+        print(f'{table:<22} {count:>12} rows')
+
+    print(f'elapsed {time.perf_counter() - started:.1f} s')
+
+if __name__ == '__main__':
+    main()
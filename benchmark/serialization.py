@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from datetime import date, datetime, timedelta
+from types    import MappingProxyType
+from typing   import Callable, List
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# === 사용자 정의 모듈 임포트 === #
+
+from constant.lookup         import getLookup, publish
+from router.search.condition import formatCondition
+from router.search.death     import formatDeath
+from router.search.drug      import formatDrug
+from router.search.person    import formatPerson
+from router.search.visit     import formatVisit
+
+import utility.api as api
+
+# === 상수 정의 === #
+
+CONCEPT_COUNT = 1000 # 가상 concept 개수
+
+# === 함수 정의 === #
+
+def makeRows(router: str, count: int, seed: int) -> List[dict]:
+    '''
+    라우터가 조회하는 테이블의 가상 행을 생성합니다.
+
+    Args:
+        router (str): 라우터 이름
+        count (int): 행 개수
+        seed (int): 난수 시드
+
+    Returns:
+        rows (List[dict]): 가상 행 목록
+    '''
+
+    generator = random.Random(seed)
+    base      = datetime(2000, 1, 1)
+    rows      = []
+
+    for index in range(count):
+        start = base + timedelta(days=generator.randrange(8000), seconds=generator.randrange(86400))
+        end   = start + timedelta(days=generator.randrange(30))
+
+        if router == 'drug':
+            rows.append({
+                'person_id': index, 'visit_occurrence_id': index, 'drug_concept_id': generator.randrange(CONCEPT_COUNT),
+                'drug_exposure_start_datetime': start, 'drug_exposure_end_datetime': end
+            })
+        elif router == 'condition':
+            rows.append({
+                'person_id': index, 'visit_occurrence_id': index, 'condition_concept_id': generator.randrange(1, CONCEPT_COUNT),
+                'condition_start_datetime': start, 'condition_end_datetime': end
+            })
+        elif router == 'visit':
+            rows.append({
+                'visit_occurrence_id': index, 'person_id': index, 'visit_concept_id': generator.randrange(CONCEPT_COUNT),
+                'visit_start_datetime': start, 'visit_end_datetime': end
+            })
+        elif router == 'person':
+            rows.append({
+                'person_id': index, 'birth_datetime': start, 'gender_concept_id': generator.randrange(CONCEPT_COUNT),
+                'race_concept_id': generator.randrange(CONCEPT_COUNT), 'ethnicity_source_value': 'west_indian'
+            })
+        else:
+            rows.append({ 'person_id': index, 'death_date': start.date() })
+
+    return rows
+
+def legacyFormat(item: dict) -> dict:
+    '''
+    이전 방식과 같이 날짜를 strftime으로 변환합니다.
+    '''
+
+    return { key: value.strftime('%Y-%m-%d') if isinstance(value, date) else value for key, value in item.items() }
+
+def measure(function: Callable[[], None], repeat: int) -> float:
+    '''
+    함수의 실행 시간 중앙값을 반환합니다 (밀리초).
+    '''
+
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return sorted(timings)[len(timings) // 2]
+
+def render(response: dict) -> bytes:
+    '''
+    응답 메시지의 본문을 모두 인코딩합니다.
+    '''
+
+    body = response['response']
+
+    return body if isinstance(body, bytes) else b''.join(body)
+
+# === 메인 정의 === #
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='검색 라우터의 응답 직렬화 시간을 측정합니다.')
+    parser.add_argument('--rows', type=int, default=1000, help='응답 당 행 개수 (기본 값: 1000)')
+    parser.add_argument('--repeat', type=int, default=50, help='반복 횟수 (기본 값: 50)')
+    parser.add_argument('--seed', type=int, default=0, help='난수 시드 (기본 값: 0)')
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    argument = parser.parse_args()
+
+    names = MappingProxyType({ conceptID: f'concept {conceptID}' for conceptID in range(CONCEPT_COUNT) })
+
+    publish(
+        REVERSED_CONDITION=names, REVERSED_DRUG=names, REVERSED_GENDER=names,
+        REVERSED_RACE=names, REVERSED_VISIT_TYPE=names
+    )
+
+    lookup = getLookup()
+
+    routers = {
+        'drug': ('drugs', lambda row: formatDrug(row, lookup)),
+        'condition': ('conditions', lambda row: formatCondition(row, lookup)),
+        'visit': ('visits', lambda row: formatVisit(row, lookup)),
+        'person': ('persons', lambda row: formatPerson(row, lookup)),
+        'death': ('death', formatDeath)
+    }
+
+    fast    = api.orjson
+    results = []
+
+    for router, (field, format) in routers.items():
+        rows = makeRows(router, argument.rows, argument.seed)
+
+        # 이전 방식: 행마다 strftime을 호출한 후 표준 라이브러리로 전체를 한 번에 인코딩
+        legacy = measure(
+            lambda: json.dumps({ 'status': 'SUCCESS', 'data': { field: [legacyFormat(format(row)) for row in rows] } }).encode(),
+            argument.repeat
+        )
+
+        api.orjson = None
+
+        standard = measure(lambda: render(api.makeResponse('SUCCESS', { field: [format(row) for row in rows] })), argument.repeat)
+
+        api.orjson = fast
+
+        result = {
+            'router': router,
+            'rows': argument.rows,
+            'legacy_ms': round(legacy, 3),
+            'json_ms': round(standard, 3)
+        }
+
+        if fast != None:
+            result['orjson_ms'] = round(measure(lambda: render(api.makeResponse('SUCCESS', { field: [format(row) for row in rows] })), argument.repeat), 3)
+            result['speedup'] = round(legacy / result['orjson_ms'], 2)
+        else:
+            result['speedup'] = round(legacy / standard, 2)
+
+        results.append(result)
+
+    if argument.json:
+        print(json.dumps(results, indent=4))
+        return
+
+    print(f'{"router":<10} {"rows":>6} {"legacy (ms)":>12} {"json (ms)":>10} {"orjson (ms)":>12} {"speedup":>8}')
+
+    for result in results:
+        orjsonTime = result.get('orjson_ms', '-')
+
+        print(f'{result["router"]:<10} {result["rows"]:>6} {result["legacy_ms"]:>12} {result["json_ms"]:>10} {orjsonTime:>12} {result["speedup"]:>7}x')
+
+if __name__ == '__main__':
+    main()
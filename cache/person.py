@@ -0,0 +1,406 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from collections import Counter
+from datetime    import date, datetime, timedelta
+from itertools   import islice
+from typing      import Any, Dict, Iterable, List
+
+import array
+import bisect
+import logging
+import threading
+
+# === 서드파티 패키지 임포트 === #
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# === 사용자 정의 모듈 임포트 === #
+
+import config.application
+import database.database as db
+
+# === 상수 정의 === #
+
+BACKEND = 'numpy' if numpy != None else 'array' # 열 저장 방식
+
+BATCH_SIZE = 10000 # 서버 측 커서에서 한 번에 가져오는 행 개수
+
+EPOCH = datetime(1970, 1, 1) # 출생 시각의 기준점
+
+MISSING = -1 # NULL을 나타내는 값 (concept_id, 출생 연도)
+
+# 열 이름별 자료형 (NumPy dtype, array typecode)
+COLUMN = {
+    'person_id': ('int64', 'q'),
+    'gender': ('int32', 'i'),
+    'race': ('int32', 'i'),
+    'ethnicity': ('int32', 'i'), # ethnicities의 인덱스
+    'birth': ('int64', 'q'),     # EPOCH 이후 경과 시간 (초)
+    'year': ('int16', 'h'),      # 출생 연도
+    'monthday': ('int16', 'h')   # 출생 월 * 100 + 출생 일
+}
+
+# === 전역 변수 정의 === #
+
+PERSON = None # person 테이블 스냅샷 (갱신 시 새 객체로 교체되며, 교체 이후에는 수정되지 않음)
+
+logger = logging.getLogger(__name__)
+
+lock = threading.Lock() # person 테이블 갱신 잠금
+
+# === 함수 정의 === #
+
+def isEnabled() -> bool:
+    '''
+    person 테이블을 메모리에 적재하도록 설정되어 있는지 확인합니다.
+    '''
+
+    return config.application.config['person_engine']
+
+def readColumns(connection: Any, after: int, ethnicities: list, codes: dict) -> Dict[str, array.array]:
+    '''
+    person_id가 after보다 큰 행을 person_id 순서로 읽어 열 단위의 배열로 반환합니다.
+
+    Args:
+        connection (Any): 커넥션
+        after (int): 이미 적재된 마지막 person_id (None일 경우 전체 행을 읽음)
+        ethnicities (list): 민족 코드별 ethnicity_source_value 목록 (새 값이 추가됨)
+        codes (dict): ethnicity_source_value별 민족 코드 (새 값이 추가됨)
+
+    Returns:
+        columns (Dict[str, array.array]): 열 이름별 배열
+    '''
+
+    columns = { name: array.array(typecode) for name, (_, typecode) in COLUMN.items() }
+
+    query    = 'SELECT person_id, gender_concept_id, race_concept_id, ethnicity_source_value, birth_datetime FROM person'
+    argument = []
+
+    if after != None:
+        query += ' WHERE person_id > %s'
+        argument.append(after)
+
+    with connection.cursor(name='refresh_person') as cursor:
+        cursor.itersize = BATCH_SIZE
+        cursor.execute(query + ' ORDER BY person_id', argument)
+
+        for person in cursor:
+            ethnicity = person['ethnicity_source_value']
+            birth     = person['birth_datetime']
+
+            if ethnicity not in codes:
+                codes[ethnicity] = len(ethnicities)
+                ethnicities.append(ethnicity)
+
+            columns['person_id'].append(person['person_id'])
+            columns['gender'].append(MISSING if person['gender_concept_id'] == None else person['gender_concept_id'])
+            columns['race'].append(MISSING if person['race_concept_id'] == None else person['race_concept_id'])
+            columns['ethnicity'].append(codes[ethnicity])
+            columns['birth'].append(0 if birth == None else int((birth - EPOCH).total_seconds()))
+            columns['year'].append(MISSING if birth == None else birth.year)
+            columns['monthday'].append(0 if birth == None else birth.month * 100 + birth.day)
+
+    if numpy != None:
+        return { name: numpy.array(column, dtype=COLUMN[name][0]) for name, column in columns.items() }
+
+    return columns
+
+def isSame(person: dict, columns: Dict[str, Any], ethnicities: list) -> bool:
+    '''
+    다시 읽은 열이 기존 스냅샷과 같은지 확인합니다.
+
+    Args:
+        person (dict): 기존 person 테이블 스냅샷
+        columns (Dict[str, Any]): 다시 읽은 열
+        ethnicities (list): 다시 읽은 민족 목록
+
+    Returns:
+        same (bool): 모든 열과 민족 목록이 같은지 여부
+    '''
+
+    if tuple(ethnicities) != person['ethnicities']:
+        return False
+
+    for name in COLUMN:
+        if len(columns[name]) != len(person['columns'][name]):
+            return False
+
+        if numpy != None:
+            if not numpy.array_equal(columns[name], person['columns'][name]):
+                return False
+        elif columns[name] != person['columns'][name]:
+            return False
+
+    return True
+
+def refreshPerson(full: bool = False) -> None:
+    '''
+    person 테이블을 열 단위의 배열로 적재하여 PERSON을 새 스냅샷으로 교체합니다.
+
+    기본적으로 마지막으로 적재한 person_id 이후에 추가된 행만 읽어 기존 배열 뒤에 붙이며, 전체 행 개수가 맞지 않을 경우 (중간 삽입, 삭제) 전체를 다시 읽습니다.
+    기존 행의 수정은 증분 갱신으로 알 수 없으므로, full=True로 주기적으로 전체를 다시 읽어야 합니다.
+
+    Args:
+        full (bool): 전체를 다시 읽을지 여부
+
+    Raises:
+        psycopg2.DatabaseError: 데이터베이스 조회에 실패한 경우
+    '''
+
+    global PERSON
+
+    if not isEnabled():
+        return
+
+    with lock:
+        person = None if full else PERSON
+
+        with db.connect() as connection:
+            if person == None:
+                ethnicities = []
+                codes       = {}
+                columns     = readColumns(connection, None, ethnicities, codes)
+                changed     = True
+            else:
+                ethnicities = list(person['ethnicities'])
+                codes       = dict(person['codes'])
+                # NumPy 배열의 원소 (numpy.int64)는 psycopg2가 쿼리 인자로 변환할 수 없으므로 int로 변환합니다.
+                after       = int(person['columns']['person_id'][-1]) if person['count'] != 0 else None
+                added       = readColumns(connection, after, ethnicities, codes)
+
+                changed = len(added['person_id']) != 0
+
+                if numpy != None:
+                    columns = { name: numpy.concatenate((person['columns'][name], added[name])) for name in COLUMN }
+                else:
+                    columns = { name: person['columns'][name] + added[name] for name in COLUMN }
+
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT COUNT(*) AS count FROM person')
+
+                    if cursor.fetchone()['count'] != len(columns['person_id']):
+                        ethnicities = []
+                        codes       = {}
+                        columns     = readColumns(connection, None, ethnicities, codes)
+                        changed     = True
+
+        # 전체를 다시 읽었더라도 기존과 같으면 버전을 유지하여, 캐시된 응답이 만료되지 않도록 합니다.
+        if changed and PERSON != None:
+            changed = not isSame(PERSON, columns, ethnicities)
+
+        PERSON = {
+            'version': 1 if PERSON == None else PERSON['version'] + (1 if changed else 0),
+            'timestamp': datetime.now(),
+            'count': len(columns['person_id']),
+            'columns': columns,
+            'ethnicities': tuple(ethnicities),
+            'codes': codes
+        }
+
+    footprint = statistic()
+
+    logger.info(f'person table refreshed: {footprint["rows"]} rows, {footprint["bytes"]} bytes ({BACKEND})')
+
+def getPersonTable() -> dict:
+    '''
+    현재 person 테이블 스냅샷을 반환합니다.
+
+    Returns:
+        person (dict): person 테이블 스냅샷 (비활성화되어 있거나 아직 적재되지 않았을 경우 None)
+    '''
+
+    return PERSON if isEnabled() else None
+
+def countBy(person: dict, name: str) -> Dict[Any, int]:
+    '''
+    한 열의 값별 환자 수를 계산합니다.
+
+    Args:
+        person (dict): person 테이블 스냅샷
+        name ('gender' | 'race' | 'ethnicity'): 열 이름
+
+    Returns:
+        counts (Dict[Any, int]): 값별 환자 수 (concept_id 또는 ethnicity_source_value이며, NULL은 None)
+    '''
+
+    column = person['columns'][name]
+
+    if numpy != None:
+        values, counts = numpy.unique(column, return_counts=True)
+        groups         = zip(values.tolist(), counts.tolist())
+    else:
+        groups = Counter(column).items()
+
+    if name == 'ethnicity':
+        return { person['ethnicities'][value]: count for value, count in groups }
+
+    return { (None if value == MISSING else value): count for value, count in groups }
+
+def countAge(person: dict, today: date) -> Dict[int, int]:
+    '''
+    10살 단위의 연령대별 환자 수를 만 나이를 기준으로 계산합니다. 출생일이 없거나 미래인 환자는 제외합니다.
+
+    Args:
+        person (dict): person 테이블 스냅샷
+        today (date): 기준 날짜
+
+    Returns:
+        counts (Dict[int, int]): 연령대별 환자 수
+    '''
+
+    year     = person['columns']['year']
+    monthday = person['columns']['monthday']
+    current  = today.month * 100 + today.day
+
+    if numpy != None:
+        age   = today.year - year.astype('int32') - (monthday > current)
+        valid = (year != MISSING) & (age >= 0)
+
+        values, counts = numpy.unique(age[valid] // 10 * 10, return_counts=True)
+
+        return dict(zip(values.tolist(), counts.tolist()))
+
+    counts = Counter()
+
+    for birthYear, birthday in zip(year, monthday):
+        age = today.year - birthYear - (birthday > current)
+
+        if birthYear != MISSING and age >= 0:
+            counts[age // 10 * 10] += 1
+
+    return dict(counts)
+
+def matchPerson(person: dict, filters: dict, after: int) -> Iterable[int]:
+    '''
+    조건에 맞는 행의 위치를 person_id 순서로 반환합니다.
+
+    Args:
+        person (dict): person 테이블 스냅샷
+        filters (dict): 열 이름 ('gender', 'race', 'ethnicity', 'birth')별 값으로, 값이 None일 경우 일치하는 행이 없음
+        after (int): 이 person_id보다 큰 행만 검색 (None일 경우 처음부터 검색)
+
+    Returns:
+        indexes (Iterable[int]): 조건에 맞는 행의 위치 (NumPy를 사용할 경우 배열, 그렇지 않을 경우 제너레이터)
+    '''
+
+    columns = person['columns']
+    values  = {}
+
+    # 조건 값을 열에 저장된 형식으로 변환합니다.
+    for name, value in filters.items():
+        if name == 'ethnicity':
+            value = person['codes'].get(value)
+        elif name == 'birth' and value != None:
+            # 출생일이 없는 행의 birth 값 (0)이 1970-01-01과 일치하지 않도록 출생 연도도 함께 비교합니다.
+            values['year'] = value.year
+            value          = int((value - EPOCH).total_seconds())
+
+        if value == None:
+            return numpy.empty(0, dtype='int64') if numpy != None else iter(())
+
+        values[name] = value
+
+    start = 0 if after == None else int(bisect.bisect_right(columns['person_id'], int(after)))
+
+    if numpy != None:
+        mask = numpy.ones(person['count'] - start, dtype=bool)
+
+        for name, value in values.items():
+            mask &= columns[name][start:] == value
+
+        return numpy.flatnonzero(mask) + start
+
+    return (
+        index for index in range(start, person['count'])
+        if all(columns[name][index] == value for name, value in values.items())
+    )
+
+def countPerson(person: dict, filters: dict) -> int:
+    '''
+    조건에 맞는 환자 수를 계산합니다.
+
+    Args:
+        person (dict): person 테이블 스냅샷
+        filters (dict): 열 이름 ('gender', 'race', 'ethnicity', 'birth')별 값으로, 값이 None일 경우 일치하는 행이 없음
+
+    Returns:
+        count (int): 조건에 맞는 환자 수
+    '''
+
+    indexes = matchPerson(person, filters, None)
+
+    if numpy != None:
+        return len(indexes)
+
+    return sum(1 for _ in indexes)
+
+def searchPerson(person: dict, filters: dict, after: int, offset: int, limit: int) -> List[dict]:
+    '''
+    조건에 맞는 환자를 person_id 순서로 검색합니다. 반환하는 행은 person 테이블 조회 결과와 같은 형식입니다.
+
+    Args:
+        person (dict): person 테이블 스냅샷
+        filters (dict): 열 이름 ('gender', 'race', 'ethnicity', 'birth')별 값으로, 값이 None일 경우 일치하는 행이 없음
+        after (int): 이 person_id보다 큰 행만 검색 (None일 경우 처음부터 검색)
+        offset (int): 건너뛸 행 개수
+        limit (int): 반환할 최대 행 개수
+
+    Returns:
+        persons (List[dict]): 검색된 행 목록
+    '''
+
+    columns = person['columns']
+    matches = matchPerson(person, filters, after)
+
+    if numpy != None:
+        indexes = matches[offset:offset + limit].tolist()
+    else:
+        indexes = list(islice(matches, offset, offset + limit))
+
+    persons = []
+
+    for index in indexes:
+        gender = int(columns['gender'][index])
+        race   = int(columns['race'][index])
+
+        persons.append({
+            'person_id': int(columns['person_id'][index]),
+            'birth_datetime': None if columns['year'][index] == MISSING else EPOCH + timedelta(seconds=int(columns['birth'][index])),
+            'gender_concept_id': None if gender == MISSING else gender,
+            'race_concept_id': None if race == MISSING else race,
+            'ethnicity_source_value': person['ethnicities'][columns['ethnicity'][index]]
+        })
+
+    return persons
+
+def statistic() -> dict:
+    '''
+    메모리에 적재된 person 테이블의 크기를 반환합니다.
+
+    Returns:
+        statistic (dict): 저장 방식, 행 개수, 배열 크기 (바이트)와 갱신 시각
+    '''
+
+    person = PERSON
+
+    if person == None:
+        return { 'backend': BACKEND, 'rows': 0, 'bytes': 0, 'refreshed_at': None }
+
+    if numpy != None:
+        size = sum(column.nbytes for column in person['columns'].values())
+    else:
+        size = sum(column.itemsize * len(column) for column in person['columns'].values())
+
+    return {
+        'backend': BACKEND,
+        'rows': person['count'],
+        'bytes': size,
+        'refreshed_at': person['timestamp'].strftime('%Y-%m-%d %H:%M:%S')
+    }
@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from collections import OrderedDict
+from functools   import wraps
+from typing      import Callable, Iterable, Iterator, NamedTuple
+
+import hashlib
+import re
+import threading
+import time
+
+# === 서드파티 패키지 임포트 === #
+
+from flask import Response, request
+
+# === 사용자 정의 모듈 임포트 === #
+
+from constant.lookup import getLookup
+
+import cache.person
+import cache.statistic
+import config.application
+
+# === 상수 정의 === #
+
+STATISTIC_TTL = 60 # 통계 라우터의 캐시 유지 시간 (초)
+SEARCH_TTL    = 10 # 검색 라우터의 캐시 유지 시간 (초)
+
+STALENESS_PATTERN = re.compile(rb'"staleness":(\d+)') # 응답 본문의 통계 경과 시간
+
+# === 클래스 정의 === #
+
+class Entry(NamedTuple):
+    '''
+    캐시된 응답입니다.
+    '''
+
+    version: tuple    # 응답을 생성할 때의 (조회 테이블 버전, 통계 버전, person 테이블 버전)
+    expires: float    # 만료 시각 (time.monotonic 기준)
+    created: float    # 생성 시각 (time.monotonic 기준)
+    etag: str         # 통계 경과 시간을 제외한 응답 본문의 해시 값
+    mimetype: str     # 응답 형식
+    body: bytes       # 응답 본문
+    staleness: bool   # 응답 본문에 통계 경과 시간 (staleness)이 포함되어 있는지 여부
+
+# === 전역 변수 정의 === #
+
+entries = OrderedDict() # 캐시된 응답 (최근에 사용한 순서)
+size    = 0             # 캐시된 응답 본문의 전체 크기 (바이트)
+
+lock = threading.Lock() # 캐시 갱신 잠금
+
+counter = {
+    'hits': 0,
+    'misses': 0,
+    'not_modified': 0,
+    'evictions': 0
+}
+
+# === 함수 정의 === #
+
+def getVersion() -> tuple:
+    '''
+    응답 내용을 결정하는 데이터 버전을 반환합니다.
+
+    Returns:
+        version (tuple): (조회 테이블 스냅샷 버전, 통계 스냅샷 버전, person 테이블 스냅샷 버전)
+    '''
+
+    statistic = cache.statistic.STATISTIC
+    person    = cache.person.PERSON
+
+    return (getLookup().VERSION, 0 if statistic == None else statistic['version'], 0 if person == None else person['version'])
+
+def getKey() -> str:
+    '''
+    현재 요청의 캐시 키를 반환합니다. 쿼리 문자열은 파라미터 순서와 관계없이 같은 키가 되도록 정렬합니다.
+
+    Returns:
+        key (str): 캐시 키
+    '''
+
+    return request.path + '?' + '&'.join(f'{name}={value}' for name, value in sorted(request.args.items(multi=True)))
+
+def getETag(body: bytes) -> str:
+    '''
+    응답 본문으로 ETag를 생성합니다.
+
+    통계 경과 시간 (staleness)은 반환 시점마다 달라지므로 0으로 바꾸어 해시하며, 그 외에는 본문의 해시 값이므로
+    어느 워커가 응답을 생성하더라도, 그리고 캐시가 만료되어 다시 생성하더라도 내용이 같으면 같은 ETag가 됩니다.
+
+    Args:
+        body (bytes): 응답 본문
+
+    Returns:
+        etag (str): ETag
+    '''
+
+    return hashlib.sha1(STALENESS_PATTERN.sub(b'"staleness":0', body)).hexdigest()
+
+def makeEntry(version: tuple, ttl: int, mimetype: str, body: bytes) -> Entry:
+    '''
+    캐시할 응답을 생성합니다.
+
+    Args:
+        version (tuple): 응답을 생성할 때의 데이터 버전
+        ttl (int): 캐시 유지 시간 (초)
+        mimetype (str): 응답 형식
+        body (bytes): 응답 본문
+
+    Returns:
+        entry (Entry): 캐시할 응답
+    '''
+
+    now = time.monotonic()
+
+    return Entry(version, now + ttl, now, getETag(body), mimetype, body, STALENESS_PATTERN.search(body) != None)
+
+def getBody(entry: Entry) -> bytes:
+    '''
+    캐시된 응답 본문을 반환하며, 본문의 통계 경과 시간 (staleness)은 캐시된 이후에 지난 시간만큼 더하여 반환 시점 기준으로 바꿉니다.
+
+    Args:
+        entry (Entry): 캐시된 응답
+
+    Returns:
+        body (bytes): 응답 본문
+    '''
+
+    elapsed = int(time.monotonic() - entry.created)
+
+    if not entry.staleness or elapsed <= 0:
+        return entry.body
+
+    return STALENESS_PATTERN.sub(lambda match: b'"staleness":' + str(int(match.group(1)) + elapsed).encode(), entry.body)
+
+def setHeaders(response: Response, entry: Entry, ttl: int) -> None:
+    '''
+    응답 메시지에 ETag와 Cache-Control을 설정합니다.
+
+    통계 경과 시간이 포함된 응답은 반환 시점마다 본문이 달라지므로 약한 (weak) ETag를, 그 외의 응답은 강한 ETag를 사용합니다.
+
+    Args:
+        response (Response): 응답 메시지
+        entry (Entry): 캐시된 응답
+        ttl (int): 캐시 유지 시간 (초)
+    '''
+
+    response.set_etag(entry.etag, weak=entry.staleness)
+    response.headers['Cache-Control'] = f'max-age={ttl}'
+
+def makeCachedResponse(entry: Entry, ttl: int) -> Response:
+    '''
+    캐시된 응답으로 응답 메시지를 생성하며, 클라이언트가 같은 ETag를 보낸 경우 304를 반환합니다.
+
+    Args:
+        entry (Entry): 캐시된 응답
+        ttl (int): 캐시 유지 시간 (초)
+
+    Returns:
+        response (Response): 응답 메시지
+    '''
+
+    if request.if_none_match.contains_weak(entry.etag):
+        with lock:
+            counter['not_modified'] += 1
+
+        response = Response(status=304)
+    else:
+        response = Response(getBody(entry), status=200, mimetype=entry.mimetype)
+
+    setHeaders(response, entry, ttl)
+
+    return response
+
+def storeStream(key: str, version: tuple, ttl: int, mimetype: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+    '''
+    점진적으로 인코딩되는 응답 본문을 그대로 전송하면서 모아 두었다가, 전송이 끝나면 캐시에 저장합니다.
+    모은 크기가 캐시 크기의 상한을 넘거나, 전송 중에 데이터 버전이 바뀐 경우에는 저장하지 않습니다.
+
+    Args:
+        key (str): 캐시 키
+        version (tuple): 응답을 생성할 때의 데이터 버전
+        ttl (int): 캐시 유지 시간 (초)
+        mimetype (str): 응답 형식
+        chunks (Iterable[bytes]): 응답 본문 조각
+
+    Returns:
+        chunks (Iterator[bytes]): 응답 본문 조각
+    '''
+
+    limit  = config.application.config['response_cache_size']
+    buffer = []
+    length = 0
+
+    try:
+        for chunk in chunks:
+            if buffer != None:
+                buffer.append(chunk)
+                length += len(chunk)
+
+                if length > limit:
+                    buffer = None
+
+            yield chunk
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+    if buffer != None and getVersion() == version:
+        store(key, makeEntry(version, ttl, mimetype, b''.join(buffer)))
+
+def store(key: str, entry: Entry) -> None:
+    '''
+    응답을 캐시에 저장하며, 전체 크기가 상한을 넘을 경우 가장 오래 사용하지 않은 응답부터 제거합니다.
+
+    Args:
+        key (str): 캐시 키
+        entry (Entry): 캐시할 응답
+    '''
+
+    global size
+
+    limit = config.application.config['response_cache_size']
+
+    if len(entry.body) > limit:
+        return
+
+    with lock:
+        if key in entries:
+            size -= len(entries.pop(key).body)
+
+        entries[key] = entry
+        size        += len(entry.body)
+
+        while size > limit:
+            _, evicted = entries.popitem(last=False)
+
+            size                 -= len(evicted.body)
+            counter['evictions'] += 1
+
+def cached(ttl: int) -> Callable:
+    '''
+    라우터의 응답을 캐시하는 데코레이터입니다.
+
+    같은 경로와 쿼리 문자열의 요청은 ttl 동안, 그리고 조회 테이블과 통계 버전이 바뀌기 전까지 캐시된 응답을 반환하며,
+    If-None-Match가 캐시된 응답의 ETag와 같을 경우 데이터베이스 조회와 직렬화 없이 304를 반환합니다.
+    ETag는 통계 경과 시간을 제외한 응답 본문으로 생성하고 통계 경과 시간은 반환할 때마다 다시 계산하며, 점진적으로 인코딩되는 JSON 응답은 전송이 끝난 뒤 인코딩된 본문을 캐시합니다.
+    200이 아닌 응답과 내보내기 응답 (format 파라미터)은 캐시하지 않습니다.
+
+    Args:
+        ttl (int): 캐시 유지 시간 (초)
+
+    Returns:
+        decorator (Callable): 데코레이터
+    '''
+
+    def decorator(router: Callable[..., Response]) -> Callable[..., Response]:
+        @wraps(router)
+        def wrapper(*args, **kwargs) -> Response:
+            if config.application.config['response_cache_size'] <= 0 or 'format' in request.args:
+                return router(*args, **kwargs)
+
+            key     = getKey()
+            version = getVersion()
+
+            with lock:
+                entry = entries.get(key)
+
+                if entry != None and entry.version == version and entry.expires > time.monotonic():
+                    entries.move_to_end(key)
+                    counter['hits'] += 1
+                else:
+                    entry             = None
+                    counter['misses'] += 1
+
+            if entry != None:
+                return makeCachedResponse(entry, ttl)
+
+            response = router(*args, **kwargs)
+
+            if response.status_code != 200:
+                return response
+
+            # 점진적으로 인코딩되는 응답은 본문이 완성되기 전에 헤더가 전송되므로 ETag 없이 전송하며, 캐시된 이후의 요청부터 ETag를 반환합니다.
+            if response.is_streamed:
+                response.response = storeStream(key, version, ttl, response.mimetype, response.response)
+                response.headers['Cache-Control'] = f'max-age={ttl}'
+
+                return response
+
+            # 라우터가 실행되는 동안 데이터 버전이 바뀐 경우, 응답이 어느 버전의 데이터인지 알 수 없으므로 캐시하지 않습니다.
+            if getVersion() != version:
+                return response
+
+            entry = makeEntry(version, ttl, response.mimetype, response.get_data())
+
+            store(key, entry)
+
+            return makeCachedResponse(entry, ttl)
+
+        return wrapper
+
+    return decorator
+
+def statistic() -> dict:
+    '''
+    응답 캐시 상태를 반환합니다.
+
+    Returns:
+        statistic (dict): 캐시된 응답 개수, 전체 크기 (바이트)와 적중, 실패, 304, 제거 횟수
+    '''
+
+    with lock:
+        return {
+            'entries': len(entries),
+            'size': size,
+            **counter
+        }
@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from collections import Counter
+from datetime    import datetime
+
+import logging
+import os
+import pickle
+import threading
+import time
+
+# === 사용자 정의 모듈 임포트 === #
+
+from database.executor import Statement, fanOut
+
+import constant.shared as shared
+
+# === 상수 정의 === #
+
+REFRESH_DEADLINE = 3600 # 통계 갱신 쿼리의 제한 시간 (초)
+REFRESH_INTERVAL = 3600 # 통계 갱신 주기 (초)
+
+FILE_NAME = 'statistic.pickle' # 공유 디렉터리에 기록하는 통계 스냅샷 파일
+LOCK_NAME = 'statistic.lock'   # 통계 갱신 잠금 파일
+
+# === 전역 변수 정의 === #
+
+STATISTIC = None # 통계 스냅샷 (갱신 시 새 객체로 교체되며, 교체 이후에는 수정되지 않음)
+
+loaded = None # 마지막으로 읽은 공유 통계 스냅샷 파일 정보 (st_dev, st_ino, st_mtime_ns)
+
+logger = logging.getLogger(__name__)
+
+lock       = threading.Lock() # 스냅샷 교체 잠금 (교체하는 동안에만 잡습니다)
+refreshing = threading.Lock() # 갱신 작업 잠금 (한 번에 하나의 집계만 실행)
+
+# === 함수 정의 === #
+
+def computeStatistic() -> dict:
+    '''
+    통계 라우터가 반환하는 모든 집계 값을 계산합니다.
+
+    person과 visit_occurrence를 각각 한 번씩만 집계한 후, 성별, 인종, 민족, 연령대별 값은 메모리에서 합산합니다.
+    가장 세분화된 집계 결과는 cube에 그대로 보관하여, 여러 차원의 교차 집계도 데이터베이스 조회 없이 계산할 수 있도록 합니다.
+
+    Returns:
+        statistic (dict): 환자 통계 (person), 방문 통계 (visit)와 교차 집계 (cube)
+
+    Raises:
+        psycopg2.DatabaseError: 데이터베이스 조회에 실패한 경우
+    '''
+
+    today = datetime.now().date()
+
+    person = {
+        'count': 0,
+        'gender': Counter(),
+        'race': Counter(),
+        'ethnicity': Counter(),
+        'death': 0
+    }
+    visit = {
+        'visit_type': Counter(),
+        'gender': Counter(),
+        'race': Counter(),
+        'ethnicity': Counter(),
+        'age': Counter()
+    }
+    cube = {
+        'person': Counter(), # (성별, 인종, 민족, 연령대) -> 환자 수
+        'visit': Counter()   # (성별, 인종, 민족, 연령대, 방문 유형) -> 방문 수
+    }
+
+    # 네 집계 쿼리는 서로 독립적이므로, 각각 다른 커넥션에서 동시에 실행합니다.
+    # 만 나이는 오늘 날짜를 기준으로 계산하며, 출생일이 미래인 환자는 연령대 집계에서 제외합니다.
+    result = fanOut({
+        'person': Statement('''
+            SELECT gender_concept_id, race_concept_id, ethnicity_source_value,
+                   CASE WHEN birth_datetime::date <= %s THEN (EXTRACT(YEAR FROM AGE(%s, birth_datetime::date))::int / 10) * 10 END AS age,
+                   COUNT(*) AS count
+            FROM person
+            GROUP BY 1, 2, 3, 4
+        ''', [today, today]),
+        'death': Statement('SELECT COUNT(*) AS count FROM death'),
+        'visit_type': Statement('SELECT visit_concept_id, COUNT(*) AS count FROM visit_occurrence GROUP BY visit_concept_id'),
+        'visit': Statement('''
+            SELECT p.gender_concept_id, p.race_concept_id, p.ethnicity_source_value,
+                   CASE WHEN p.birth_datetime::date <= %s THEN (EXTRACT(YEAR FROM AGE(%s, p.birth_datetime::date))::int / 10) * 10 END AS age,
+                   v.visit_concept_id, COUNT(*) AS count
+            FROM person AS p JOIN visit_occurrence AS v
+            ON p.person_id=v.person_id
+            GROUP BY 1, 2, 3, 4, 5
+        ''', [today, today])
+    }, deadline=REFRESH_DEADLINE)
+
+    # --- 환자 통계 --- #
+
+    for group in result.rows['person']:
+        person['count']                                      += group['count']
+        person['gender'][group['gender_concept_id']]         += group['count']
+        person['race'][group['race_concept_id']]             += group['count']
+        person['ethnicity'][group['ethnicity_source_value']] += group['count']
+
+        cube['person'][(group['gender_concept_id'], group['race_concept_id'], group['ethnicity_source_value'], group['age'])] += group['count']
+
+    person['death'] = result.rows['death'][0]['count']
+
+    # --- 방문 통계 --- #
+
+    for group in result.rows['visit_type']:
+        visit['visit_type'][group['visit_concept_id']] += group['count']
+
+    for group in result.rows['visit']:
+        visit['gender'][group['gender_concept_id']]         += group['count']
+        visit['race'][group['race_concept_id']]             += group['count']
+        visit['ethnicity'][group['ethnicity_source_value']] += group['count']
+
+        if group['age'] != None:
+            visit['age'][group['age']] += group['count']
+
+        cube['visit'][(
+            group['gender_concept_id'], group['race_concept_id'], group['ethnicity_source_value'], group['age'], group['visit_concept_id']
+        )] += group['count']
+
+    return {
+        'person': person,
+        'visit': visit,
+        'cube': cube
+    }
+
+def swapStatistic(statistic: dict, timestamp: datetime = None) -> None:
+    '''
+    STATISTIC을 계산된 집계 값의 새 스냅샷으로 교체합니다.
+
+    Args:
+        statistic (dict): computeStatistic으로 계산한 집계 값
+        timestamp (datetime, opt, default=None): 집계 시각 (None일 경우 현재 시각)
+    '''
+
+    global STATISTIC
+
+    with lock:
+        STATISTIC = {
+            **statistic,
+            'version': 1 if STATISTIC == None else STATISTIC['version'] + 1,
+            'timestamp': datetime.now() if timestamp == None else timestamp
+        }
+
+def writeStatistic(statistic: dict) -> None:
+    '''
+    집계 값을 집계 시각과 함께 공유 통계 스냅샷 파일로 기록합니다.
+
+    임시 파일에 기록한 후 이름을 바꾸므로, 다른 프로세스가 기록 중인 파일을 읽지 않습니다.
+
+    Args:
+        statistic (dict): computeStatistic으로 계산한 집계 값
+    '''
+
+    path      = shared.getPath(FILE_NAME)
+    temporary = f'{path}.{os.getpid()}'
+
+    with open(temporary, 'wb') as file:
+        pickle.dump({ 'timestamp': datetime.now(), 'statistic': statistic }, file, protocol=pickle.HIGHEST_PROTOCOL)
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(temporary, path)
+
+def loadStatistic() -> bool:
+    '''
+    공유 통계 스냅샷 파일이 바뀌었을 경우, 파일을 읽어 STATISTIC을 교체합니다.
+
+    Returns:
+        loaded (bool): 새로 읽었는지 여부
+    '''
+
+    global loaded
+
+    path = shared.getPath(FILE_NAME)
+
+    try:
+        status = os.stat(path)
+    except FileNotFoundError:
+        return False
+
+    identity = (status.st_dev, status.st_ino, status.st_mtime_ns)
+
+    if loaded == identity:
+        return False
+
+    with open(path, 'rb') as file:
+        snapshot = pickle.load(file)
+
+    swapStatistic(snapshot['statistic'], snapshot['timestamp'])
+
+    loaded = identity
+
+    return True
+
+def synchronizeStatistic() -> None:
+    '''
+    공유 통계 스냅샷을 갱신하거나, 다른 프로세스가 갱신한 스냅샷을 읽습니다.
+
+    잠금을 얻은 하나의 프로세스만 집계하여 파일을 기록하며, 파일이 갱신 주기의 절반보다 최근에 기록되었을 경우에는 집계를 생략합니다.
+    '''
+
+    with shared.refreshLock(False, LOCK_NAME) as acquired:
+        if acquired:
+            try:
+                age = time.time() - os.stat(shared.getPath(FILE_NAME)).st_mtime
+            except FileNotFoundError:
+                age = None
+
+            if age == None or age >= REFRESH_INTERVAL / 2:
+                writeStatistic(computeStatistic())
+
+    loadStatistic()
+
+def refreshStatistic() -> None:
+    '''
+    통계 라우터가 반환하는 모든 집계 값을 다시 계산하여 STATISTIC을 새 스냅샷으로 교체합니다.
+
+    집계는 잠금 없이 계산하고 교체만 잠금 안에서 수행하므로, 갱신하는 동안에도 통계 라우터는 이전 스냅샷을 반환합니다.
+    다른 갱신이 이미 실행 중일 경우, 같은 집계를 중복하여 실행하지 않고 바로 반환합니다.
+    공유 디렉터리가 설정된 경우에는 갱신 잠금을 얻은 하나의 프로세스만 집계하고, 나머지 프로세스는 기록된 스냅샷을 읽습니다.
+    '''
+
+    if not refreshing.acquire(blocking=False):
+        return
+
+    try:
+        if shared.isEnabled():
+            synchronizeStatistic()
+        else:
+            swapStatistic(computeStatistic())
+    finally:
+        refreshing.release()
+
+def requestRefresh() -> None:
+    '''
+    실행 중인 갱신이 없을 경우, 별도의 스레드에서 통계를 갱신합니다.
+
+    스레드는 요청의 컨텍스트를 물려받지 않으므로, 요청의 statement_timeout 대신 REFRESH_DEADLINE 안에서 집계합니다.
+    '''
+
+    if refreshing.locked():
+        return
+
+    def run() -> None:
+        try:
+            refreshStatistic()
+        except Exception as error:
+            logger.error(f'statistic refresh failed: {error}')
+
+    threading.Thread(target=run, name='refresh_statistic', daemon=True).start()
+
+def getStatistic() -> dict:
+    '''
+    현재 통계 스냅샷을 반환하며, 아직 계산되지 않았을 경우 먼저 계산합니다.
+
+    Returns:
+        statistic (dict): 통계 스냅샷
+    '''
+
+    statistic = STATISTIC
+
+    # 아직 스냅샷이 없을 경우에만 갱신 작업을 기다리며, 실행 중인 갱신이 없으면 공유 스냅샷을 읽거나 직접 계산합니다.
+    if statistic == None:
+        with refreshing:
+            if STATISTIC == None and shared.isEnabled():
+                loadStatistic()
+
+            if STATISTIC == None:
+                swapStatistic(computeStatistic())
+
+        statistic = STATISTIC
+
+    return statistic
+
+def getFreshness(statistic: dict) -> dict:
+    '''
+    통계 스냅샷의 갱신 시각과 경과 시간을 반환합니다.
+
+    Args:
+        statistic (dict): 통계 스냅샷
+
+    Returns:
+        freshness (dict): 갱신 시각과 경과 시간 (초)
+    '''
+
+    return {
+        'refreshed_at': statistic['timestamp'].strftime('%Y-%m-%d %H:%M:%S'),
+        'staleness': int((datetime.now() - statistic['timestamp']).total_seconds())
+    }
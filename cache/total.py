@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from collections import OrderedDict
+from typing      import NamedTuple, Tuple
+
+import threading
+import time
+
+# === 사용자 정의 모듈 임포트 === #
+
+from cache.response import getVersion
+from database.query import execute
+
+import config.application
+import database.database as db
+
+# === 상수 정의 === #
+
+MAX_ENTRIES = 4096 # 캐시할 최대 필터 조합 개수
+
+# === 클래스 정의 === #
+
+class Entry(NamedTuple):
+    '''
+    캐시된 검색 결과 개수입니다.
+    '''
+
+    version: tuple # 개수를 계산할 때의 데이터 버전
+    expires: float # 만료 시각 (time.monotonic 기준)
+    total: int     # 검색 결과 개수
+    method: str    # 계산 방법 ('exact' | 'estimate')
+
+# === 전역 변수 정의 === #
+
+entries = OrderedDict() # 필터 조합별 캐시된 개수 (최근에 사용한 순서)
+
+lock = threading.Lock() # 캐시 갱신 잠금
+
+counter = {
+    'hits': 0,
+    'misses': 0,
+    'exact': 0,
+    'estimates': 0
+}
+
+# === 함수 정의 === #
+
+def countRows(query: str, argument: list) -> Tuple[int, str]:
+    '''
+    검색 결과의 개수를 계산합니다.
+
+    CDM_LOOKUP_SEARCH_EXACT_TOTAL_LIMIT개까지만 세는 쿼리로 정확한 개수를 먼저 계산하며, 결과가 그보다 많을 경우 끝까지 세지 않고 실행 계획의 예상 행 개수를 반환합니다.
+
+    Args:
+        query (str): 커서 조건, 정렬 순서와 페이지를 제외한 검색 쿼리
+        argument (list): 쿼리 인자
+
+    Returns:
+        total (int): 검색 결과 개수
+        method ('exact' | 'estimate'): 계산 방법
+
+    Raises:
+        psycopg2.DatabaseError: 데이터베이스 조회에 실패한 경우
+    '''
+
+    limit = config.application.config['search_exact_total_limit']
+
+    with db.connect() as connection, connection.cursor() as cursor:
+        execute(cursor, f'SELECT COUNT(*) AS count FROM ({query} LIMIT %s) AS t', [*argument, limit + 1])
+
+        total = cursor.fetchone()['count']
+
+        if total <= limit:
+            return total, 'exact'
+
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {query}', argument)
+
+        plan = cursor.fetchone()['QUERY PLAN'][0]['Plan']
+
+    # 상한을 넘는 것은 확인되었으므로, 실행 계획이 더 적게 예상하더라도 상한보다 작은 값은 반환하지 않습니다.
+    return max(int(plan['Plan Rows']), limit + 1), 'estimate'
+
+def getTotal(query: str, argument: list) -> Tuple[int, str]:
+    '''
+    검색 결과의 개수를 필터 조합별로 캐시하여 반환합니다.
+
+    커서 조건, 정렬 순서와 페이지는 캐시 키에 포함되지 않으므로, 두 번째 페이지부터는 개수를 다시 세지 않습니다.
+    캐시된 개수는 CDM_LOOKUP_SEARCH_TOTAL_TTL 동안, 그리고 조회 테이블과 통계 버전이 바뀌기 전까지 사용합니다.
+
+    Args:
+        query (str): Query.buildCount로 생성한 검색 쿼리
+        argument (list): 쿼리 인자
+
+    Returns:
+        total (int): 검색 결과 개수
+        method ('exact' | 'estimate'): 계산 방법
+
+    Raises:
+        psycopg2.DatabaseError: 데이터베이스 조회에 실패한 경우
+    '''
+
+    key     = (query, repr(argument))
+    version = getVersion()
+
+    with lock:
+        entry = entries.get(key)
+
+        if entry != None and entry.version == version and entry.expires > time.monotonic():
+            entries.move_to_end(key)
+            counter['hits'] += 1
+
+            return entry.total, entry.method
+
+        counter['misses'] += 1
+
+    total, method = countRows(query, argument)
+
+    with lock:
+        entries[key] = Entry(version, time.monotonic() + config.application.config['search_total_ttl'], total, method)
+        entries.move_to_end(key)
+
+        counter['exact' if method == 'exact' else 'estimates'] += 1
+
+        while len(entries) > MAX_ENTRIES:
+            entries.popitem(last=False)
+
+    return total, method
+
+def statistic() -> dict:
+    '''
+    검색 결과 개수 캐시 상태를 반환합니다.
+
+    Returns:
+        statistic (dict): 캐시된 필터 조합 개수와 적중, 실패, 정확한 계산, 추정 횟수
+    '''
+
+    with lock:
+        return {
+            'entries': len(entries),
+            **counter
+        }
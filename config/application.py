@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+import os
+
+# === 전역 변수 정의 === #
+
+config = {
+    'lazy_startup': os.getenv('CDM_LOOKUP_LAZY_STARTUP', 'false').lower() == 'true',
+
+    'response_cache_size': int(os.getenv('CDM_LOOKUP_RESPONSE_CACHE_SIZE', 64)) * 1024 * 1024,
+
+    'concept_index': os.getenv('CDM_LOOKUP_CONCEPT_INDEX', 'true').lower() == 'true',
+
+    'person_engine': os.getenv('CDM_LOOKUP_PERSON_ENGINE', 'false').lower() == 'true',
+    'person_refresh_interval': int(os.getenv('CDM_LOOKUP_PERSON_REFRESH_INTERVAL', 300)),
+
+    'statistic_sample_pages': int(os.getenv('CDM_LOOKUP_STATISTIC_SAMPLE_PAGES', 50)),
+
+    'search_exact_total_limit': int(os.getenv('CDM_LOOKUP_SEARCH_EXACT_TOTAL_LIMIT', 10000)),
+    'search_total_ttl': int(os.getenv('CDM_LOOKUP_SEARCH_TOTAL_TTL', 300)),
+
+    'shared_directory': os.getenv('CDM_LOOKUP_SHARED_DIRECTORY'),
+    'shared_refresh_interval': int(os.getenv('CDM_LOOKUP_SHARED_REFRESH_INTERVAL', 3600)),
+    'shared_poll_interval': int(os.getenv('CDM_LOOKUP_SHARED_POLL_INTERVAL', 60)),
+
+    'metric_directory': os.getenv('CDM_LOOKUP_METRIC_DIRECTORY')
+}
+
+admissionConfig = {
+    'enabled': os.getenv('CDM_LOOKUP_ADMISSION', 'true').lower() == 'true',
+
+    'queue_timeout': float(os.getenv('CDM_LOOKUP_ADMISSION_QUEUE_TIMEOUT', 2)),
+    'deep_offset': int(os.getenv('CDM_LOOKUP_ADMISSION_DEEP_OFFSET', 10000)),
+
+    'classes': {
+        'cheap': {
+            'concurrency': int(os.getenv('CDM_LOOKUP_ADMISSION_CHEAP_CONCURRENCY', 6)),
+            'queue': int(os.getenv('CDM_LOOKUP_ADMISSION_CHEAP_QUEUE', 32)),
+            'statement_timeout': float(os.getenv('CDM_LOOKUP_ADMISSION_CHEAP_STATEMENT_TIMEOUT', 5)),
+            'retry_after': int(os.getenv('CDM_LOOKUP_ADMISSION_CHEAP_RETRY_AFTER', 1))
+        },
+        'heavy': {
+            'concurrency': int(os.getenv('CDM_LOOKUP_ADMISSION_HEAVY_CONCURRENCY', 2)),
+            'queue': int(os.getenv('CDM_LOOKUP_ADMISSION_HEAVY_QUEUE', 4)),
+            'statement_timeout': float(os.getenv('CDM_LOOKUP_ADMISSION_HEAVY_STATEMENT_TIMEOUT', 30)),
+            'retry_after': int(os.getenv('CDM_LOOKUP_ADMISSION_HEAVY_RETRY_AFTER', 10))
+        }
+    }
+}
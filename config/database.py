@@ -21,4 +21,25 @@ config = {
 
     'dbname': os.getenv('CDM_LOOKUP_DATABASE_NAME'),
     'cursor_factory': psycopg2.extras.RealDictCursor
+}
+
+poolConfig = {
+    'minimum': int(os.getenv('CDM_LOOKUP_DATABASE_POOL_MIN', 1)),
+    'maximum': int(os.getenv('CDM_LOOKUP_DATABASE_POOL_MAX', 8)),
+
+    'timeout': float(os.getenv('CDM_LOOKUP_DATABASE_POOL_TIMEOUT', 30)),
+    'health_check_interval': float(os.getenv('CDM_LOOKUP_DATABASE_POOL_HEALTH_CHECK_INTERVAL', 30))
+}
+
+executorConfig = {
+    'workers': int(os.getenv('CDM_LOOKUP_DATABASE_EXECUTOR_WORKERS', poolConfig['maximum'])),
+    'deadline': float(os.getenv('CDM_LOOKUP_DATABASE_QUERY_DEADLINE', 30))
+}
+
+slowQueryConfig = {
+    'threshold': float(os.getenv('CDM_LOOKUP_SLOW_QUERY_THRESHOLD', 1)),
+    'explain_threshold': float(os.getenv('CDM_LOOKUP_SLOW_QUERY_EXPLAIN_THRESHOLD', 5)),
+
+    'directory': os.getenv('CDM_LOOKUP_SLOW_QUERY_DIRECTORY'),
+    'max_bytes': int(os.getenv('CDM_LOOKUP_SLOW_QUERY_MAX_SIZE', 10)) * 1024 * 1024
 }
\ No newline at end of file
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 사용자 정의 모듈 임포트 === #
+
+from utility.ngram import NgramIndex
+
+import config.application
+import database.database as db
+
+# === 상수 정의 === #
+
+CONCEPT_INDEX = None # concept_name에 대한 n-gram 색인 (갱신 시 새 객체로 교체)
+
+BATCH_SIZE = 10000 # 서버 측 커서에서 한 번에 가져오는 행 개수
+
+# === 함수 정의 === #
+
+def refreshConcept() -> None:
+    '''
+    concept 테이블 전체를 읽어 CONCEPT_INDEX를 새로 생성한 후 교체합니다.
+
+    Raises:
+        psycopg2.DatabaseError: 데이터베이스 조회에 실패한 경우
+    '''
+
+    global CONCEPT_INDEX
+
+    if not config.application.config['concept_index']:
+        return
+
+    with db.connect() as connection, connection.cursor(name='refresh_concept') as cursor:
+        cursor.itersize = BATCH_SIZE
+        cursor.execute('SELECT concept_id, concept_name FROM concept ORDER BY concept_id')
+
+        CONCEPT_INDEX = NgramIndex((concept['concept_id'], concept['concept_name'] or '') for concept in cursor)
\ No newline at end of file
@@ -4,39 +4,37 @@
 
 # === 표준 패키지 임포트 === #
 
-import sys
-
-# === 서드파티 패키지 임포트 === #
-
-import psycopg2
+from types import MappingProxyType
 
 # === 사용자 정의 모듈 임포트 === #
 
-import database.database as db
+from constant.lookup import publish
 
-# === 상수 정의 === #
-
-CONDITION          = {} # 진단병명 목록 (concept_name -> concept_id)
-REVERSED_CONDITION = {} # 진단병명 목록 (concept_id -> concept_name)
+import database.database as db
 
 # === 함수 정의 === #
 
 def refreshCondition() -> None:
     '''
-    CONDITION과 REVERSED_CONDITION 값을 갱신합니다.
+    CONDITION과 REVERSED_CONDITION을 새로 조회하여 조회 테이블 스냅샷을 교체합니다.
+
+    Raises:
+        psycopg2.DatabaseError: 데이터베이스 조회에 실패한 경우
     '''
 
-    try:
-        with db.connection.cursor() as cursor:
-            cursor.execute('''
-                SELECT c.concept_id, c.concept_name
-                FROM concept AS c JOIN (SELECT DISTINCT condition_concept_id FROM condition_occurrence) as co
-                ON c.concept_id=co.condition_concept_id AND c.domain_id=%s
-            ''', ['Condition'])
-
-            for concept in cursor.fetchall():
-                CONDITION[concept['concept_name']]        = concept['concept_id']
-                REVERSED_CONDITION[concept['concept_id']] = concept['concept_name']
-    except psycopg2.DatabaseError as error:
-        db.connection.rollback()
-        sys.exit(error)
\ No newline at end of file
+    with db.connect() as connection, connection.cursor() as cursor:
+        cursor.execute('''
+            SELECT c.concept_id, c.concept_name
+            FROM concept AS c JOIN (SELECT DISTINCT condition_concept_id FROM condition_occurrence) as co
+            ON c.concept_id=co.condition_concept_id AND c.domain_id=%s
+        ''', ['Condition'])
+
+        condition         = {}
+        reversedCondition = {}
+
+        # 이름이 같은 개념이 여러 개일 경우, 공유 조회 테이블과 같이 가장 작은 concept_id로 조회합니다.
+        for concept in cursor.fetchall():
+            condition[concept['concept_name']] = min(condition.get(concept['concept_name'], concept['concept_id']), concept['concept_id'])
+            reversedCondition[concept['concept_id']] = concept['concept_name']
+
+    publish(CONDITION=MappingProxyType(condition), REVERSED_CONDITION=MappingProxyType(reversedCondition))
\ No newline at end of file
@@ -2,36 +2,26 @@
 #
 # Copyright (c) Sangsu Ryu
 
-# === 표준 패키지 임포트 === #
-
-import sys
-
-# === 서드파티 패키지 임포트 === #
-
-import psycopg2
-
 # === 사용자 정의 모듈 임포트 === #
 
-import database.database as db
+from constant.lookup import publish
 
-# === 상수 정의 === #
-
-ETHNICITY = set() # 민족 목록
+import database.database as db
 
 # === 함수 정의 === #
 
 def refreshEthnicity() -> None:
     '''
-    ETHNICITY 값을 갱신합니다.
+    ETHNICITY를 새로 조회하여 조회 테이블 스냅샷을 교체합니다.
+
+    Raises:
+        psycopg2.DatabaseError: 데이터베이스 조회에 실패한 경우
     '''
 
-    try:
-        with db.connection.cursor() as cursor:
-            # 유효한 ethnicity_concept_id가 존재하지 않아, ethnicity_source_value로 대체
-            cursor.execute('SELECT DISTINCT ethnicity_source_value FROM person')
+    with db.connect() as connection, connection.cursor() as cursor:
+        # 유효한 ethnicity_concept_id가 존재하지 않아, ethnicity_source_value로 대체
+        cursor.execute('SELECT DISTINCT ethnicity_source_value FROM person')
+
+        ethnicity = frozenset(person['ethnicity_source_value'] for person in cursor.fetchall())
 
-            for person in cursor.fetchall():
-                ETHNICITY.add(person['ethnicity_source_value'])
-    except psycopg2.DatabaseError as error:
-        db.connection.rollback()
-        sys.exit(error)
\ No newline at end of file
+    publish(ETHNICITY=ethnicity)
\ No newline at end of file
@@ -4,39 +4,37 @@
 
 # === 표준 패키지 임포트 === #
 
-import sys
-
-# === 서드파티 패키지 임포트 === #
-
-import psycopg2
+from types import MappingProxyType
 
 # === 사용자 정의 모듈 임포트 === #
 
-import database.database as db
+from constant.lookup import publish
 
-# === 상수 정의 === #
-
-GENDER          = {} # 성별 목록 (concept_name -> concept_id)
-REVERSED_GENDER = {} # 성별 목록 (concept_id -> concept_name)
+import database.database as db
 
 # === 함수 정의 === #
 
 def refreshGender() -> None:
     '''
-    GENDER와 REVERSED_GENDER 값을 갱신합니다.
+    GENDER와 REVERSED_GENDER를 새로 조회하여 조회 테이블 스냅샷을 교체합니다.
+
+    Raises:
+        psycopg2.DatabaseError: 데이터베이스 조회에 실패한 경우
     '''
 
-    try:
-        with db.connection.cursor() as cursor:
-            cursor.execute('''
-                SELECT c.concept_id, c.concept_name
-                FROM concept AS c JOIN (SELECT DISTINCT gender_concept_id FROM person) AS p
-                ON c.concept_id=p.gender_concept_id AND c.domain_id=%s
-            ''', ['Gender'])
-
-            for concept in cursor.fetchall():
-                GENDER[concept['concept_name']]        = concept['concept_id']
-                REVERSED_GENDER[concept['concept_id']] = concept['concept_name']
-    except psycopg2.DatabaseError as error:
-        db.connection.rollback()
-        sys.exit(error)
\ No newline at end of file
+    with db.connect() as connection, connection.cursor() as cursor:
+        cursor.execute('''
+            SELECT c.concept_id, c.concept_name
+            FROM concept AS c JOIN (SELECT DISTINCT gender_concept_id FROM person) AS p
+            ON c.concept_id=p.gender_concept_id AND c.domain_id=%s
+        ''', ['Gender'])
+
+        gender         = {}
+        reversedGender = {}
+
+        # 이름이 같은 개념이 여러 개일 경우, 공유 조회 테이블과 같이 가장 작은 concept_id로 조회합니다.
+        for concept in cursor.fetchall():
+            gender[concept['concept_name']] = min(gender.get(concept['concept_name'], concept['concept_id']), concept['concept_id'])
+            reversedGender[concept['concept_id']] = concept['concept_name']
+
+    publish(GENDER=MappingProxyType(gender), REVERSED_GENDER=MappingProxyType(reversedGender))
\ No newline at end of file
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from types  import MappingProxyType
+from typing import FrozenSet, Mapping, NamedTuple
+
+import threading
+
+# === 클래스 정의 === #
+
+class Lookup(NamedTuple):
+    '''
+    조회 테이블의 불변 스냅샷입니다.
+
+    갱신 함수는 새 테이블을 만든 후 publish로 스냅샷 전체를 교체하므로, 한 번 얻은 스냅샷은 이후 갱신의 영향을 받지 않습니다.
+    '''
+
+    VERSION: int = 0 # 스냅샷 버전 (내용이 바뀐 테이블로 교체될 때마다 1씩 증가)
+
+    CONDITION: Mapping[str, int]          = MappingProxyType({}) # 진단병명 목록 (concept_name -> concept_id)
+    REVERSED_CONDITION: Mapping[int, str] = MappingProxyType({}) # 진단병명 목록 (concept_id -> concept_name)
+
+    DRUG: Mapping[str, int]          = MappingProxyType({}) # 처방 의약품 목록 (concept_name -> concept_id)
+    REVERSED_DRUG: Mapping[int, str] = MappingProxyType({}) # 처방 의약품 목록 (concept_id -> concept_name)
+
+    ETHNICITY: FrozenSet[str] = frozenset() # 민족 목록
+
+    GENDER: Mapping[str, int]          = MappingProxyType({}) # 성별 목록 (concept_name -> concept_id)
+    REVERSED_GENDER: Mapping[int, str] = MappingProxyType({}) # 성별 목록 (concept_id -> concept_name)
+
+    RACE: Mapping[str, int]          = MappingProxyType({}) # 인종 목록 (concept_name -> concept_id)
+    REVERSED_RACE: Mapping[int, str] = MappingProxyType({}) # 인종 목록 (concept_id -> concept_name)
+
+    VISIT_TYPE: Mapping[str, int]          = MappingProxyType({}) # 방문 유형 목록 (concept_name -> concept_id)
+    REVERSED_VISIT_TYPE: Mapping[int, str] = MappingProxyType({}) # 방문 유형 목록 (concept_id -> concept_name)
+
+# === 전역 변수 정의 === #
+
+LOOKUP = Lookup() # 현재 조회 테이블 스냅샷
+
+lock = threading.Lock() # 스냅샷 교체 잠금
+
+# === 함수 정의 === #
+
+def getLookup() -> Lookup:
+    '''
+    현재 조회 테이블 스냅샷을 반환합니다.
+
+    요청 처리 중에는 이 함수로 얻은 스냅샷 하나만 사용해야, 도중에 갱신이 일어나도 일관된 값을 읽을 수 있습니다.
+
+    Returns:
+        lookup (Lookup): 조회 테이블 스냅샷
+    '''
+
+    return LOOKUP
+
+def publish(**tables: Mapping) -> Lookup:
+    '''
+    주어진 테이블을 반영한 새 스냅샷을 만들어 현재 스냅샷과 교체합니다.
+
+    VERSION은 응답 캐시와 검색 결과 개수 캐시의 키로 사용되므로, 주기적으로 다시 읽은 테이블의 내용이 기존과 같을 경우에는 올리지 않습니다.
+
+    Args:
+        **tables (Mapping): 교체할 테이블 (예: DRUG=..., REVERSED_DRUG=...)
+
+    Returns:
+        lookup (Lookup): 새 조회 테이블 스냅샷
+    '''
+
+    global LOOKUP
+
+    # 서로 다른 테이블을 동시에 갱신하더라도 변경 사항이 유실되지 않도록, 교체는 한 번에 하나씩 수행합니다.
+    with lock:
+        changed = any(getattr(LOOKUP, name) != table for name, table in tables.items())
+        LOOKUP  = LOOKUP._replace(VERSION=LOOKUP.VERSION + (1 if changed else 0), **tables)
+
+    return LOOKUP
@@ -4,39 +4,37 @@
 
 # === 표준 패키지 임포트 === #
 
-import sys
-
-# === 서드파티 패키지 임포트 === #
-
-import psycopg2
+from types import MappingProxyType
 
 # === 사용자 정의 모듈 임포트 === #
 
-import database.database as db
+from constant.lookup import publish
 
-# === 상수 정의 === #
-
-RACE          = {} # 인종 목록 (concept_name -> concept_id)
-REVERSED_RACE = {} # 인종 목록 (concept_id -> concept_name)
+import database.database as db
 
 # === 함수 정의 === #
 
 def refreshRace() -> None:
     '''
-    RACE와 REVERSED_RACE 값을 갱신합니다.
+    RACE와 REVERSED_RACE를 새로 조회하여 조회 테이블 스냅샷을 교체합니다.
+
+    Raises:
+        psycopg2.DatabaseError: 데이터베이스 조회에 실패한 경우
     '''
 
-    try:
-        with db.connection.cursor() as cursor:
-            cursor.execute('''
-                SELECT c.concept_id, c.concept_name
-                FROM concept AS c JOIN (SELECT DISTINCT race_concept_id FROM person) AS p
-                ON c.concept_id=p.race_concept_id AND c.domain_id=%s
-            ''', ['Race'])
-
-            for concept in cursor.fetchall():
-                RACE[concept['concept_name']]        = concept['concept_id']
-                REVERSED_RACE[concept['concept_id']] = concept['concept_name']
-    except psycopg2.DatabaseError as error:
-        db.connection.rollback()
-        sys.exit(error)
\ No newline at end of file
+    with db.connect() as connection, connection.cursor() as cursor:
+        cursor.execute('''
+            SELECT c.concept_id, c.concept_name
+            FROM concept AS c JOIN (SELECT DISTINCT race_concept_id FROM person) AS p
+            ON c.concept_id=p.race_concept_id AND c.domain_id=%s
+        ''', ['Race'])
+
+        race         = {}
+        reversedRace = {}
+
+        # 이름이 같은 개념이 여러 개일 경우, 공유 조회 테이블과 같이 가장 작은 concept_id로 조회합니다.
+        for concept in cursor.fetchall():
+            race[concept['concept_name']] = min(race.get(concept['concept_name'], concept['concept_id']), concept['concept_id'])
+            reversedRace[concept['concept_id']] = concept['concept_name']
+
+    publish(RACE=MappingProxyType(race), REVERSED_RACE=MappingProxyType(reversedRace))
\ No newline at end of file
@@ -0,0 +1,424 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from bisect          import bisect_left
+from collections.abc import Mapping, Set
+from contextlib      import contextmanager
+from typing          import Callable, Iterator, List
+
+import fcntl
+import mmap
+import os
+import struct
+import time
+
+# === 사용자 정의 모듈 임포트 === #
+
+from constant.lookup import Lookup, getLookup, publish
+
+import config.application
+
+# === 상수 정의 === #
+
+MAGIC = b'CDMLKUP1' # 공유 조회 테이블 파일 식별자
+
+HEADER    = struct.Struct('<8sQI4x')  # 식별자, 버전, 테이블 개수
+DIRECTORY = struct.Struct('<32sQQ')   # 테이블 이름, 항목 개수, 테이블 위치
+
+# 공유 조회 테이블에 기록하는 테이블 목록 ((정방향 테이블, 역방향 테이블), ...)
+SHARED_TABLE = [
+    ('CONDITION', 'REVERSED_CONDITION'),
+    ('DRUG', 'REVERSED_DRUG'),
+    ('GENDER', 'REVERSED_GENDER'),
+    ('RACE', 'REVERSED_RACE'),
+    ('VISIT_TYPE', 'REVERSED_VISIT_TYPE')
+]
+
+# 정방향 테이블 없이 이름 목록만 기록하는 테이블 목록
+SHARED_SET = ['ETHNICITY']
+
+FILE_NAME = 'lookup.bin'
+LOCK_NAME = 'lookup.lock'
+
+# === 클래스 정의 === #
+
+class SharedTable:
+    '''
+    메모리 맵에 기록된 (concept_id, concept_name) 테이블입니다.
+
+    테이블은 ID 오름차순의 ID 배열, 이름 위치 배열, 이름 정렬 순서 배열과 UTF-8 이름 문자열로 구성되며,
+    모든 조회는 메모리 맵을 복사하지 않고 이진 탐색으로 수행합니다.
+
+    Args:
+        buffer (memoryview): 메모리 맵 전체
+        offset (int): 테이블 시작 위치
+        size (int): 항목 개수
+    '''
+
+    def __init__(self, buffer: memoryview, offset: int, size: int) -> None:
+        self.size = size
+
+        idsEnd     = offset + 8 * size
+        offsetsEnd = idsEnd + 8 * (size + 1)
+        orderEnd   = offsetsEnd + 4 * size
+
+        self.ids     = buffer[offset:idsEnd].cast('q')
+        self.offsets = buffer[idsEnd:offsetsEnd].cast('Q')
+        self.order   = buffer[offsetsEnd:orderEnd].cast('I')
+        self.names   = buffer[orderEnd:orderEnd + (self.offsets[size] if size else 0)]
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SharedTable):
+            return NotImplemented
+
+        # 다시 기록된 파일의 테이블도 내용이 같으면 같은 테이블로 판단하며, 메모리 맵을 그대로 비교하므로 항목을 읽지 않습니다.
+        return self.size == other.size and self.ids == other.ids and self.offsets == other.offsets and self.names == other.names
+
+    def name(self, position: int) -> str:
+        '''
+        ID 순서상 position 번째 항목의 이름을 반환합니다.
+        '''
+
+        return str(self.names[self.offsets[position]:self.offsets[position + 1]], 'utf-8')
+
+    def encodedName(self, position: int) -> bytes:
+        '''
+        ID 순서상 position 번째 항목의 UTF-8 이름을 반환합니다.
+        '''
+
+        return bytes(self.names[self.offsets[position]:self.offsets[position + 1]])
+
+    def findID(self, itemID: int) -> int:
+        '''
+        itemID의 위치를 반환하며, 존재하지 않을 경우 -1을 반환합니다.
+        '''
+
+        position = bisect_left(self.ids, itemID)
+
+        return position if position < self.size and self.ids[position] == itemID else -1
+
+    def findName(self, name: str) -> int:
+        '''
+        name의 위치를 반환하며, 존재하지 않을 경우 -1을 반환합니다.
+
+        이름이 같은 항목이 여러 개일 경우, 정렬 순서상 가장 앞에 있는 (ID가 가장 작은) 항목의 위치를 반환합니다.
+        '''
+
+        key  = name.encode('utf-8')
+        low  = 0
+        high = self.size
+
+        while low < high:
+            middle = (low + high) // 2
+
+            if self.encodedName(self.order[middle]) < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < self.size and self.encodedName(self.order[low]) == key:
+            return self.order[low]
+
+        return -1
+
+    def distinctNames(self) -> Iterator[int]:
+        '''
+        이름 정렬 순서대로, 이름이 같은 항목 중 ID가 가장 작은 항목의 위치만 반환합니다.
+        '''
+
+        previous = None
+
+        for position in self.order:
+            name = self.encodedName(position)
+
+            if name != previous:
+                yield position
+
+            previous = name
+
+class SharedForward(Mapping):
+    '''
+    SharedTable의 이름 -> ID 조회 뷰입니다.
+    '''
+
+    def __init__(self, table: SharedTable) -> None:
+        self.table  = table
+        self.length = None # 중복을 제외한 이름 개수 (처음 조회할 때 계산)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, SharedForward):
+            return self.table == other.table
+
+        return super().__eq__(other)
+
+    def __getitem__(self, name: str) -> int:
+        position = self.table.findName(name) if isinstance(name, str) else -1
+
+        if position < 0:
+            raise KeyError(name)
+
+        return self.table.ids[position]
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.table.name(position) for position in self.table.distinctNames())
+
+    def __len__(self) -> int:
+        if self.length == None:
+            self.length = sum(1 for _ in self.table.distinctNames())
+
+        return self.length
+
+class SharedReverse(Mapping):
+    '''
+    SharedTable의 ID -> 이름 조회 뷰입니다.
+    '''
+
+    def __init__(self, table: SharedTable) -> None:
+        self.table = table
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, SharedReverse):
+            return self.table == other.table
+
+        return super().__eq__(other)
+
+    def __getitem__(self, itemID: int) -> str:
+        position = self.table.findID(itemID) if isinstance(itemID, int) else -1
+
+        if position < 0:
+            raise KeyError(itemID)
+
+        return self.table.name(position)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.table.ids)
+
+    def __len__(self) -> int:
+        return self.table.size
+
+class SharedSet(Set):
+    '''
+    SharedTable의 이름 집합 뷰입니다.
+    '''
+
+    def __init__(self, table: SharedTable) -> None:
+        self.table = table
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, SharedSet):
+            return self.table == other.table
+
+        return super().__eq__(other)
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self.table.findName(name) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.table.name(position) for position in self.table.order)
+
+    def __len__(self) -> int:
+        return self.table.size
+
+# === 전역 변수 정의 === #
+
+mapped = None # 현재 매핑된 공유 조회 테이블 파일 정보 ((st_dev, st_ino, st_mtime_ns), mmap)
+
+# === 함수 정의 === #
+
+def isEnabled() -> bool:
+    '''
+    공유 조회 테이블 사용 여부를 반환합니다.
+    '''
+
+    return config.application.config['shared_directory'] != None
+
+def getPath(name: str) -> str:
+    '''
+    공유 디렉터리 안의 파일 경로를 반환합니다.
+    '''
+
+    return os.path.join(config.application.config['shared_directory'], name)
+
+def encodeTable(items: List[tuple]) -> bytes:
+    '''
+    (ID, 이름) 목록을 SharedTable 형식으로 직렬화합니다.
+
+    Args:
+        items (List[tuple]): (ID, 이름) 목록
+
+    Returns:
+        table (bytes): 직렬화된 테이블
+    '''
+
+    items   = sorted(items)
+    names   = [name.encode('utf-8') for _, name in items]
+    offsets = [0]
+
+    for name in names:
+        offsets.append(offsets[-1] + len(name))
+
+    # 이름이 같은 항목은 ID 오름차순으로 배치하여, 이름 -> ID 조회가 항상 가장 작은 ID를 반환하도록 합니다 (constant/*.py와 동일).
+    order = sorted(range(len(items)), key=lambda position: (names[position], items[position][0]))
+    size  = len(items)
+
+    return b''.join([
+        struct.pack(f'<{size}q', *(itemID for itemID, _ in items)),
+        struct.pack(f'<{size + 1}Q', *offsets),
+        struct.pack(f'<{size}I', *order),
+        b''.join(names)
+    ])
+
+def writeSharedLookup(lookup: Lookup) -> None:
+    '''
+    조회 테이블 스냅샷을 공유 조회 테이블 파일로 기록합니다.
+
+    임시 파일에 기록한 후 이름을 바꾸므로, 이미 파일을 매핑한 프로세스는 기존 내용을 계속 읽을 수 있습니다.
+
+    Args:
+        lookup (Lookup): 조회 테이블 스냅샷
+    '''
+
+    tables = []
+
+    for forward, reverse in SHARED_TABLE:
+        tables.append((forward, list(getattr(lookup, reverse).items())))
+
+    for name in SHARED_SET:
+        tables.append((name, list(enumerate(sorted(value for value in getattr(lookup, name) if value != None)))))
+
+    # --- 테이블 배치 --- #
+
+    offset    = HEADER.size + DIRECTORY.size * len(tables)
+    directory = []
+    regions   = []
+
+    for name, items in tables:
+        region  = encodeTable(items)
+        padding = -offset % 8
+
+        directory.append(DIRECTORY.pack(name.encode(), len(items), offset + padding))
+        regions.append(b'\0' * padding + region)
+
+        offset += padding + len(region)
+
+    # --- 파일 기록 --- #
+
+    path      = getPath(FILE_NAME)
+    temporary = f'{path}.{os.getpid()}'
+
+    with open(temporary, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, time.time_ns(), len(tables)))
+        file.write(b''.join(directory))
+        file.write(b''.join(regions))
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(temporary, path)
+
+def loadSharedLookup() -> bool:
+    '''
+    공유 조회 테이블 파일이 바뀌었을 경우 새로 매핑한 후, 조회 테이블 스냅샷을 공유 테이블 뷰로 교체합니다.
+
+    Returns:
+        loaded (bool): 새로 매핑했는지 여부
+    '''
+
+    global mapped
+
+    path = getPath(FILE_NAME)
+
+    try:
+        status = os.stat(path)
+    except FileNotFoundError:
+        return False
+
+    identity = (status.st_dev, status.st_ino, status.st_mtime_ns)
+
+    if mapped != None and mapped[0] == identity:
+        return False
+
+    with open(path, 'rb') as file:
+        memory = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    buffer = memoryview(memory)
+
+    magic, _, count = HEADER.unpack_from(buffer, 0)
+
+    if magic != MAGIC:
+        raise ValueError(f'invalid shared lookup file: {path}')
+
+    tables = {}
+
+    for index in range(count):
+        name, size, offset = DIRECTORY.unpack_from(buffer, HEADER.size + DIRECTORY.size * index)
+        name               = name.rstrip(b'\0').decode()
+        table              = SharedTable(buffer, offset, size)
+
+        if name in SHARED_SET:
+            tables[name] = SharedSet(table)
+        else:
+            reverse = dict(SHARED_TABLE)[name]
+
+            tables[name]    = SharedForward(table)
+            tables[reverse] = SharedReverse(table)
+
+    publish(**tables)
+
+    # 이전 매핑은 기존 스냅샷을 읽는 요청이 모두 끝나 참조가 사라지면 해제됩니다.
+    mapped = (identity, memory)
+
+    return True
+
+@contextmanager
+def refreshLock(blocking: bool, name: str = LOCK_NAME) -> Iterator[bool]:
+    '''
+    공유 디렉터리의 갱신 잠금을 얻는 컨텍스트 매니저입니다. 잠금을 얻은 하나의 프로세스만 공유 파일을 갱신합니다.
+
+    Args:
+        blocking (bool): 잠금을 얻을 때까지 대기할지 여부
+        name (str, opt, default=LOCK_NAME): 잠금 파일 이름 (기본 값은 공유 조회 테이블 갱신 잠금)
+
+    Yields:
+        acquired (bool): 잠금을 얻었는지 여부
+    '''
+
+    with open(getPath(name), 'a') as file:
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+
+        try:
+            yield True
+        finally:
+            fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+def synchronizeLookup(refreshers: List[Callable[[], None]], blocking: bool = False) -> None:
+    '''
+    공유 조회 테이블을 갱신하거나, 다른 프로세스가 갱신한 테이블을 매핑합니다.
+
+    잠금을 얻은 하나의 프로세스만 데이터베이스를 조회하여 파일을 기록하며, 파일이 갱신 주기의 절반보다 최근에 기록되었을 경우에는 조회를 생략합니다.
+
+    Args:
+        refreshers (List[Callable[[], None]]): 조회 테이블 갱신 함수 목록
+        blocking (bool, opt, default=False): 다른 프로세스의 갱신이 끝날 때까지 대기할지 여부
+    '''
+
+    with refreshLock(blocking) as acquired:
+        if acquired:
+            try:
+                age = time.time() - os.stat(getPath(FILE_NAME)).st_mtime
+            except FileNotFoundError:
+                age = None
+
+            if age == None or age >= config.application.config['shared_refresh_interval'] / 2:
+                for refresher in refreshers:
+                    refresher()
+
+                writeSharedLookup(getLookup())
+
+    loadSharedLookup()
@@ -8,5 +8,7 @@ STATUS_CODE = {
     'SUCCESS': 200,
     'INVALID_DATA': 400,
     'STATUS_ERROR': 500,
-    'DATABASE_ERROR': 500
+    'DATABASE_ERROR': 500,
+    'NOT_READY': 503,
+    'OVERLOADED': 503
 }
\ No newline at end of file
@@ -2,14 +2,54 @@
 #
 # Copyright (c) Sangsu Ryu
 
+# === 표준 패키지 임포트 === #
+
+from contextlib import contextmanager
+from typing     import Iterator
+
+import contextvars
+
 # === 서드파티 패키지 임포트 === #
 
-import psycopg2
+import psycopg2.extensions
 
 # === 사용자 정의 모듈 임포트 === #
 
+from database.pool  import ConnectionPool
+from database.query import PreparingConnection, TimingCursor
+
 import config.database
 
 # === 전역 변수 정의 === #
 
-connection = psycopg2.connect(**config.database.config)
\ No newline at end of file
+# 검색 쿼리를 준비된 쿼리로 실행할 수 있도록 준비된 쿼리 목록을 기억하는 커넥션을 사용하며,
+# 요청별 지표에 데이터베이스 시간과 행 개수를 기록하는 커서를 사용합니다.
+pool = ConnectionPool(
+    { **config.database.config, 'connection_factory': PreparingConnection, 'cursor_factory': TimingCursor },
+    **config.database.poolConfig
+)
+
+statementTimeout = contextvars.ContextVar('statement_timeout', default=None) # 현재 요청의 statement_timeout (초, None일 경우 서버 설정)
+
+# === 함수 정의 === #
+
+@contextmanager
+def connect() -> Iterator[psycopg2.extensions.connection]:
+    '''
+    커넥션 풀에서 커넥션을 할당받는 컨텍스트 매니저입니다.
+
+    현재 요청에 statement_timeout이 지정되어 있을 경우 (utility.admission), 블록의 트랜잭션에만 적용되도록 SET LOCAL로 설정합니다.
+    블록이 끝나면 트랜잭션을 정리한 후 커넥션을 풀에 반환합니다.
+
+    Yields:
+        connection (psycopg2.extensions.connection): 커넥션
+    '''
+
+    timeout = statementTimeout.get()
+
+    with pool.connection() as connection:
+        if timeout != None:
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL statement_timeout = %s', [max(int(timeout * 1000), 1)])
+
+        yield connection
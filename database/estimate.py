@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from collections import Counter
+from datetime    import date, datetime
+from typing      import Any, Callable, Optional, Tuple
+
+import math
+
+# === 사용자 정의 모듈 임포트 === #
+
+import config.application
+import database.database as db
+
+# === 상수 정의 === #
+
+ACCURACY = ['exact', 'approx'] # 통계 라우터의 정확도 (정확한 집계 | 추정)
+
+CONFIDENCE_LEVEL = 0.95 # 표본 추정의 신뢰 수준
+Z_SCORE          = 1.96 # 신뢰 수준에 해당하는 표준 정규 분포의 분위수
+
+COVERAGE_TOLERANCE = 0.01 # 최빈값 목록이 포함하지 못한 행의 비율이 이 값을 넘으면 표본 추정을 사용
+
+# 만 나이의 10살 단위 연령대 (통계 스냅샷과 같은 계산이며, 출생일이 미래이면 NULL)
+AGE = "CASE WHEN {0}.birth_datetime::date <= %s THEN (EXTRACT(YEAR FROM AGE(%s, {0}.birth_datetime::date))::int / 10) * 10 END"
+
+# 환자 통계 이름별 열 이름
+PERSON_COLUMN = {
+    'gender': 'gender_concept_id',
+    'race': 'race_concept_id',
+    'ethnicity': 'ethnicity_source_value'
+}
+
+# === 함수 정의 === #
+
+def toLocalTime(timestamp: Optional[datetime]) -> datetime:
+    '''
+    통계 테이블의 timestamptz 값을 통계 스냅샷과 같은 naive 지역 시각으로 변환합니다. 값이 없을 경우 (통계를 갱신한 적이 없는 경우) 현재 시각을 반환합니다.
+
+    Args:
+        timestamp (Optional[datetime]): 시간대가 있는 시각
+
+    Returns:
+        timestamp (datetime): 시간대가 없는 지역 시각
+    '''
+
+    if timestamp == None:
+        return datetime.now()
+
+    if timestamp.tzinfo == None:
+        return timestamp
+
+    return timestamp.astimezone().replace(tzinfo=None)
+
+def estimateTotal(table: str) -> Tuple[int, dict]:
+    '''
+    테이블의 전체 행 개수를 플래너 통계 (pg_class.reltuples)로 추정합니다. 통계가 없을 경우 (ANALYZE 이전) 표본으로 추정합니다.
+
+    Args:
+        table (str): 테이블 이름
+
+    Returns:
+        count (int): 추정 행 개수
+        estimate (dict): 추정 방법, 추정 시각 (통계를 갱신한 시각)
+
+    Raises:
+        psycopg2.DatabaseError: 데이터베이스 조회에 실패한 경우
+    '''
+
+    with db.connect() as connection, connection.cursor() as cursor:
+        cursor.execute('''
+            SELECT c.reltuples, GREATEST(u.last_vacuum, u.last_autovacuum, u.last_analyze, u.last_autoanalyze) AS updated_at
+            FROM pg_class AS c
+                JOIN pg_namespace AS n ON n.oid=c.relnamespace
+                LEFT JOIN pg_stat_user_tables AS u ON u.relid=c.oid
+            WHERE n.nspname=current_schema() AND c.relname=%s
+        ''', [table])
+
+        statistic = cursor.fetchone()
+
+    # PostgreSQL 14부터 한 번도 VACUUM, ANALYZE되지 않은 테이블의 reltuples는 -1입니다.
+    if statistic == None or statistic['reltuples'] < 0:
+        counts, estimate = sampleCounts(table, 'NULL')
+
+        return counts.get(None, 0), estimate
+
+    return int(statistic['reltuples']), {
+        'method': 'reltuples',
+        'timestamp': toLocalTime(statistic['updated_at'])
+    }
+
+def estimateFrequency(table: str, column: str, convert: Callable[[str], Any] = str) -> Tuple[Counter, dict]:
+    '''
+    한 열의 값별 행 개수를 플래너 통계 (pg_stats의 최빈값 빈도, NULL 비율과 pg_class.reltuples)로 추정합니다.
+
+    최빈값 목록이 열의 대부분을 포함하지 못할 경우 (고유 값이 많은 열) 또는 통계가 없을 경우, 표본으로 추정합니다.
+
+    Args:
+        table (str): 테이블 이름
+        column (str): 열 이름
+        convert (Callable[[str], Any]): pg_stats의 문자열 값을 열의 값으로 변환하는 함수
+
+    Returns:
+        counts (Counter): 값별 추정 행 개수 (NULL은 None)
+        estimate (dict): 추정 방법, 추정 시각 (통계를 갱신한 시각)
+
+    Raises:
+        psycopg2.DatabaseError: 데이터베이스 조회에 실패한 경우
+    '''
+
+    with db.connect() as connection, connection.cursor() as cursor:
+        cursor.execute('''
+            SELECT c.reltuples, s.null_frac, s.most_common_vals::text::text[] AS common_values, s.most_common_freqs AS common_frequencies,
+                   GREATEST(u.last_analyze, u.last_autoanalyze) AS analyzed_at
+            FROM pg_class AS c
+                JOIN pg_namespace AS n ON n.oid=c.relnamespace
+                JOIN pg_stats AS s ON s.schemaname=n.nspname AND s.tablename=c.relname AND s.attname=%s AND NOT s.inherited
+                LEFT JOIN pg_stat_user_tables AS u ON u.relid=c.oid
+            WHERE n.nspname=current_schema() AND c.relname=%s
+        ''', [column, table])
+
+        statistic = cursor.fetchone()
+
+    if statistic == None or statistic['reltuples'] < 0 or statistic['common_values'] == None:
+        return sampleCounts(table, f't.{column}')
+
+    if 1 - statistic['null_frac'] - sum(statistic['common_frequencies']) > COVERAGE_TOLERANCE:
+        return sampleCounts(table, f't.{column}')
+
+    counts = Counter({
+        convert(value): round(frequency * statistic['reltuples']) for value, frequency in zip(statistic['common_values'], statistic['common_frequencies'])
+    })
+
+    if statistic['null_frac'] > 0:
+        counts[None] = round(statistic['null_frac'] * statistic['reltuples'])
+
+    return counts, {
+        'method': 'pg_stats',
+        'timestamp': toLocalTime(statistic['analyzed_at'])
+    }
+
+def sampleCounts(table: str, value: str, join: str = '', argument: list = []) -> Tuple[Counter, dict]:
+    '''
+    TABLESAMPLE SYSTEM으로 읽은 페이지의 행을 값별로 세어, 값별 행 개수와 신뢰 구간을 추정합니다.
+
+    테이블 크기와 관계없이 약 CDM_LOOKUP_STATISTIC_SAMPLE_PAGES개의 페이지만 읽도록 표본 비율을 정합니다.
+    SYSTEM 표본은 페이지 단위로 뽑히므로, 행이 아닌 페이지를 표본 단위로 보는 Horvitz-Thompson 추정량과 분산으로 신뢰 구간을 계산합니다.
+
+    Args:
+        table (str): 표본을 뽑을 테이블 이름 (쿼리에서 t로 참조)
+        value (str): 값을 계산하는 SQL 식
+        join (str, opt, default=''): 표본 테이블에 결합할 구문
+        argument (list, opt, default=[]): value와 join 구문의 인자
+
+    Returns:
+        counts (Counter): 값별 추정 행 개수
+        estimate (dict): 추정 방법, 추정 시각, 값별 신뢰 구간과 표본 비율 (%)
+
+    Raises:
+        psycopg2.DatabaseError: 데이터베이스 조회에 실패한 경우
+    '''
+
+    samplePages = config.application.config['statistic_sample_pages']
+
+    with db.connect() as connection, connection.cursor() as cursor:
+        cursor.execute("SELECT pg_relation_size(%s::regclass) / current_setting('block_size')::int AS pages", [table])
+
+        pages   = cursor.fetchone()['pages']
+        percent = 100.0 if pages <= samplePages else samplePages * 100 / pages
+
+        cursor.execute(f'''
+            SELECT (t.ctid::text::point)[0] AS page, {value} AS value, COUNT(*) AS count
+            FROM {table} AS t TABLESAMPLE SYSTEM (%s) {join}
+            GROUP BY 1, 2
+        ''', [*argument, percent])
+
+        groups = cursor.fetchall()
+
+    probability = percent / 100
+    totals      = Counter()
+    squares     = Counter()
+
+    for group in groups:
+        totals[group['value']]  += group['count']
+        squares[group['value']] += group['count'] ** 2
+
+    counts    = Counter()
+    intervals = {}
+
+    for key, total in totals.items():
+        count    = total / probability
+        variance = (1 - probability) / probability ** 2 * squares[key]
+        margin   = Z_SCORE * math.sqrt(variance)
+
+        counts[key]    = round(count)
+        intervals[key] = [max(total, math.floor(count - margin)), math.ceil(count + margin)]
+
+    return counts, {
+        'method': 'tablesample',
+        'timestamp': datetime.now(),
+        'intervals': intervals,
+        'sample_percent': round(percent, 4)
+    }
+
+def estimatePerson(name: str) -> Tuple[Any, dict]:
+    '''
+    환자 통계를 추정합니다. 전체 환자 수와 사망 환자 수는 reltuples로, 성별, 인종, 민족은 pg_stats로, 연령대는 표본으로 추정합니다.
+
+    Args:
+        name ('count' | 'death' | 'gender' | 'race' | 'ethnicity' | 'age'): 통계 이름
+
+    Returns:
+        counts (Any): 추정 환자 수 또는 값별 추정 환자 수
+        estimate (dict): 추정 방법과 추정 시각 (표본 추정의 경우 신뢰 구간과 표본 비율 포함)
+
+    Raises:
+        psycopg2.DatabaseError: 데이터베이스 조회에 실패한 경우
+    '''
+
+    if name == 'count':
+        return estimateTotal('person')
+
+    if name == 'death':
+        return estimateTotal('death')
+
+    if name == 'age':
+        today            = date.today()
+        counts, estimate = sampleCounts('person', AGE.format('t'), argument=[today, today])
+
+        counts.pop(None, None)
+        estimate['intervals'].pop(None, None)
+
+        return counts, estimate
+
+    column = PERSON_COLUMN[name]
+
+    return estimateFrequency('person', column, int if column.endswith('_concept_id') else str)
+
+def estimateVisit(name: str) -> Tuple[Counter, dict]:
+    '''
+    방문 통계를 추정합니다. 방문 유형은 pg_stats로, 환자의 성별, 인종, 민족, 연령대별 방문 수는 방문 표본과 환자를 결합하여 추정합니다.
+
+    Args:
+        name ('visit_type' | 'gender' | 'race' | 'ethnicity' | 'age'): 통계 이름
+
+    Returns:
+        counts (Counter): 값별 추정 방문 수
+        estimate (dict): 추정 방법과 추정 시각 (표본 추정의 경우 신뢰 구간과 표본 비율 포함)
+
+    Raises:
+        psycopg2.DatabaseError: 데이터베이스 조회에 실패한 경우
+    '''
+
+    if name == 'visit_type':
+        return estimateFrequency('visit_occurrence', 'visit_concept_id', int)
+
+    join = 'JOIN person AS p ON p.person_id=t.person_id'
+
+    if name == 'age':
+        today            = date.today()
+        counts, estimate = sampleCounts('visit_occurrence', AGE.format('p'), join, [today, today])
+
+        counts.pop(None, None)
+        estimate['intervals'].pop(None, None)
+
+        return counts, estimate
+
+    return sampleCounts('visit_occurrence', f'p.{PERSON_COLUMN[name]}', join)
+
+def describeCount(snapshot: dict, value: Any) -> dict:
+    '''
+    값 하나를 조회한 응답에 추가할 계산 방법과 신뢰 구간을 반환합니다.
+
+    Args:
+        snapshot (dict): 통계 스냅샷, person 테이블 스냅샷 또는 추정 결과
+        value (Any): 조회한 값 (전체 행 개수의 경우 None)
+
+    Returns:
+        description (dict): 계산 방법 (exact | reltuples | pg_stats | tablesample)과 표본 추정의 신뢰 구간 (표본에 없는 값은 None)
+    '''
+
+    if snapshot.get('intervals') == None:
+        return { 'method': snapshot.get('method', 'exact') }
+
+    return {
+        'method': snapshot['method'],
+        'confidence_interval': snapshot['intervals'].get(value),
+        'confidence_level': CONFIDENCE_LEVEL,
+        'sample_percent': snapshot['sample_percent']
+    }
+
+def describeCounts(snapshot: dict, name: Callable[[Any], Any] = lambda value: value) -> dict:
+    '''
+    값별 개수를 조회한 응답에 추가할 계산 방법과 신뢰 구간을 반환합니다.
+
+    Args:
+        snapshot (dict): 통계 스냅샷, person 테이블 스냅샷 또는 추정 결과
+        name (Callable[[Any], Any]): 값을 응답의 키로 변환하는 함수
+
+    Returns:
+        description (dict): 계산 방법 (exact | reltuples | pg_stats | tablesample)과 표본 추정의 값별 신뢰 구간
+    '''
+
+    if snapshot.get('intervals') == None:
+        return { 'method': snapshot.get('method', 'exact') }
+
+    return {
+        'method': snapshot['method'],
+        'confidence_intervals': { name(value): interval for value, interval in snapshot['intervals'].items() },
+        'confidence_level': CONFIDENCE_LEVEL,
+        'sample_percent': snapshot['sample_percent']
+    }
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing             import Dict, NamedTuple
+
+import contextvars
+import threading
+import time
+
+# === 서드파티 패키지 임포트 === #
+
+import psycopg2.extensions
+
+# === 사용자 정의 모듈 임포트 === #
+
+import config.database
+import database.database as db
+
+# === 클래스 정의 === #
+
+class DeadlineExceededError(psycopg2.extensions.QueryCanceledError):
+    '''
+    요청의 제한 시간 안에 쿼리가 끝나지 않았을 때 발생하는 예외입니다.
+    '''
+
+class Statement(NamedTuple):
+    '''
+    동시에 실행할 쿼리입니다.
+    '''
+
+    query: str          # 조회 쿼리
+    argument: list = [] # 조회 쿼리 인자
+
+class FanOutResult(NamedTuple):
+    '''
+    동시에 실행한 쿼리의 결과입니다.
+    '''
+
+    rows: Dict[str, list]     # 쿼리 이름별 조회된 행 목록
+    timings: Dict[str, float] # 쿼리 이름별 실행 시간 (초, 커넥션 할당 대기 시간 포함)
+
+# === 전역 변수 정의 === #
+
+executor = ThreadPoolExecutor(max_workers=config.database.executorConfig['workers'], thread_name_prefix='query')
+
+# === 함수 정의 === #
+
+def fanOut(statements: Dict[str, Statement], deadline: float = None) -> FanOutResult:
+    '''
+    서로 독립적인 쿼리를 각각 다른 커넥션에서 동시에 실행합니다.
+
+    모든 쿼리는 deadline 안에 끝나야 하며 (남은 시간을 statement_timeout으로 설정), 하나라도 실패하거나 제한 시간이 지나면
+    실행 중인 나머지 쿼리를 취소하고 예외를 다시 발생시킵니다. 따라서 요청의 지연 시간은 쿼리 시간의 합이 아닌 가장 느린 쿼리의 시간이 됩니다.
+
+    Args:
+        statements (Dict[str, Statement]): 쿼리 이름과 쿼리
+        deadline (float, opt, default=None): 제한 시간 (초, None일 경우 CDM_LOOKUP_DATABASE_QUERY_DEADLINE이며, 요청의 statement_timeout이 더 짧을 경우 statement_timeout)
+
+    Returns:
+        result (FanOutResult): 쿼리 이름별 조회된 행 목록과 실행 시간
+
+    Raises:
+        psycopg2.DatabaseError: 쿼리 실행에 실패한 경우 (제한 시간이 지난 경우 DeadlineExceededError)
+    '''
+
+    if deadline == None:
+        deadline = config.database.executorConfig['deadline']
+
+    # 요청의 비용 등급에 statement_timeout이 지정되어 있을 경우, 더 짧은 쪽을 제한 시간으로 사용합니다.
+    if db.statementTimeout.get() != None:
+        deadline = min(deadline, db.statementTimeout.get())
+
+    expires   = time.monotonic() + deadline
+    cancelled = threading.Event()
+    lock      = threading.Lock()
+    active    = {} # 쿼리를 실행 중인 커넥션 (쿼리 이름 -> 커넥션)
+    timings   = {}
+
+    def run(name: str, statement: Statement) -> list:
+        start = time.monotonic()
+
+        with db.connect() as connection:
+            with lock:
+                if cancelled.is_set():
+                    raise psycopg2.extensions.QueryCanceledError(f'query {name} cancelled')
+
+                active[name] = connection
+
+            try:
+                with connection.cursor() as cursor:
+                    remaining = expires - time.monotonic()
+
+                    if remaining <= 0:
+                        raise DeadlineExceededError(f'query {name} exceeded the deadline of {deadline}s')
+
+                    cursor.execute('SET LOCAL statement_timeout = %s', [max(int(remaining * 1000), 1)])
+                    cursor.execute(statement.query, statement.argument)
+
+                    rows = cursor.fetchall()
+            finally:
+                with lock:
+                    active.pop(name, None)
+
+        timings[name] = round(time.monotonic() - start, 6)
+
+        return rows
+
+    # 쿼리 시간이 요청의 지표에 기록되도록, 요청의 컨텍스트에서 쿼리를 실행합니다.
+    futures = {
+        name: executor.submit(contextvars.copy_context().run, run, name, statement) for name, statement in statements.items()
+    }
+
+    done, pending = wait(futures.values(), timeout=max(expires - time.monotonic(), 0), return_when=FIRST_EXCEPTION)
+    error         = next((future.exception() for future in done if future.exception() != None), None)
+
+    if error == None and pending:
+        error = DeadlineExceededError(f'queries exceeded the deadline of {deadline}s')
+
+    if error != None:
+        # 아직 시작하지 않은 쿼리는 실행하지 않고, 실행 중인 쿼리는 서버에 취소를 요청합니다.
+        cancelled.set()
+
+        for future in pending:
+            future.cancel()
+
+        with lock:
+            for connection in active.values():
+                connection.cancel()
+
+        raise error
+
+    return FanOutResult({ name: future.result() for name, future in futures.items() }, timings)
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from typing import Dict, List, NamedTuple, Tuple
+
+import argparse
+import re
+import sys
+
+# === 서드파티 패키지 임포트 === #
+
+import psycopg2
+import psycopg2.errors
+import psycopg2.extensions
+
+# === 사용자 정의 모듈 임포트 === #
+
+import config.database
+
+# === 클래스 정의 === #
+
+class Index(NamedTuple):
+    '''
+    라우터의 쿼리가 사용하는 인덱스입니다.
+    '''
+
+    table: str               # 테이블 이름
+    columns: Tuple[str, ...] # 인덱스 열 (연산자 클래스 포함)
+    reason: str              # 인덱스를 사용하는 쿼리
+    method: str = 'btree'    # 인덱스 방식
+
+    @property
+    def name(self) -> str:
+        '''
+        인덱스 이름을 반환합니다 (PostgreSQL 식별자 길이 제한인 63자 이내).
+        '''
+
+        name = f'cdm_lookup_{self.table}_' + '_'.join(column.split()[0] for column in self.columns)
+
+        return (name + ('_trgm' if self.method == 'gin' else ''))[:63]
+
+    @property
+    def definition(self) -> str:
+        '''
+        인덱스 생성 쿼리를 반환합니다.
+        '''
+
+        return f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {self.name} ON {self.table} USING {self.method} ({", ".join(self.columns)})'
+
+# === 상수 정의 === #
+
+# 라우터의 쿼리 형태 (조건 열, 정렬 키, 키셋 커서)별로 필요한 인덱스
+# 조건 열 뒤에 정렬 키를 붙여, 조건이 주어진 페이지 조회도 정렬 없이 LIMIT만큼 읽고 멈출 수 있도록 합니다.
+INDEX = [
+    # concept
+    Index('concept', ('concept_id',), '/search/concept (concept_id > %s ORDER BY concept_id, concept_id = ANY(%s))'),
+    Index('concept', ('domain_id', 'concept_id'), 'constant/* (c.concept_id = ... AND c.domain_id = %s)'),
+    Index('concept', ('concept_name gin_trgm_ops',), '/search/concept (concept_name LIKE %keyword%)', 'gin'),
+
+    # person
+    Index('person', ('person_id',), '/search/person (person_id > %s ORDER BY person_id), /search/batch, /search/person/<id>/timeline'),
+    Index('person', ('birth_datetime',), '/search/person (birth_datetime = %s)'),
+
+    # visit_occurrence
+    Index('visit_occurrence', ('visit_occurrence_id',), '/search/visit (visit_occurrence_id > %s ORDER BY visit_occurrence_id)'),
+    Index('visit_occurrence', ('person_id', 'visit_start_datetime', 'visit_occurrence_id'), '/search/visit (person_id = %s), /search/batch, timeline (ORDER BY visit_start_datetime, visit_occurrence_id)'),
+    Index('visit_occurrence', ('visit_concept_id', 'visit_occurrence_id'), '/search/visit (visit_concept_id = %s ORDER BY visit_occurrence_id)'),
+    Index('visit_occurrence', ('visit_start_datetime',), '/search/visit (visit_start_datetime >= %s AND visit_end_datetime <= %s)'),
+
+    # condition_occurrence
+    Index('condition_occurrence', ('person_id', 'condition_occurrence_id'), '/search/condition ((person_id, condition_occurrence_id) > (%s, %s) ORDER BY person_id, condition_occurrence_id), /search/batch'),
+    Index('condition_occurrence', ('person_id', 'condition_start_datetime', 'condition_occurrence_id'), 'timeline (person_id = %s ORDER BY condition_start_datetime, condition_occurrence_id)'),
+    Index('condition_occurrence', ('visit_occurrence_id',), '/search/condition (visit_occurrence_id = %s)'),
+    Index('condition_occurrence', ('condition_concept_id', 'person_id', 'condition_occurrence_id'), '/search/condition (condition_concept_id = %s ORDER BY person_id, condition_occurrence_id)'),
+    Index('condition_occurrence', ('condition_start_datetime',), '/search/condition (condition_start_datetime >= %s AND condition_end_datetime <= %s)'),
+
+    # drug_exposure
+    Index('drug_exposure', ('person_id', 'drug_exposure_id'), '/search/drug ((person_id, drug_exposure_id) > (%s, %s) ORDER BY person_id, drug_exposure_id), /search/batch'),
+    Index('drug_exposure', ('person_id', 'drug_exposure_start_datetime', 'drug_exposure_id'), 'timeline (person_id = %s ORDER BY drug_exposure_start_datetime, drug_exposure_id)'),
+    Index('drug_exposure', ('visit_occurrence_id',), '/search/drug (visit_occurrence_id = %s)'),
+    Index('drug_exposure', ('drug_concept_id', 'person_id', 'drug_exposure_id'), '/search/drug (drug_concept_id = %s ORDER BY person_id, drug_exposure_id)'),
+    Index('drug_exposure', ('drug_exposure_start_datetime',), '/search/drug (drug_exposure_start_datetime >= %s AND drug_exposure_end_datetime <= %s)'),
+
+    # death
+    Index('death', ('person_id',), '/search/death (person_id > %s ORDER BY person_id), /search/batch, timeline'),
+    Index('death', ('death_date',), '/search/death (death_date = %s)')
+]
+
+TABLE = sorted({ index.table for index in INDEX }) # 라우터가 조회하는 테이블 목록
+
+INDEX_COLUMN  = re.compile(r'USING (\w+) \((.*)\)$') # pg_get_indexdef 결과의 인덱스 방식과 열 목록
+INDEX_INCLUDE = re.compile(r' INCLUDE \([^)]*\)$')  # pg_get_indexdef 결과의 INCLUDE 구문
+
+# === 함수 정의 === #
+
+def loadIndexes(cursor: psycopg2.extensions.cursor) -> List[dict]:
+    '''
+    라우터가 조회하는 테이블에 존재하는 인덱스를 반환합니다.
+
+    Args:
+        cursor (psycopg2.extensions.cursor): 커서
+
+    Returns:
+        indexes (List[dict]): 인덱스 이름, 테이블, 인덱스 방식, 열 목록, 유효 여부 (CONCURRENTLY 생성에 실패한 인덱스는 유효하지 않음)와 부분 인덱스 여부
+    '''
+
+    cursor.execute('''
+        SELECT c.relname AS name, t.relname AS table, i.indisvalid AS valid, i.indpred IS NOT NULL AS partial,
+               pg_get_indexdef(i.indexrelid) AS definition
+        FROM pg_index AS i
+            JOIN pg_class AS c ON c.oid=i.indexrelid
+            JOIN pg_class AS t ON t.oid=i.indrelid
+            JOIN pg_namespace AS n ON n.oid=t.relnamespace
+        WHERE n.nspname=current_schema() AND t.relname=ANY(%s)
+    ''', [TABLE])
+
+    indexes = []
+
+    for index in cursor.fetchall():
+        # INCLUDE 열은 검색에 사용되지 않으므로 제외합니다.
+        match = INDEX_COLUMN.search(INDEX_INCLUDE.sub('', index['definition'].split(' WHERE ')[0]))
+
+        if match == None:
+            continue
+
+        indexes.append({
+            'name': index['name'],
+            'table': index['table'],
+            'method': match.group(1),
+            'columns': tuple(column.strip().lower() for column in match.group(2).split(',')),
+            'valid': index['valid'],
+            'partial': index['partial']
+        })
+
+    return indexes
+
+def findIndex(required: Index, indexes: List[dict]) -> dict:
+    '''
+    필요한 인덱스를 대신할 수 있는 인덱스를 찾습니다.
+
+    인덱스 방식이 같고, 필요한 열이 앞부분에 같은 순서로 있는 유효한 전체 인덱스를 대신할 수 있는 인덱스로 봅니다 (이름은 비교하지 않음).
+
+    Args:
+        required (Index): 필요한 인덱스
+        indexes (List[dict]): 존재하는 인덱스 목록
+
+    Returns:
+        index (dict): 대신할 수 있는 인덱스 (없을 경우 None)
+    '''
+
+    columns = tuple(column.lower() for column in required.columns)
+
+    for index in indexes:
+        if (
+            index['table'] == required.table and index['method'] == required.method and index['valid'] and not index['partial']
+            and index['columns'][:len(columns)] == columns
+        ):
+            return index
+
+    return None
+
+def loadUnusedIndexes(cursor: psycopg2.extensions.cursor) -> List[dict]:
+    '''
+    통계가 초기화된 이후 한 번도 사용되지 않은 인덱스를 반환합니다. 제약 조건을 위한 인덱스 (기본 키, 유일 인덱스)는 제외합니다.
+
+    Args:
+        cursor (psycopg2.extensions.cursor): 커서
+
+    Returns:
+        indexes (List[dict]): 인덱스 이름, 테이블, 크기 (바이트)
+    '''
+
+    cursor.execute('''
+        SELECT s.indexrelname AS name, s.relname AS table, pg_relation_size(s.indexrelid) AS size
+        FROM pg_stat_user_indexes AS s JOIN pg_index AS i ON i.indexrelid=s.indexrelid
+        WHERE s.schemaname=current_schema() AND s.relname=ANY(%s) AND s.idx_scan=0 AND NOT i.indisunique AND NOT i.indisprimary
+        ORDER BY pg_relation_size(s.indexrelid) DESC
+    ''', [TABLE])
+
+    return cursor.fetchall()
+
+def check(cursor: psycopg2.extensions.cursor) -> Dict[str, list]:
+    '''
+    필요한 인덱스가 존재하는지 확인합니다.
+
+    Args:
+        cursor (psycopg2.extensions.cursor): 커서
+
+    Returns:
+        report (Dict[str, list]): 존재하는 인덱스 (필요한 인덱스, 대신하는 인덱스 이름), 없는 인덱스, 유효하지 않은 인덱스 이름과 사용되지 않은 인덱스
+    '''
+
+    indexes = loadIndexes(cursor)
+    report  = {
+        'present': [],
+        'missing': [],
+        'invalid': [index['name'] for index in indexes if not index['valid']],
+        'unused': loadUnusedIndexes(cursor)
+    }
+
+    for required in INDEX:
+        index = findIndex(required, indexes)
+
+        if index != None:
+            report['present'].append((required, index['name']))
+        else:
+            report['missing'].append(required)
+
+    return report
+
+def create(cursor: psycopg2.extensions.cursor, missing: List[Index], invalid: List[str]) -> int:
+    '''
+    없는 인덱스를 CONCURRENTLY로 생성합니다. 테이블 쓰기를 막지 않으므로 운영 중에도 실행할 수 있으며, 커넥션은 autocommit이어야 합니다.
+
+    이전에 생성에 실패하여 유효하지 않은 상태로 남은 같은 이름의 인덱스는 삭제한 후 다시 생성합니다.
+    trigram 인덱스에 필요한 pg_trgm 확장을 설치할 권한이 없을 경우, 해당 인덱스는 건너뜁니다.
+
+    Args:
+        cursor (psycopg2.extensions.cursor): 커서
+        missing (List[Index]): 없는 인덱스 목록
+        invalid (List[str]): 유효하지 않은 인덱스 이름 목록
+
+    Returns:
+        failures (int): 생성하지 못한 인덱스 개수
+    '''
+
+    failures = 0
+
+    if any(index.method == 'gin' for index in missing):
+        try:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        except psycopg2.errors.InsufficientPrivilege as error:
+            print(f'cannot install pg_trgm, skipping trigram indexes: {error}'.strip())
+
+            failures += sum(index.method == 'gin' for index in missing)
+            missing   = [index for index in missing if index.method != 'gin']
+
+    for index in missing:
+        print(f'{index.definition} ...', end=' ', flush=True)
+
+        try:
+            if index.name in invalid:
+                cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {index.name}')
+
+            cursor.execute(index.definition)
+        except psycopg2.DatabaseError as error:
+            print(f'failed: {error}'.strip())
+
+            failures += 1
+            continue
+
+        print('done')
+
+    return failures
+
+def printReport(report: Dict[str, list]) -> None:
+    '''
+    확인 결과를 출력합니다.
+    '''
+
+    for required, name in report['present']:
+        print(f'ok       {required.table:<22} ({", ".join(required.columns)}) -> {name}')
+
+    for required in report['missing']:
+        print(f'missing  {required.table:<22} ({", ".join(required.columns)}) for {required.reason}')
+
+    for name in report['invalid']:
+        print(f'invalid  {name} (left by a failed CREATE INDEX CONCURRENTLY)')
+
+    required = { name for _, name in report['present'] }
+
+    for index in report['unused']:
+        print(f'unused   {index["table"]:<22} {index["name"]} ({index["size"] / 1024 / 1024:.1f} MB)' + (' required' if index['name'] in required else ''))
+
+# === 메인 정의 === #
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='라우터의 쿼리가 사용하는 인덱스를 확인하고, 없는 인덱스를 생성합니다. 데이터베이스 접속 정보는 애플리케이션과 같은 환경 변수를 사용합니다.')
+    parser.add_argument('command', choices=['check', 'create'], help='check: 없는 인덱스와 사용되지 않은 인덱스 출력, create: 없는 인덱스를 CONCURRENTLY로 생성')
+    parser.add_argument('--dry-run', action='store_true', help='create에서 인덱스를 생성하지 않고 실행할 쿼리만 출력')
+    argument = parser.parse_args()
+
+    connection = psycopg2.connect(**config.database.config)
+
+    # CREATE INDEX CONCURRENTLY는 트랜잭션 안에서 실행할 수 없습니다.
+    connection.autocommit = True
+
+    try:
+        with connection.cursor() as cursor:
+            report = check(cursor)
+
+            if argument.command == 'check':
+                printReport(report)
+
+                # 배포 전 확인에서 실패로 처리할 수 있도록, 없는 인덱스가 있으면 종료 코드 1을 반환합니다.
+                sys.exit(1 if report['missing'] else 0)
+
+            if argument.dry_run:
+                for index in report['missing']:
+                    print(index.definition)
+
+                return
+
+            failures = create(cursor, report['missing'], report['invalid'])
+    finally:
+        connection.close()
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from contextlib import contextmanager
+from typing     import Iterator
+
+import threading
+import time
+
+# === 서드파티 패키지 임포트 === #
+
+import psycopg2
+import psycopg2.extensions
+
+# === 클래스 정의 === #
+
+class PoolTimeoutError(psycopg2.OperationalError):
+    '''
+    제한 시간 내에 커넥션을 할당받지 못했을 때 발생하는 예외입니다.
+    '''
+
+class ConnectionPool:
+    '''
+    여러 스레드가 공유할 수 있는 PostgreSQL 커넥션 풀입니다.
+
+    커넥션은 필요할 때 생성되며, 최대 개수에 도달하면 반환될 때까지 대기합니다.
+    일정 시간 이상 유휴 상태였던 커넥션은 할당 전에 상태를 확인하고, 끊어진 커넥션은 폐기 후 다시 연결합니다.
+
+    Args:
+        config (dict): psycopg2.connect에 전달할 접속 정보
+        minimum (int): 유지할 최소 커넥션 개수
+        maximum (int): 생성 가능한 최대 커넥션 개수
+        timeout (float): 커넥션 할당 대기 시간 (초)
+        health_check_interval (float): 상태 확인 없이 재사용할 수 있는 유휴 시간 (초)
+    '''
+
+    def __init__(self, config: dict, minimum: int = 1, maximum: int = 8, timeout: float = 30, health_check_interval: float = 30) -> None:
+        if minimum < 0 or maximum < 1 or minimum > maximum:
+            raise ValueError(f'invalid pool size (minimum={minimum}, maximum={maximum})')
+
+        self.config              = config
+        self.minimum             = minimum
+        self.maximum             = maximum
+        self.timeout             = timeout
+        self.healthCheckInterval = health_check_interval
+
+        self._condition = threading.Condition()
+        self._idle      = [] # 유휴 커넥션 목록 ((connection, 반환 시각), ...)
+        self._size      = 0  # 생성된 커넥션 개수 (유휴 + 사용 중)
+        self._closed    = False
+
+        self._statistic = {
+            'created': 0,
+            'discarded': 0,
+            'checkouts': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'health_checks': 0
+        }
+
+    # === 커넥션 관리 === #
+
+    def getConnection(self) -> psycopg2.extensions.connection:
+        '''
+        풀에서 커넥션을 할당받습니다.
+
+        Returns:
+            connection (psycopg2.extensions.connection): 커넥션
+
+        Raises:
+            PoolTimeoutError: 제한 시간 내에 커넥션을 할당받지 못한 경우
+        '''
+
+        deadline = time.monotonic() + self.timeout
+
+        while True:
+            connection = None
+            idleSince  = None
+
+            with self._condition:
+                if self._closed:
+                    raise psycopg2.InterfaceError('connection pool is closed')
+
+                while not self._idle and self._size >= self.maximum:
+                    remaining = deadline - time.monotonic()
+
+                    if remaining <= 0:
+                        self._statistic['timeouts'] += 1
+                        raise PoolTimeoutError(f'no connection available within {self.timeout} seconds')
+
+                    self._statistic['waits'] += 1
+                    self._condition.wait(remaining)
+
+                if self._idle:
+                    connection, idleSince = self._idle.pop()
+                else:
+                    self._size += 1
+
+            # --- 새 커넥션 생성 --- #
+
+            if connection == None:
+                try:
+                    connection = self._create()
+                except BaseException:
+                    self._release()
+                    raise
+
+                break
+
+            # --- 유휴 커넥션 상태 확인 --- #
+
+            if self._isHealthy(connection, idleSince):
+                break
+
+            self._discard(connection)
+
+        with self._condition:
+            self._statistic['checkouts'] += 1
+
+        return connection
+
+    def putConnection(self, connection: psycopg2.extensions.connection, broken: bool = False) -> None:
+        '''
+        할당받은 커넥션을 풀에 반환합니다.
+
+        Args:
+            connection (psycopg2.extensions.connection): 커넥션
+            broken (bool): 커넥션을 재사용하지 않고 폐기할지 여부
+        '''
+
+        if not broken and not connection.closed:
+            try:
+                # 진행 중인 트랜잭션이 남아 있을 경우, 다른 요청에 영향을 주지 않도록 종료합니다.
+                if connection.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+            except psycopg2.Error:
+                broken = True
+
+        if broken or connection.closed:
+            self._discard(connection)
+            return
+
+        with self._condition:
+            if self._closed:
+                connection.close()
+                self._size -= 1
+                return
+
+            self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self) -> Iterator[psycopg2.extensions.connection]:
+        '''
+        커넥션을 할당받고, 블록이 끝나면 반환하는 컨텍스트 매니저입니다.
+
+        블록 안에서 예외가 발생하면 트랜잭션을 롤백하며, 서버와의 연결이 끊어진 커넥션은 폐기합니다.
+
+        Yields:
+            connection (psycopg2.extensions.connection): 커넥션
+        '''
+
+        connection = self.getConnection()
+        broken     = False
+
+        try:
+            yield connection
+        except BaseException as error:
+            # 취소된 쿼리 (statement_timeout, cancel)는 커넥션 자체에는 문제가 없으므로 롤백 후 재사용합니다.
+            broken = connection.closed != 0 or (
+                isinstance(error, (psycopg2.OperationalError, psycopg2.InterfaceError)) and
+                not isinstance(error, psycopg2.extensions.QueryCanceledError)
+            )
+
+            if not broken:
+                try:
+                    connection.rollback()
+                except psycopg2.Error:
+                    broken = True
+
+            raise
+        finally:
+            self.putConnection(connection, broken)
+
+    def warm(self) -> None:
+        '''
+        최소 커넥션 개수만큼 커넥션을 미리 생성합니다.
+        '''
+
+        while True:
+            with self._condition:
+                if self._closed or self._size >= self.minimum:
+                    return
+
+                self._size += 1
+
+            try:
+                connection = self._create()
+            except BaseException:
+                self._release()
+                raise
+
+            self.putConnection(connection)
+
+    def close(self) -> None:
+        '''
+        유휴 커넥션을 모두 닫고, 이후 반환되는 커넥션도 닫도록 풀을 종료합니다.
+        '''
+
+        with self._condition:
+            self._closed = True
+            idle         = self._idle
+            self._idle   = []
+            self._size  -= len(idle)
+
+            self._condition.notify_all()
+
+        for connection, _ in idle:
+            connection.close()
+
+    def statistic(self) -> dict:
+        '''
+        풀의 현재 상태와 누적 통계를 반환합니다.
+
+        Returns:
+            statistic (dict): 풀 통계
+        '''
+
+        with self._condition:
+            return {
+                'minimum': self.minimum,
+                'maximum': self.maximum,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                **self._statistic
+            }
+
+    # === 내부 함수 === #
+
+    def _create(self) -> psycopg2.extensions.connection:
+        '''
+        새 커넥션을 생성합니다.
+        '''
+
+        connection = psycopg2.connect(**self.config)
+
+        with self._condition:
+            self._statistic['created'] += 1
+
+        return connection
+
+    def _isHealthy(self, connection: psycopg2.extensions.connection, idleSince: float) -> bool:
+        '''
+        유휴 커넥션이 재사용 가능한 상태인지 확인합니다.
+        '''
+
+        if connection.closed:
+            return False
+
+        if time.monotonic() - idleSince < self.healthCheckInterval:
+            return True
+
+        with self._condition:
+            self._statistic['health_checks'] += 1
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+
+            connection.rollback()
+        except psycopg2.Error:
+            return False
+
+        return True
+
+    def _discard(self, connection: psycopg2.extensions.connection) -> None:
+        '''
+        커넥션을 닫고 풀에서 제외합니다.
+        '''
+
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+
+        with self._condition:
+            self._statistic['discarded'] += 1
+
+        self._release()
+
+    def _release(self) -> None:
+        '''
+        생성된 커넥션 개수를 줄이고, 대기 중인 스레드를 깨웁니다.
+        '''
+
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from typing import Any, Iterator, Tuple
+
+import hashlib
+import threading
+import time
+
+# === 서드파티 패키지 임포트 === #
+
+import psycopg2.errors
+import psycopg2.extensions
+import psycopg2.extras
+
+# === 사용자 정의 모듈 임포트 === #
+
+import database.slowQuery as slowQuery
+import utility.metric    as metric
+
+# === 상수 정의 === #
+
+MAX_PREPARED = 256 # 커넥션 당 준비할 수 있는 최대 쿼리 개수
+
+# === 클래스 정의 === #
+
+class PreparingConnection(psycopg2.extensions.connection):
+    '''
+    준비된 쿼리 (prepared statement) 목록을 기억하는 커넥션입니다.
+
+    준비된 쿼리는 세션에 속하므로, 커넥션 풀에서 재연결된 커넥션은 빈 목록으로 시작합니다.
+    '''
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        self.prepared = set() # 이 커넥션에서 준비된 쿼리 이름 목록
+
+class TimingCursor(psycopg2.extras.RealDictCursor):
+    '''
+    쿼리 실행과 행을 가져오는 데 걸린 시간, 가져온 행 개수를 현재 요청의 지표에 더하는 커서입니다.
+
+    실행 시간이 CDM_LOOKUP_SLOW_QUERY_THRESHOLD를 넘은 쿼리는 느린 쿼리로 기록합니다. 서버 측 커서는 행을 가져오는 동안 쿼리가 실행되므로 기록하지 않습니다.
+    '''
+
+    source = None # 준비된 쿼리를 실행 중일 경우, 느린 쿼리로 기록할 원래 쿼리와 인자
+
+    def execute(self, query: Any, vars: Any = None) -> None:
+        start = time.perf_counter()
+
+        try:
+            return super().execute(query, vars)
+        finally:
+            duration = time.perf_counter() - start
+
+            metric.add('db', duration)
+
+            if self.name == None:
+                slowQuery.record(*(self.source or (query, vars)), self.rowcount, duration)
+
+    def fetchone(self) -> dict:
+        start = time.perf_counter()
+        row   = super().fetchone()
+
+        metric.add('db', time.perf_counter() - start)
+        metric.add('rows', 0 if row == None else 1)
+
+        return row
+
+    def fetchmany(self, size: int = None) -> list:
+        start = time.perf_counter()
+        rows  = super().fetchmany(size) if size != None else super().fetchmany()
+
+        metric.add('db', time.perf_counter() - start)
+        metric.add('rows', len(rows))
+
+        return rows
+
+    def fetchall(self) -> list:
+        start = time.perf_counter()
+        rows  = super().fetchall()
+
+        metric.add('db', time.perf_counter() - start)
+        metric.add('rows', len(rows))
+
+        return rows
+
+    def __iter__(self) -> Iterator[dict]:
+        # 서버 측 커서는 반복 중에 다음 묶음을 가져오므로, 행마다 대기 시간을 더합니다.
+        rows = super().__iter__()
+
+        while True:
+            start = time.perf_counter()
+
+            try:
+                row = next(rows)
+            except StopIteration:
+                metric.add('db', time.perf_counter() - start)
+                return
+
+            metric.add('db', time.perf_counter() - start)
+            metric.add('rows', 1)
+
+            yield row
+
+class Query:
+    '''
+    검색 라우터의 동적 쿼리를 구성하는 빌더입니다.
+
+    같은 필터 조합은 항상 같은 쿼리 문자열이 되도록 공백을 정규화하므로, 필터 조합마다 하나의 준비된 쿼리를 재사용할 수 있습니다.
+
+    Args:
+        select (str): SELECT ... FROM ... 구문
+    '''
+
+    def __init__(self, select: str) -> None:
+        self.select       = select
+        self.conditions   = []
+        self.argument     = []
+        self.seeks        = []
+        self.seekArgument = []
+        self.order        = None
+        self.page         = None
+
+    def where(self, condition: str, *argument: Any) -> 'Query':
+        '''
+        AND로 연결할 조건을 추가합니다.
+
+        Args:
+            condition (str): 조건 구문
+            *argument (Any): 조건 구문의 인자
+
+        Returns:
+            query (Query): 빌더
+        '''
+
+        self.conditions.append(condition)
+        self.argument.extend(argument)
+
+        return self
+
+    def seek(self, condition: str, *argument: Any) -> 'Query':
+        '''
+        키셋 페이지네이션의 커서 조건을 추가합니다. 커서 조건은 검색 결과의 전체 개수를 셀 때 제외됩니다.
+
+        Args:
+            condition (str): 조건 구문
+            *argument (Any): 조건 구문의 인자
+
+        Returns:
+            query (Query): 빌더
+        '''
+
+        self.seeks.append(condition)
+        self.seekArgument.extend(argument)
+
+        return self
+
+    def orderBy(self, order: str) -> 'Query':
+        '''
+        정렬 순서를 지정합니다.
+        '''
+
+        self.order = order
+
+        return self
+
+    def paginate(self, offset: Any, limit: Any) -> 'Query':
+        '''
+        OFFSET과 LIMIT을 지정합니다.
+        '''
+
+        self.page = [offset, limit]
+
+        return self
+
+    def build(self) -> Tuple[str, list]:
+        '''
+        정규화된 쿼리 문자열과 인자를 반환합니다.
+
+        Returns:
+            query (str): 쿼리 문자열
+            argument (list): 쿼리 인자
+        '''
+
+        query    = self.select
+        argument = list(self.argument) + list(self.seekArgument)
+
+        if self.conditions or self.seeks:
+            query += ' WHERE ' + ' AND '.join(self.conditions + self.seeks)
+
+        if self.order != None:
+            query += ' ORDER BY ' + self.order
+
+        if self.page != None:
+            query += ' OFFSET %s LIMIT %s'
+            argument.extend(self.page)
+
+        return ' '.join(query.split()), argument
+
+    def buildCount(self) -> Tuple[str, list]:
+        '''
+        커서 조건, 정렬 순서와 페이지를 제외한 정규화된 쿼리 문자열과 인자를 반환합니다. 같은 필터 조합은 페이지와 관계없이 같은 쿼리가 됩니다.
+
+        Returns:
+            query (str): 쿼리 문자열
+            argument (list): 쿼리 인자
+        '''
+
+        query = self.select
+
+        if self.conditions:
+            query += ' WHERE ' + ' AND '.join(self.conditions)
+
+        return ' '.join(query.split()), list(self.argument)
+
+# === 전역 변수 정의 === #
+
+lock = threading.Lock() # 카운터 갱신 잠금
+
+counter = {
+    'hits': 0,
+    'misses': 0,
+    'bypasses': 0
+}
+
+# === 함수 정의 === #
+
+def count(name: str) -> None:
+    '''
+    준비된 쿼리 카운터를 1 증가시킵니다.
+    '''
+
+    with lock:
+        counter[name] += 1
+
+def execute(cursor: psycopg2.extensions.cursor, query: str, argument: list) -> None:
+    '''
+    쿼리를 준비된 쿼리로 실행합니다.
+
+    커넥션에서 처음 실행하는 쿼리는 PREPARE로 준비한 후 EXECUTE로 실행하며, 이후에는 EXECUTE만 실행하여 파싱과 실행 계획 수립을 생략합니다.
+    PreparingConnection이 아닌 커넥션이거나 준비된 쿼리가 MAX_PREPARED개를 넘은 경우에는 쿼리를 그대로 실행합니다.
+
+    Args:
+        cursor (psycopg2.extensions.cursor): 커서
+        query (str): %s 자리 표시자를 사용하는 쿼리 문자열
+        argument (list): 쿼리 인자
+    '''
+
+    prepared = getattr(cursor.connection, 'prepared', None)
+    name     = 'search_' + hashlib.sha1(query.encode()).hexdigest()[:16]
+
+    if prepared == None or (name not in prepared and len(prepared) >= MAX_PREPARED):
+        count('bypasses')
+        cursor.execute(query, argument)
+        return
+
+    if name in prepared:
+        count('hits')
+    else:
+        count('misses')
+
+        # 자리 표시자 %s를 $1, $2, ...로, 리터럴 %를 나타내는 %%를 %로 바꿉니다.
+        parts   = query.replace('%%', '\0').split('%s')
+        prepare  = parts[0]
+
+        for index, part in enumerate(parts[1:], start=1):
+            prepare += f'${index}' + part
+
+        cursor.execute(f'PREPARE {name} AS {prepare.replace(chr(0), "%")}')
+        prepared.add(name)
+
+    # 느린 쿼리는 EXECUTE 구문이 아닌 원래 쿼리로 기록합니다.
+    if isinstance(cursor, TimingCursor):
+        cursor.source = (query, argument)
+
+    try:
+        if argument:
+            cursor.execute(f'EXECUTE {name} (' + ', '.join(['%s'] * len(argument)) + ')', argument)
+        else:
+            cursor.execute(f'EXECUTE {name}')
+    except psycopg2.errors.InvalidSqlStatementName:
+        # 세션에서 준비된 쿼리가 사라진 경우 (DISCARD ALL 등), 다음 실행 시 다시 준비합니다.
+        prepared.discard(name)
+        raise
+    finally:
+        if isinstance(cursor, TimingCursor):
+            cursor.source = None
+
+def statistic() -> dict:
+    '''
+    준비된 쿼리의 적중, 실패, 우회 횟수를 반환합니다.
+    '''
+
+    with lock:
+        return dict(counter)
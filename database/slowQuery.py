@@ -0,0 +1,396 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from collections import deque
+from datetime    import datetime
+from typing      import Any, Iterable, List
+
+import glob
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import threading
+import time
+
+# === 서드파티 패키지 임포트 === #
+
+from flask import has_request_context, request
+
+import psycopg2
+import psycopg2.extensions
+
+# === 사용자 정의 모듈 임포트 === #
+
+import config.database
+
+# === 상수 정의 === #
+
+MEMORY_SIZE  = 1000 # 저장 디렉터리를 설정하지 않았을 때 프로세스마다 보관하는 최근 기록 개수
+BACKUP_COUNT = 3    # 프로세스별 기록 파일의 교체 보관 개수
+
+EXPLAIN_QUEUE_SIZE = 16  # 대기 중인 실행 계획 수집 작업의 최대 개수 (초과 시 버림)
+EXPLAIN_INTERVAL   = 600 # 같은 쿼리의 실행 계획을 다시 수집하기까지의 최소 간격 (초)
+
+# 값을 기록해도 되는 자리 표시자 앞의 컬럼 (concept 식별자와 이름) 또는 구문 (페이지)
+SAFE_PARAMETER = re.compile(r'(?:\b\w*concept_id|\bconcept_name)\s*(?:=|<>|!=|>=|<=|>|<|LIKE|ILIKE)\s*(?:ANY\s*\(\s*)?$|\b(?:OFFSET|LIMIT)\s*$', re.IGNORECASE)
+
+LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b") # 쿼리와 실행 계획의 상수 (문자열, 숫자)
+
+PLAN_CONDITION = re.compile(r'(?:Cond|Filter):') # 상수가 포함될 수 있는 실행 계획의 줄
+
+# 실행 계획을 수집할 수 있는 조회 쿼리 (EXPLAIN, PREPARE, EXECUTE와 SET 등의 유틸리티 구문은 제외)
+EXPLAINABLE = re.compile(r'^\s*\(*\s*(?:SELECT|WITH|VALUES|TABLE)\b', re.IGNORECASE)
+
+# === 전역 변수 정의 === #
+
+logger = logging.getLogger(__name__)
+
+lock = threading.Lock() # 기록 갱신 잠금
+
+# 프로세스별 기록 (fork된 프로세스에서는 getState가 새로 초기화)
+state = {
+    'pid': None,
+    'memory': deque(maxlen=MEMORY_SIZE), # 최근 기록 (저장 디렉터리를 설정하지 않은 경우)
+    'store': None,                       # 기록 파일 로거 (저장 디렉터리를 설정한 경우)
+    'queue': None,                       # 실행 계획 수집 작업
+    'explained': {}                      # 쿼리 식별자별 마지막 실행 계획 수집 시각
+}
+
+counter = {
+    'recorded': 0,
+    'explained': 0,
+    'explain_dropped': 0,
+    'explain_failed': 0
+}
+
+# === 함수 정의 === #
+
+def getState() -> dict:
+    '''
+    현재 프로세스의 기록 상태를 반환합니다.
+
+    uWSGI 워커는 마스터 프로세스를 fork하여 만들어지므로, 프로세스 ID가 바뀌면 기록 파일과 실행 계획 수집 스레드를 새로 만듭니다.
+    '''
+
+    pid = os.getpid()
+
+    if state['pid'] == pid:
+        return state
+
+    with lock:
+        if state['pid'] != pid:
+            directory = config.database.slowQueryConfig['directory']
+
+            state['pid']       = pid
+            state['memory']    = deque(maxlen=MEMORY_SIZE)
+            state['store']     = None
+            state['queue']     = queue.Queue(maxsize=EXPLAIN_QUEUE_SIZE)
+            state['explained'] = {}
+
+            if directory != None:
+                # 여러 워커가 한 파일을 교체하면 기록이 유실되므로, 프로세스마다 다른 파일에 기록합니다.
+                handler = logging.handlers.RotatingFileHandler(
+                    os.path.join(directory, f'slow-query-{pid}.jsonl'),
+                    maxBytes=config.database.slowQueryConfig['max_bytes'],
+                    backupCount=BACKUP_COUNT
+                )
+                handler.setFormatter(logging.Formatter('%(message)s'))
+
+                store = logging.Logger(f'{__name__}.{pid}')
+                store.addHandler(handler)
+
+                state['store'] = store
+
+            threading.Thread(target=explainPeriodically, args=[state['queue']], daemon=True).start()
+
+    return state
+
+def count(name: str) -> None:
+    '''
+    느린 쿼리 카운터를 1 증가시킵니다.
+    '''
+
+    with lock:
+        counter[name] += 1
+
+def normalize(query: str) -> str:
+    '''
+    쿼리의 공백을 정리하고 상수를 ?로 바꾸어, 인자만 다른 쿼리가 같은 문자열이 되도록 합니다.
+    '''
+
+    return LITERAL.sub('?', ' '.join(query.split()))
+
+def redact(query: str, argument: Any) -> list:
+    '''
+    쿼리 인자 중 환자를 식별할 수 있는 값을 가립니다.
+
+    자리 표시자 바로 앞이 concept 식별자나 이름의 비교 또는 OFFSET, LIMIT인 인자만 그대로 두고, 나머지 (환자 번호, 날짜, 커서 등)는 자료형만 남깁니다.
+
+    Args:
+        query (str): %s 자리 표시자를 사용하는 쿼리 문자열
+        argument (Any): 쿼리 인자
+
+    Returns:
+        parameters (list): 가려진 쿼리 인자
+    '''
+
+    if not isinstance(argument, (list, tuple)):
+        return [] if argument == None else ['<redacted>']
+
+    parts      = query.replace('%%', '').split('%s')
+    parameters = []
+
+    for part, value in zip(parts, argument):
+        if value == None or SAFE_PARAMETER.search(part):
+            parameters.append(value if isinstance(value, (int, float, str, list, type(None))) else str(value))
+        else:
+            parameters.append(f'<{type(value).__name__}>')
+
+    return parameters
+
+def redactPlan(plan: List[str]) -> List[str]:
+    '''
+    실행 계획의 조건 줄에 포함된 상수를 ?로 바꿉니다 (인자 값이 실행 계획에 그대로 나타나므로).
+    '''
+
+    return [LITERAL.sub('?', line) if PLAN_CONDITION.search(line) else line for line in plan]
+
+def getRoute() -> str:
+    '''
+    현재 요청의 경로 규칙을 반환합니다 (요청을 처리하는 중이 아닐 경우 None).
+    '''
+
+    if not has_request_context() or request.url_rule == None:
+        return None
+
+    return request.url_rule.rule
+
+def write(entry: dict) -> None:
+    '''
+    기록 하나를 기록 파일 또는 메모리에 저장합니다.
+    '''
+
+    process = getState()
+
+    if process['store'] != None:
+        process['store'].info(json.dumps(entry, default=str, ensure_ascii=False))
+    else:
+        with lock:
+            process['memory'].append(entry)
+
+def record(query: str, argument: Any, rows: int, duration: float) -> None:
+    '''
+    실행 시간이 기준을 넘은 쿼리를 기록합니다.
+
+    정규화된 쿼리, 가려진 인자, 행 개수와 실행 시간을 로그와 저장소에 남기며, 조회 쿼리가 실행 계획 수집 기준도 넘은 경우 실행 계획 수집을 예약합니다.
+    실행 계획은 요청과 별도의 스레드와 커넥션에서 수집하므로 요청의 응답 시간에 영향을 주지 않습니다.
+
+    Args:
+        query (str): %s 자리 표시자를 사용하는 쿼리 문자열
+        argument (Any): 쿼리 인자
+        rows (int): 반환된 행 개수 (실패한 쿼리는 -1)
+        duration (float): 실행 시간 (초)
+    '''
+
+    if duration < config.database.slowQueryConfig['threshold']:
+        return
+
+    normalized  = normalize(query)
+    fingerprint = hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+    entry = {
+        'type': 'query',
+        'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'fingerprint': fingerprint,
+        'query': normalized,
+        'parameters': redact(query, argument),
+        'rows': rows if rows >= 0 else None,
+        'duration': round(duration, 6),
+        'route': getRoute()
+    }
+
+    count('recorded')
+    write(entry)
+
+    logger.warning(f'slow query ({duration:.3f}s, {rows} rows) {fingerprint}: {normalized} {entry["parameters"]}')
+
+    # 이미 EXPLAIN인 쿼리 (검색 결과 개수 추정 등)나 PREPARE, EXECUTE 구문에 EXPLAIN을 붙이면 구문 오류가 발생하므로, 조회 쿼리만 실행 계획을 수집합니다.
+    if duration < config.database.slowQueryConfig['explain_threshold'] or not EXPLAINABLE.search(query):
+        return
+
+    process = getState()
+    now     = time.monotonic()
+
+    with lock:
+        last = process['explained'].get(fingerprint)
+
+        if last != None and now - last < EXPLAIN_INTERVAL:
+            return
+
+        process['explained'][fingerprint] = now
+
+    try:
+        # 원래 인자는 실행 계획 수집에만 사용하며, 저장하지 않습니다.
+        process['queue'].put_nowait((fingerprint, normalized, query, argument))
+    except queue.Full:
+        count('explain_dropped')
+
+        with lock:
+            process['explained'].pop(fingerprint, None)
+
+def explain(connection: psycopg2.extensions.connection, fingerprint: str, normalized: str, query: str, argument: Any) -> None:
+    '''
+    EXPLAIN (ANALYZE, BUFFERS)로 쿼리를 다시 실행하여 실행 계획을 저장합니다.
+
+    쿼리가 다시 실행되므로 CDM_LOOKUP_DATABASE_QUERY_DEADLINE을 statement_timeout으로 설정하며,
+    제한 시간 안에 끝나지 않는 쿼리 (요청에서 취소된 쿼리 등)는 실행하지 않는 EXPLAIN으로 예상 실행 계획만 저장합니다.
+
+    Args:
+        connection (psycopg2.extensions.connection): 실행 계획 수집 전용 커넥션
+        fingerprint (str): 쿼리 식별자
+        normalized (str): 정규화된 쿼리 문자열
+        query (str): %s 자리 표시자를 사용하는 쿼리 문자열
+        argument (Any): 쿼리 인자
+
+    Raises:
+        psycopg2.DatabaseError: 실행 계획 수집에 실패한 경우
+    '''
+
+    start    = time.perf_counter()
+    analyzed = True
+
+    with connection, connection.cursor() as cursor:
+        cursor.execute('SET LOCAL statement_timeout = %s', [int(config.database.executorConfig['deadline'] * 1000)])
+
+        try:
+            cursor.execute('EXPLAIN (ANALYZE, BUFFERS) ' + query, argument)
+        except psycopg2.extensions.QueryCanceledError:
+            connection.rollback()
+            cursor.execute('EXPLAIN ' + query, argument)
+
+            analyzed = False
+
+        plan = [row[0] for row in cursor.fetchall()]
+
+    count('explained')
+    write({
+        'type': 'plan',
+        'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'fingerprint': fingerprint,
+        'query': normalized,
+        'plan': redactPlan(plan),
+        'analyzed': analyzed,
+        'duration': round(time.perf_counter() - start, 6)
+    })
+
+def explainPeriodically(tasks: queue.Queue) -> None:
+    '''
+    예약된 실행 계획 수집 작업을 하나씩 실행합니다.
+
+    실행 계획 수집이 요청에 사용할 커넥션을 점유하지 않도록, 커넥션 풀이 아닌 전용 커넥션을 사용하며, 실패하면 다음 작업에서 다시 연결합니다.
+    '''
+
+    connection = None
+
+    while True:
+        task = tasks.get()
+
+        try:
+            if connection == None or connection.closed:
+                connection = psycopg2.connect(**{ **config.database.config, 'cursor_factory': psycopg2.extensions.cursor })
+
+            explain(connection, *task)
+        except psycopg2.DatabaseError as error:
+            count('explain_failed')
+            logger.error(f'failed to explain slow query {task[0]}: {error}')
+
+            if connection != None:
+                connection.close()
+                connection = None
+
+def loadEntries() -> Iterable[dict]:
+    '''
+    저장된 기록을 반환합니다. 저장 디렉터리를 설정한 경우 모든 워커의 기록 파일 (교체된 파일 포함)을, 그렇지 않을 경우 현재 프로세스의 기록을 읽습니다.
+    '''
+
+    process   = getState()
+    directory = config.database.slowQueryConfig['directory']
+
+    if directory == None:
+        with lock:
+            return list(process['memory'])
+
+    entries = []
+
+    for path in glob.glob(os.path.join(directory, 'slow-query-*.jsonl*')):
+        try:
+            with open(path, encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except OSError:
+            continue
+
+    return entries
+
+def getOffenders(limit: int) -> List[dict]:
+    '''
+    저장된 기록을 쿼리별로 합산하여, 총 실행 시간이 긴 순서로 반환합니다.
+
+    Args:
+        limit (int): 반환할 최대 쿼리 개수
+
+    Returns:
+        offenders (List[dict]): 쿼리별 실행 횟수, 총 실행 시간, 평균 실행 시간, 최대 실행 시간, 총 행 개수, 마지막 기록과 마지막 실행 계획
+    '''
+
+    offenders = {}
+    plans     = {}
+
+    for entry in sorted(loadEntries(), key=lambda entry: entry['time']):
+        if entry['type'] == 'plan':
+            plans[entry['fingerprint']] = entry
+            continue
+
+        offender = offenders.setdefault(entry['fingerprint'], {
+            'fingerprint': entry['fingerprint'],
+            'query': entry['query'],
+            'calls': 0,
+            'total_seconds': 0.0,
+            'max_seconds': 0.0,
+            'rows': 0
+        })
+
+        offender['calls']         += 1
+        offender['total_seconds'] += entry['duration']
+        offender['max_seconds']    = max(offender['max_seconds'], entry['duration'])
+        offender['rows']          += entry['rows'] or 0
+        offender['last']           = { key: entry[key] for key in ('time', 'parameters', 'rows', 'duration', 'route') }
+
+    result = sorted(offenders.values(), key=lambda offender: offender['total_seconds'], reverse=True)[:limit]
+
+    for offender in result:
+        plan = plans.get(offender['fingerprint'])
+
+        offender['total_seconds'] = round(offender['total_seconds'], 6)
+        offender['mean_seconds']  = round(offender['total_seconds'] / offender['calls'], 6)
+        offender['plan']          = None if plan == None else { 'time': plan['time'], 'analyzed': plan['analyzed'], 'lines': plan['plan'] }
+
+    return result
+
+def statistic() -> dict:
+    '''
+    기록된 느린 쿼리 개수와 실행 계획 수집 결과를 반환합니다.
+    '''
+
+    with lock:
+        return dict(counter)
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 서드파티 패키지 임포트 === #
+
+from flask import Blueprint, Response, request
+
+# === 사용자 정의 모듈 임포트 === #
+
+from database.slowQuery import getOffenders
+
+import utility.api as api
+
+# === 상수 정의 === #
+
+DEFAULT_LIMIT = 20 # 기본 조회 쿼리 개수
+
+# === 전역 변수 정의 === #
+
+blueprint = Blueprint('admin', __name__, url_prefix='/admin')
+
+# === 라우터 정의 === #
+
+@blueprint.route('/slow_query', methods=['GET'])
+def slowQuery() -> Response:
+    '''
+    느린 쿼리를 총 실행 시간이 긴 순서로 조회하기 위한 라우터입니다.
+
+    CDM_LOOKUP_SLOW_QUERY_DIRECTORY가 설정되어 있을 경우 모든 uWSGI 워커의 기록을, 그렇지 않을 경우 요청을 처리한 워커의 최근 기록을 합산합니다.
+
+    Methods:
+        GET
+
+    Params:
+        limit (str, opt, default=DEFAULT_LIMIT): 조회할 쿼리 개수
+
+    Responses:
+        {
+            'status': <STATUS>,
+            'data': [{
+                'fingerprint': <QUERY FINGERPRINT>,
+                'query': <NORMALIZED QUERY>,
+                'calls': <CALLS>,
+                'total_seconds': <TOTAL SECONDS>,
+                'mean_seconds': <MEAN SECONDS>,
+                'max_seconds': <MAX SECONDS>,
+                'rows': <TOTAL ROWS>,
+                'last': {
+                    'time': <RECORDED DATETIME>,
+                    'parameters': [<REDACTED PARAMETER>, ...],
+                    'rows': <ROWS>,
+                    'duration': <SECONDS>,
+                    'route': <ROUTE>
+                },
+                'plan': {
+                    'time': <EXPLAINED DATETIME>,
+                    'analyzed': <ANALYZED>,
+                    'lines': [<PLAN LINE>, ...]
+                } | None
+            }, ...]
+        }
+    '''
+
+    # --- 파라미터 파싱 --- #
+
+    limit = request.args.get('limit', str(DEFAULT_LIMIT))
+
+    if not limit.isdigit():
+        return Response(**api.makeResponse('INVALID_DATA', None))
+
+    return Response(**api.makeResponse('SUCCESS', getOffenders(int(limit))))
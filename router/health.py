@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 서드파티 패키지 임포트 === #
+
+from flask import Blueprint, Response
+
+# === 사용자 정의 모듈 임포트 === #
+
+from utility.warmup import getReadiness
+
+import utility.api as api
+
+# === 전역 변수 정의 === #
+
+blueprint = Blueprint('health', __name__, url_prefix='/health')
+
+# === 라우터 정의 === #
+
+@blueprint.route('/live', methods=['GET'])
+def live() -> Response:
+    '''
+    프로세스가 요청을 처리할 수 있는지 확인하기 위한 라우터로, 데이터베이스에 접근하지 않습니다.
+
+    Methods:
+        GET
+
+    Responses:
+        {
+            'status': 'SUCCESS',
+            'data': None
+        }
+    '''
+
+    return Response(**api.makeResponse('SUCCESS', None))
+
+@blueprint.route('/ready', methods=['GET'])
+def ready() -> Response:
+    '''
+    조회 테이블 준비가 끝났는지 확인하기 위한 라우터로, 준비가 끝나기 전에는 503 (NOT_READY)을 반환합니다.
+
+    Methods:
+        GET
+
+    Responses:
+        {
+            'status': <SUCCESS | NOT_READY>,
+            'data': {
+                'ready': <READY>,
+                'started_at': <STARTED DATETIME>,
+                'finished_at': <FINISHED DATETIME>,
+                'pending': [<TASK>, ...],
+                'failed': {
+                    <TASK>: <ERROR>, ...
+                },
+                'elapsed': {
+                    <TASK>: <SECONDS>, ...
+                }
+            }
+        }
+    '''
+
+    readiness = getReadiness()
+
+    return Response(**api.makeResponse('SUCCESS' if readiness['ready'] else 'NOT_READY', readiness))
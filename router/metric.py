@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 서드파티 패키지 임포트 === #
+
+from flask import Blueprint, Response
+
+# === 사용자 정의 모듈 임포트 === #
+
+from utility.metric import render
+
+# === 전역 변수 정의 === #
+
+blueprint = Blueprint('metric', __name__)
+
+# === 라우터 정의 === #
+
+@blueprint.route('/metrics', methods=['GET'])
+def index() -> Response:
+    '''
+    요청, 데이터베이스, 직렬화, 커넥션 풀, 응답 캐시와 갱신 작업 지표를 Prometheus 텍스트 형식으로 조회하기 위한 라우터입니다.
+
+    CDM_LOOKUP_METRIC_DIRECTORY가 설정되어 있을 경우, 모든 uWSGI 워커의 지표를 합쳐서 반환합니다.
+
+    Methods:
+        GET
+
+    Responses:
+        <PROMETHEUS TEXT FORMAT>
+    '''
+
+    return Response(render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 서드파티 패키지 임포트 === #
+
+from flask import Blueprint, Response, current_app, request
+
+import psycopg2
+
+# === 사용자 정의 모듈 임포트 === #
+
+from constant.lookup         import getLookup
+from database.executor       import Statement, fanOut
+from router.search.condition import formatCondition
+from router.search.death     import formatDeath
+from router.search.drug      import formatDrug
+from router.search.person    import formatPerson
+from router.search.visit     import formatVisit
+from utility.admission       import admit
+
+import utility.api as api
+
+# === 상수 정의 === #
+
+MAX_PERSON_COUNT = 1000  # 한 번에 조회할 수 있는 최대 환자 수
+MAX_ROW_COUNT    = 10000 # 환자당 여러 행이 존재하는 도메인에서 한 번에 반환하는 최대 행 개수
+
+# 도메인별 조회 쿼리, 응답 데이터 변환 함수, 응답 필드 이름과 환자당 여러 행이 존재하는지 여부
+DOMAIN = {
+    'person': {
+        'query': '''
+            SELECT person_id, birth_datetime, gender_concept_id, race_concept_id, ethnicity_source_value
+            FROM person
+            WHERE person_id = ANY(%s)
+        ''',
+        'format': formatPerson,
+        'field': 'person',
+        'multiple': False
+    },
+    'visit': {
+        'query': '''
+            SELECT visit_occurrence_id, person_id, visit_concept_id, visit_start_datetime, visit_end_datetime
+            FROM visit_occurrence
+            WHERE person_id = ANY(%s)
+            ORDER BY person_id, visit_occurrence_id
+            LIMIT %s
+        ''',
+        'format': formatVisit,
+        'field': 'visits',
+        'multiple': True
+    },
+    'condition': {
+        'query': '''
+            SELECT person_id, condition_occurrence_id, visit_occurrence_id, condition_concept_id, condition_start_datetime, condition_end_datetime
+            FROM condition_occurrence
+            WHERE person_id = ANY(%s)
+            ORDER BY person_id, condition_occurrence_id
+            LIMIT %s
+        ''',
+        'format': formatCondition,
+        'field': 'conditions',
+        'multiple': True
+    },
+    'drug': {
+        'query': '''
+            SELECT person_id, drug_exposure_id, visit_occurrence_id, drug_concept_id, drug_exposure_start_datetime, drug_exposure_end_datetime
+            FROM drug_exposure
+            WHERE person_id = ANY(%s)
+            ORDER BY person_id, drug_exposure_id
+            LIMIT %s
+        ''',
+        'format': formatDrug,
+        'field': 'drugs',
+        'multiple': True
+    },
+    'death': {
+        'query': '''
+            SELECT person_id, death_date
+            FROM death
+            WHERE person_id = ANY(%s)
+        ''',
+        'format': lambda death, lookup: formatDeath(death),
+        'field': 'death',
+        'multiple': False
+    }
+}
+
+# === 전역 변수 정의 === #
+
+blueprint = Blueprint('search_batch', __name__, url_prefix='/search/batch')
+
+# === 라우터 정의 === #
+
+@blueprint.route('/', methods=['POST'])
+@admit('heavy')
+def index() -> Response:
+    '''
+    여러 환자의 person, visit_occurrence, condition_occurrence, drug_exposure, death 테이블을 한 번에 조회하기 위한 라우터입니다.
+
+    도메인마다 person_id = ANY(%s) 쿼리 하나만 동시에 실행하며, 각 행은 해당 도메인의 검색 라우터와 같은 필드 이름으로 반환합니다.
+    환자당 여러 행이 존재하는 도메인은 (person_id, 행 ID) 순서로 MAX_ROW_COUNT개까지만 반환하며, 잘린 도메인은 truncated에 포함됩니다.
+
+    Methods:
+        POST
+
+    Body:
+        {
+            'person_ids': [<PERSON ID>, ...],
+            'domains': [<'person' | 'visit' | 'condition' | 'drug' | 'death'>, ...] (opt, default=전체 도메인)
+        }
+
+    Responses:
+        {
+            'status': <STATUS>,
+            'data': {
+                'persons': [{
+                    'person_id': <PERSON ID>,
+                    'person': <PERSON> | None,
+                    'visits': [<VISIT>, ...],
+                    'conditions': [<CONDITION>, ...],
+                    'drugs': [<DRUG>, ...],
+                    'death': <DEATH> | None
+                }, ...],
+                'truncated': [<DOMAIN>, ...]
+            }
+        }
+    '''
+
+    # 요청을 처리하는 동안 하나의 조회 테이블 스냅샷만 사용합니다.
+    lookup = getLookup()
+
+    # --- 파라미터 파싱 --- #
+
+    body      = request.get_json(silent=True) or {}
+    personIDs = body.get('person_ids', None)
+    domains   = body.get('domains', list(DOMAIN.keys()))
+
+    if not isinstance(domains, list) or any(domain not in DOMAIN for domain in domains):
+        return Response(**api.makeResponse('INVALID_DATA', list(DOMAIN.keys())))
+
+    if not isinstance(personIDs, list) or len(personIDs) > MAX_PERSON_COUNT or \
+       any(not isinstance(personID, int) or isinstance(personID, bool) for personID in personIDs):
+        return Response(**api.makeResponse('INVALID_DATA', None))
+
+    # 요청 순서를 유지하면서 중복된 환자 ID를 제거합니다.
+    personIDs = list(dict.fromkeys(personIDs))
+
+    # --- 응답 메시지 정의 --- #
+
+    status = 'SUCCESS'
+    data   = None
+
+    persons = {}
+
+    for personID in personIDs:
+        persons[personID] = { 'person_id': personID }
+
+        for domain in domains:
+            persons[personID][DOMAIN[domain]['field']] = [] if DOMAIN[domain]['multiple'] else None
+
+    # --- 데이터베이스 조회 --- #
+
+    try:
+        # 도메인별 쿼리는 서로 독립적이므로, 각각 다른 커넥션에서 동시에 실행합니다.
+        # 여러 행이 존재하는 도메인은 잘렸는지 확인하기 위해, 한 행 더 조회합니다.
+        result = fanOut({
+            domain: Statement(DOMAIN[domain]['query'], [personIDs, MAX_ROW_COUNT + 1] if DOMAIN[domain]['multiple'] else [personIDs]) for domain in domains
+        })
+
+        truncated = []
+
+        for domain, rows in result.rows.items():
+            field  = DOMAIN[domain]['field']
+            format = DOMAIN[domain]['format']
+
+            if DOMAIN[domain]['multiple'] and len(rows) > MAX_ROW_COUNT:
+                rows = rows[:MAX_ROW_COUNT]
+                truncated.append(domain)
+
+            for row in rows:
+                if DOMAIN[domain]['multiple']:
+                    persons[row['person_id']][field].append(format(row, lookup))
+                else:
+                    persons[row['person_id']][field] = format(row, lookup)
+
+        data = {
+            'persons': list(persons.values()),
+            'truncated': [domain for domain in domains if domain in truncated]
+        }
+    except psycopg2.DatabaseError as error:
+        status = 'DATABASE_ERROR'
+        data   = None
+
+        current_app.logger.error(error)
+
+    return Response(**api.makeResponse(status, data))
@@ -14,8 +14,17 @@ import psycopg2
 
 # === 사용자 정의 모듈 임포트 === #
 
-import database.database as db
-import utility.api       as api
+from cache.response    import SEARCH_TTL, cached
+from cache.total       import getTotal
+from database.query    import Query, execute
+from utility.admission import admit, classifySearch
+
+import config.application
+import constant.concept
+import database.database  as db
+import utility.api        as api
+import utility.export     as export
+import utility.pagination as pagination
 
 # === 상수 정의 === #
 
@@ -25,13 +34,40 @@ DEFAULT_PAGE_SIZE = 10 # 페이지 당 출력 개수에 대한 기본 값
 
 blueprint = Blueprint('search_concept', __name__, url_prefix='/search/concept')
 
+# === 함수 정의 === #
+
+def formatConcept(concept: dict) -> dict:
+    '''
+    concept 테이블의 행을 응답 데이터로 변환합니다.
+
+    Args:
+        concept (dict): 조회된 행
+
+    Returns:
+        concept (dict): 응답 데이터
+    '''
+
+    return {
+        'id': concept['concept_id'],
+        'code': concept['concept_code'],
+        'name': concept['concept_name'],
+        'class': concept['concept_class_id'],
+        'validity': 'Valid' if datetime.combine(concept['valid_end_date'], time(0, 0)) >= datetime.now() else 'Invalid',
+        'domain': concept['domain_id'],
+        'vocabulary': concept['vocabulary_id']
+    }
+
 # === 라우터 정의 === #
 
 @blueprint.route('/', methods=['GET'])
+@cached(ttl=SEARCH_TTL)
+@admit(classifySearch)
 def index() -> Response:
     '''
     concept 테이블을 검색하기 위한 라우터로, 키워드가 있을 경우 concept_name을 대상으로 조회합니다.
 
+    concept_name의 n-gram 색인이 준비되어 있을 경우, 색인으로 concept_id를 먼저 찾은 후 해당 행만 데이터베이스에서 조회합니다.
+
     Methods:
         GET
 
@@ -39,6 +75,9 @@ def index() -> Response:
         keyword (str, opt, default=None): 검색 키워드
         page (str, opt, default=0): 페이지 번호
         page_size (str, opt, default=DEFAULT_PAGE_SIZE): 페이지 당 출력 개수
+        cursor (str, opt, default=None): 이전 응답의 next_cursor 값으로, 지정할 경우 page 대신 다음 페이지를 조회
+        format ('ndjson' | 'csv', opt, default=None): 내보내기 형식으로, 지정할 경우 페이지 구분 없이 조회 결과 전체를 스트리밍
+        total ('true' | 'false', opt, default='false'): true일 경우 검색 결과 개수를 함께 반환하며, CDM_LOOKUP_SEARCH_EXACT_TOTAL_LIMIT개를 넘을 경우 실행 계획의 추정치를 반환
 
     Responses:
         {
@@ -52,7 +91,11 @@ def index() -> Response:
                     'validity': 'Valid' | 'Invalid',
                     'domain': <DOMAIN ID>,
                     'vocabulary': <VOCABULARY ID>
-                }, ...]
+                }, ...],
+                'has_more': <HAS MORE>,
+                'next_cursor': <NEXT CURSOR> | None,
+                'total': <TOTAL> | None,
+                'total_method': 'exact' | 'estimate' | None
             }
         }
     '''
@@ -63,51 +106,102 @@ def index() -> Response:
     keyword   = parameter.get('keyword', None)
     page      = parameter.get('page', 0)
     pageSize  = parameter.get('page_size', DEFAULT_PAGE_SIZE)
+    after     = parameter.get('cursor', None)
+
+    exportFormat = parameter.get('format', None)
+    withTotal    = parameter.get('total', 'false').lower() == 'true'
+
+    if exportFormat != None and exportFormat not in export.EXPORT_FORMAT:
+        return Response(**api.makeResponse('INVALID_DATA', list(export.EXPORT_FORMAT.keys())))
+
+    # 내보내기는 page_size를 사용하지 않으며, 그 외에는 한 행 이상이어야 다음 페이지의 커서를 만들 수 있습니다.
+    if exportFormat == None and int(pageSize) < 1:
+        return Response(**api.makeResponse('INVALID_DATA', None))
+
+    # 커서가 주어질 경우, OFFSET 대신 concept_id보다 뒤에 있는 행부터 조회합니다.
+    if after != None:
+        try:
+            after = pagination.decodeCursor(after, 1)[0]
+        except ValueError:
+            return Response(**api.makeResponse('INVALID_DATA', None))
+
+        page = 0
 
     page = str(int(page) * int(pageSize))
 
+    # --- 키워드 파싱을 통한 동적 쿼리 구성 --- #
+
+    query = Query('''
+        SELECT *
+        FROM concept
+    ''')
+
+    if keyword != None:
+        query.where('concept_name LIKE %s', f'%{keyword}%')
+
+    if after != None:
+        query.seek('concept_id > %s', after)
+
+    query.orderBy('concept_id')
+
+    # 내보내기 형식이 주어질 경우, 페이지 구분 없이 조회 결과 전체를 스트리밍합니다.
+    if exportFormat != None:
+        return Response(**export.makeStreamResponse(exportFormat, 'concepts', *query.build(), formatConcept))
+
+    # 검색 결과 개수는 커서 조건과 페이지를 제외한 필터 조합으로 계산하므로, 다음 페이지에서도 캐시된 개수를 사용합니다.
+    countQuery, countArgument = query.buildCount()
+
+    # 다음 페이지가 존재하는지 확인하기 위해, 한 행 더 조회합니다.
+    query.paginate(page, int(pageSize) + 1)
+
+    # LIKE 와일드카드가 포함된 키워드는 색인으로 처리할 수 없으므로, 데이터베이스에서 직접 조회합니다.
+    conceptIndex = constant.concept.CONCEPT_INDEX
+    useIndex     = keyword != None and conceptIndex != None and not any(character in keyword for character in '%_\\')
+
+    if useIndex:
+        query = Query('SELECT * FROM concept').where('concept_id = ANY(%s)', conceptIndex.search(keyword, after, int(page), int(pageSize) + 1))
+        query.orderBy('concept_id')
+
+    query, argument = query.build()
+
     # --- 응답 메시지 정의 --- #
 
     status = 'SUCCESS'
     data   = {
-        'concepts': []
+        'concepts': [],
+        'has_more': False,
+        'next_cursor': None,
+        'total': None,
+        'total_method': None
     }
 
     # --- 데이터베이스 조회 --- #
 
     try:
-        with db.connection.cursor() as cursor:
-            if keyword == None:
-                cursor.execute('''
-                    SELECT *
-                    FROM concept
-                    ORDER BY concept_id
-                    OFFSET %s LIMIT %s
-                ''', [page, pageSize])
-            else:
-                cursor.execute('''
-                    SELECT *
-                    FROM concept
-                    WHERE concept_name LIKE %s
-                    ORDER BY concept_id
-                    OFFSET %s LIMIT %s
-                ''', [f'%{keyword}%', page, pageSize])
-
-            for concept in cursor.fetchall():
-                data['concepts'].append({
-                    'id': concept['concept_id'],
-                    'code': concept['concept_code'],
-                    'name': concept['concept_name'],
-                    'class': concept['concept_class_id'],
-                    'validity': 'Valid' if datetime.combine(concept['valid_end_date'], time(0, 0)) >= datetime.now() else 'Invalid',
-                    'domain': concept['domain_id'],
-                    'vocabulary': concept['vocabulary_id']
-                })
+        with db.connect() as connection, connection.cursor() as cursor:
+            execute(cursor, query, argument)
+            concepts = cursor.fetchall()
+
+            # 한 행 더 조회되었을 경우 다음 페이지가 존재하며, 추가로 조회한 행은 반환하지 않습니다.
+            data['has_more'] = len(concepts) > int(pageSize)
+            concepts         = concepts[:int(pageSize)]
+
+            for concept in concepts:
+                data['concepts'].append(formatConcept(concept))
+
+            # 다음 페이지가 존재할 경우, 마지막 행의 concept_id를 다음 페이지의 커서로 반환합니다.
+            if data['has_more']:
+                data['next_cursor'] = pagination.encodeCursor([concepts[-1]['concept_id']])
+
+        # 색인으로 조회한 경우 검색 결과 개수도 색인의 후보 목록에서 계산하며, 데이터베이스의 LIKE 개수는 색인을 사용할 수 없는 경우에만 계산합니다.
+        if withTotal and useIndex:
+            data['total'], data['total_method'] = conceptIndex.count(keyword, config.application.config['search_exact_total_limit'])
+        elif withTotal:
+            data['total'], data['total_method'] = getTotal(countQuery, countArgument)
     except psycopg2.DatabaseError as error:
         status = 'DATABASE_ERROR'
         data   = None
 
-        db.connection.rollback()
         current_app.logger.error(error)
 
     return Response(**api.makeResponse(status, data))
\ No newline at end of file
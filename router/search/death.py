@@ -14,8 +14,15 @@ import psycopg2
 
 # === 사용자 정의 모듈 임포트 === #
 
-import database.database as db
-import utility.api       as api
+from cache.response    import SEARCH_TTL, cached
+from cache.total       import getTotal
+from database.query    import Query, execute
+from utility.admission import admit, classifySearch
+
+import database.database  as db
+import utility.api        as api
+import utility.export     as export
+import utility.pagination as pagination
 
 # === 상수 정의 === #
 
@@ -25,9 +32,29 @@ DEFAULT_PAGE_SIZE = 10 # 페이지 당 출력 개수에 대한 기본 값
 
 blueprint = Blueprint('search_death', __name__, url_prefix='/search/death')
 
+# === 함수 정의 === #
+
+def formatDeath(death: dict) -> dict:
+    '''
+    death 테이블의 행을 응답 데이터로 변환합니다.
+
+    Args:
+        death (dict): 조회된 행
+
+    Returns:
+        death (dict): 응답 데이터
+    '''
+
+    return {
+        'person_id': death['person_id'],
+        'date': death['death_date']
+    }
+
 # === 라우터 정의 === #
 
 @blueprint.route('/', methods=['GET'])
+@cached(ttl=SEARCH_TTL)
+@admit(classifySearch)
 def index() -> Response:
     '''
     death 테이블을 검색하기 위한 라우터입니다.
@@ -40,6 +67,9 @@ def index() -> Response:
         date (%Y-%m-%d, opt, default=None): 사망일 키워드
         page (str, opt, default=0): 페이지 번호
         page_size (str, opt, default=DEFAULT_PAGE_SIZE): 페이지 당 출력 개수
+        cursor (str, opt, default=None): 이전 응답의 next_cursor 값으로, 지정할 경우 page 대신 다음 페이지를 조회
+        format ('ndjson' | 'csv', opt, default=None): 내보내기 형식으로, 지정할 경우 페이지 구분 없이 조회 결과 전체를 스트리밍
+        total ('true' | 'false', opt, default='false'): true일 경우 검색 결과 개수를 함께 반환하며, CDM_LOOKUP_SEARCH_EXACT_TOTAL_LIMIT개를 넘을 경우 실행 계획의 추정치를 반환
 
     Responses:
         {
@@ -48,7 +78,11 @@ def index() -> Response:
                 'death': [{
                     'person_id': <PERSON ID>,
                     'date': <DEATH DATE>
-                }, ...]
+                }, ...],
+                'has_more': <HAS MORE>,
+                'next_cursor': <NEXT CURSOR> | None,
+                'total': <TOTAL> | None,
+                'total_method': 'exact' | 'estimate' | None
             }
         }
     '''
@@ -60,69 +94,96 @@ def index() -> Response:
     date      = parameter.get('date', None)
     page      = parameter.get('page', 0)
     pageSize  = parameter.get('page_size', DEFAULT_PAGE_SIZE)
+    after     = parameter.get('cursor', None)
+
+    exportFormat = parameter.get('format', None)
+    withTotal    = parameter.get('total', 'false').lower() == 'true'
 
     if date != None:
         date = date.split('-')
         date = dt(int(date[0]), int(date[1]), int(date[2]))
 
+    if exportFormat != None and exportFormat not in export.EXPORT_FORMAT:
+        return Response(**api.makeResponse('INVALID_DATA', list(export.EXPORT_FORMAT.keys())))
+
+    # 내보내기는 page_size를 사용하지 않으며, 그 외에는 한 행 이상이어야 다음 페이지의 커서를 만들 수 있습니다.
+    if exportFormat == None and int(pageSize) < 1:
+        return Response(**api.makeResponse('INVALID_DATA', None))
+
+    # 커서가 주어질 경우, OFFSET 대신 정렬 키보다 뒤에 있는 행부터 조회합니다.
+    if after != None:
+        try:
+            after = pagination.decodeCursor(after, 1)
+        except ValueError:
+            return Response(**api.makeResponse('INVALID_DATA', None))
+
+        page = 0
+
     page = str(int(page) * int(pageSize))
 
-    # --- 응답 메시지 정의 --- #
+    # --- 키워드 파싱을 통한 동적 쿼리 구성 --- #
 
-    status = 'SUCCESS'
-    data   = {
-        'death': []
-    }
+    query = Query('''
+        SELECT person_id, death_date
+        FROM death
+    ''')
 
-    # --- 데이터베이스 조회 --- #
+    if personID != None:
+        query.where('person_id=%s', personID)
 
-    try:
-        with db.connection.cursor() as cursor:
-            query = '''
-                SELECT person_id, death_date
-                FROM death
-            '''
-            argument = []
+    if date != None:
+        query.where('death_date=%s', date)
 
-            # --- 키워드 파싱을 통한 동적 쿼리 구성 --- #
+    if after != None:
+        query.seek('person_id > %s', *after)
 
-            keywordNumber = sum([personID != None, date != None])
-            keywordCount  = 0
+    query.orderBy('person_id')
 
-            if keywordNumber != 0:
-                query += ' WHERE'
+    # 내보내기 형식이 주어질 경우, 페이지 구분 없이 조회 결과 전체를 스트리밍합니다.
+    if exportFormat != None:
+        return Response(**export.makeStreamResponse(exportFormat, 'death', *query.build(), formatDeath))
 
-            if personID != None:
-                if keywordCount != 0:
-                    query += ' AND'
+    # 검색 결과 개수는 커서 조건과 페이지를 제외한 필터 조합으로 계산하므로, 다음 페이지에서도 캐시된 개수를 사용합니다.
+    countQuery, countArgument = query.buildCount()
 
-                query        += ' person_id=%s'
-                argument.append(personID)
-                keywordCount += 1
+    # 다음 페이지가 존재하는지 확인하기 위해, 한 행 더 조회합니다.
+    query, argument = query.paginate(page, int(pageSize) + 1).build()
+
+    # --- 응답 메시지 정의 --- #
 
-            if date != None:
-                if keywordCount != 0:
-                    query += ' AND'
+    status = 'SUCCESS'
+    data   = {
+        'death': [],
+        'has_more': False,
+        'next_cursor': None,
+        'total': None,
+        'total_method': None
+    }
+
+    # --- 데이터베이스 조회 --- #
+
+    try:
+        with db.connect() as connection, connection.cursor() as cursor:
+            execute(cursor, query, argument)
+            deaths = cursor.fetchall()
 
-                query        += ' death_date=%s'
-                argument.append(date)
-                keywordCount += 1
+            # 한 행 더 조회되었을 경우 다음 페이지가 존재하며, 추가로 조회한 행은 반환하지 않습니다.
+            data['has_more'] = len(deaths) > int(pageSize)
+            deaths           = deaths[:int(pageSize)]
 
-            query += ' ORDER BY person_id OFFSET %s LIMIT %s'
-            argument.extend([page, pageSize])
+            for death in deaths:
+                data['death'].append(formatDeath(death))
 
-            cursor.execute(query, argument)
+            # 다음 페이지가 존재할 경우, 마지막 행의 정렬 키를 다음 페이지의 커서로 반환합니다.
+            if data['has_more']:
+                data['next_cursor'] = pagination.encodeCursor([deaths[-1]['person_id']])
 
-            for death in cursor.fetchall():
-                data['death'].append({
-                    'person_id': death['person_id'],
-                    'date': death['death_date'].strftime('%Y-%m-%d')
-                })
+        if withTotal:
+            data['total'], data['total_method'] = getTotal(countQuery, countArgument)
     except psycopg2.DatabaseError as error:
         status = 'DATABASE_ERROR'
         data   = None
 
-        db.connection.rollback()
         current_app.logger.error(error)
 
     return Response(**api.makeResponse(status, data))
\ No newline at end of file
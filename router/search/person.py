@@ -4,7 +4,10 @@
 
 # === 표준 패키지 임포트 === #
 
-from datetime import datetime
+from datetime  import datetime, timedelta
+from itertools import islice
+
+import heapq
 
 # === 서드파티 패키지 임포트 === #
 
@@ -14,28 +17,193 @@ import psycopg2
 
 # === 사용자 정의 모듈 임포트 === #
 
-from constant.ethnicity import ETHNICITY
-from constant.gender    import GENDER, REVERSED_GENDER
-from constant.race      import RACE, REVERSED_RACE
+from cache.person      import countPerson, getPersonTable, searchPerson
+from cache.response    import SEARCH_TTL, cached
+from cache.total       import getTotal
+from constant.lookup   import Lookup, getLookup
+from database.executor import Statement, fanOut
+from database.query    import Query, execute
+from utility.admission import admit, classifySearch
 
-import database.database as db
-import utility.api       as api
+import database.database  as db
+import utility.api        as api
+import utility.export     as export
+import utility.pagination as pagination
 
 # === 상수 정의 === #
 
-DEFAULT_PAGE_SIZE = 10 # 페이지 당 출력 개수에 대한 기본 값
+DEFAULT_PAGE_SIZE          = 10  # 페이지 당 출력 개수에 대한 기본 값
+DEFAULT_TIMELINE_PAGE_SIZE = 100 # 타임라인의 페이지 당 출력 개수에 대한 기본 값
+
+EPOCH = datetime(1970, 1, 1) # 타임라인 커서의 시각 기준점
+
+# 타임라인을 구성하는 도메인별 조회 쿼리와 정렬 순서 (같은 시각의 사건은 rank 순서로 정렬)
+TIMELINE = {
+    'visit': {
+        'rank': 0,
+        'start': 'visit_start_datetime',
+        'id': 'visit_occurrence_id',
+        'query': '''
+            SELECT visit_occurrence_id AS event_id, visit_occurrence_id AS visit_id, visit_concept_id AS concept_id,
+                   visit_start_datetime AS start_datetime, visit_end_datetime AS end_datetime
+            FROM visit_occurrence
+        '''
+    },
+    'condition': {
+        'rank': 1,
+        'start': 'condition_start_datetime',
+        'id': 'condition_occurrence_id',
+        'query': '''
+            SELECT condition_occurrence_id AS event_id, visit_occurrence_id AS visit_id, condition_concept_id AS concept_id,
+                   condition_start_datetime AS start_datetime, condition_end_datetime AS end_datetime
+            FROM condition_occurrence
+        '''
+    },
+    'drug': {
+        'rank': 2,
+        'start': 'drug_exposure_start_datetime',
+        'id': 'drug_exposure_id',
+        'query': '''
+            SELECT drug_exposure_id AS event_id, visit_occurrence_id AS visit_id, drug_concept_id AS concept_id,
+                   drug_exposure_start_datetime AS start_datetime, drug_exposure_end_datetime AS end_datetime
+            FROM drug_exposure
+        '''
+    },
+    'death': {
+        'rank': 3,
+        'start': 'death_date::timestamp',
+        'id': 'person_id',
+        'query': '''
+            SELECT person_id AS event_id, NULL AS visit_id, NULL AS concept_id,
+                   death_date::timestamp AS start_datetime, NULL AS end_datetime
+            FROM death
+        '''
+    }
+}
 
 # === 전역 변수 정의 === #
 
 blueprint = Blueprint('search_person', __name__, url_prefix='/search/person')
 
+# === 함수 정의 === #
+
+def formatPerson(person: dict, lookup: Lookup) -> dict:
+    '''
+    person 테이블의 행을 응답 데이터로 변환합니다.
+
+    Args:
+        person (dict): 조회된 행
+        lookup (Lookup): 조회 테이블 스냅샷
+
+    Returns:
+        person (dict): 응답 데이터
+    '''
+
+    return {
+        'person_id': person['person_id'],
+        'birth': person['birth_datetime'].date(),
+        'gender_concept_id': person['gender_concept_id'],
+        'gender_concept_name': lookup.REVERSED_GENDER[person['gender_concept_id']],
+        'race_concept_id': person['race_concept_id'],
+        'race_concept_name': lookup.REVERSED_RACE[person['race_concept_id']],
+        'ethnicity': person['ethnicity_source_value']
+    }
+
+def formatEvent(domain: str, event: dict, lookup: Lookup) -> dict:
+    '''
+    타임라인 조회 결과를 응답 데이터로 변환합니다.
+
+    Args:
+        domain (str): 도메인 이름
+        event (dict): 조회된 행
+        lookup (Lookup): 조회 테이블 스냅샷
+
+    Returns:
+        event (dict): 응답 데이터
+    '''
+
+    names = {
+        'visit': lookup.REVERSED_VISIT_TYPE,
+        'condition': lookup.REVERSED_CONDITION,
+        'drug': lookup.REVERSED_DRUG
+    }
+
+    return {
+        'domain': domain,
+        'event_id': event['event_id'],
+        'visit_id': event['visit_id'],
+        'concept_id': event['concept_id'],
+        'concept_name': None if domain not in names else names[domain].get(event['concept_id']),
+        'start_date': event['start_datetime'].date(),
+        'end_date': None if event['end_datetime'] == None else event['end_datetime'].date()
+    }
+
+def getEventKey(domain: str, event: dict) -> tuple:
+    '''
+    타임라인 사건의 정렬 키 (시작 시각, 도메인 순서, 사건 ID)를 반환합니다.
+    '''
+
+    return (event['start_datetime'], TIMELINE[domain]['rank'], event['event_id'])
+
+def makeEventStatement(domain: str, personID: int, start: datetime, end: datetime, after: list, limit: int) -> Statement:
+    '''
+    한 도메인의 사건을 정렬 키 순서로 조회하는 쿼리를 생성합니다.
+
+    Args:
+        domain (str): 도메인 이름
+        personID (int): 환자 ID
+        start (datetime): 조회 기간의 시작 시각 (None일 경우 제한 없음)
+        end (datetime): 조회 기간의 종료 시각으로, 이 시각 이전의 사건만 조회 (None일 경우 제한 없음)
+        after (list): 이전 페이지의 마지막 정렬 키 [시작 시각 (마이크로초), 도메인 순서, 사건 ID] (None일 경우 처음부터 조회)
+        limit (int): 조회할 최대 사건 개수
+
+    Returns:
+        statement (Statement): 조회 쿼리
+    '''
+
+    table    = TIMELINE[domain]
+    column   = table['start']
+    query    = table['query'] + ' WHERE person_id=%s'
+    argument = [personID]
+
+    if start != None:
+        query += f' AND {column} >= %s'
+        argument.append(start)
+
+    if end != None:
+        query += f' AND {column} < %s'
+        argument.append(end)
+
+    # 도메인 순서는 도메인마다 고정되어 있으므로, 커서와의 비교는 시작 시각과 사건 ID만으로 표현할 수 있습니다.
+    if after != None:
+        afterStart = EPOCH + timedelta(microseconds=after[0])
+
+        if table['rank'] < after[1]:
+            query += f' AND {column} > %s'
+            argument.append(afterStart)
+        elif table['rank'] == after[1]:
+            query += f' AND ({column} > %s OR ({column} = %s AND {table["id"]} > %s))'
+            argument.extend([afterStart, afterStart, after[2]])
+        else:
+            query += f' AND {column} >= %s'
+            argument.append(afterStart)
+
+    query += f' ORDER BY {column}, {table["id"]} LIMIT %s'
+    argument.append(limit)
+
+    return Statement(query, argument)
+
 # === 라우터 정의 === #
 
 @blueprint.route('/', methods=['GET'])
+@cached(ttl=SEARCH_TTL)
+@admit(classifySearch)
 def index() -> Response:
     '''
     person 테이블을 검색하기 위한 라우터입니다.
 
+    person 테이블이 메모리에 적재되어 있을 경우 (CDM_LOOKUP_PERSON_ENGINE), 내보내기를 제외한 검색은 데이터베이스 대신 적재된 배열에서 처리합니다.
+
     Methods:
         GET
 
@@ -46,6 +214,9 @@ def index() -> Response:
         ethnicity (str, opt, default=None): 민족 키워드
         page (str, opt, default=0): 페이지 번호
         page_size (str, opt, default=DEFAULT_PAGE_SIZE): 페이지 당 출력 개수
+        cursor (str, opt, default=None): 이전 응답의 next_cursor 값으로, 지정할 경우 page 대신 다음 페이지를 조회
+        format ('ndjson' | 'csv', opt, default=None): 내보내기 형식으로, 지정할 경우 페이지 구분 없이 조회 결과 전체를 스트리밍
+        total ('true' | 'false', opt, default='false'): true일 경우 검색 결과 개수를 함께 반환하며, CDM_LOOKUP_SEARCH_EXACT_TOTAL_LIMIT개를 넘을 경우 실행 계획의 추정치를 반환
 
     Responses:
         {
@@ -59,11 +230,18 @@ def index() -> Response:
                     'race_concept_id': <RACE CONCEPT ID>,
                     'race_concept_name': <RACE CONCEPT NAME>,
                     'ethnicity': <ETHNICITY SOURCE VALUE>
-                }, ...]
+                }, ...],
+                'has_more': <HAS MORE>,
+                'next_cursor': <NEXT CURSOR> | None,
+                'total': <TOTAL> | None,
+                'total_method': 'exact' | 'estimate' | None
             }
         }
     '''
 
+    # 요청을 처리하는 동안 하나의 조회 테이블 스냅샷만 사용합니다.
+    lookup = getLookup()
+
     # --- 파라미터 파싱 --- #
 
     parameter = request.args.to_dict()
@@ -73,103 +251,223 @@ def index() -> Response:
     ethnicity = parameter.get('ethnicity', None)
     page      = parameter.get('page', 0)
     pageSize  = parameter.get('page_size', DEFAULT_PAGE_SIZE)
+    after     = parameter.get('cursor', None)
+
+    exportFormat = parameter.get('format', None)
+    withTotal    = parameter.get('total', 'false').lower() == 'true'
 
     if birth != None:
         birth = birth.split('-')
         birth = datetime(int(birth[0]), int(birth[1]), int(birth[2]))
 
+    if exportFormat != None and exportFormat not in export.EXPORT_FORMAT:
+        return Response(**api.makeResponse('INVALID_DATA', list(export.EXPORT_FORMAT.keys())))
+
+    # 내보내기는 page_size를 사용하지 않으며, 그 외에는 한 행 이상이어야 다음 페이지의 커서를 만들 수 있습니다.
+    if exportFormat == None and int(pageSize) < 1:
+        return Response(**api.makeResponse('INVALID_DATA', None))
+
+    # 커서가 주어질 경우, OFFSET 대신 정렬 키보다 뒤에 있는 행부터 조회합니다.
+    if after != None:
+        try:
+            after = pagination.decodeCursor(after, 1)
+        except ValueError:
+            return Response(**api.makeResponse('INVALID_DATA', None))
+
+        page = 0
+
     page = str(int(page) * int(pageSize))
 
+    # --- 키워드 파싱을 통한 동적 쿼리 구성 --- #
+
+    query = Query('''
+        SELECT person_id, birth_datetime, gender_concept_id, race_concept_id, ethnicity_source_value
+        FROM person
+    ''')
+
+    # 메모리에 적재된 person 테이블을 검색할 때 사용할 조건 (값이 None일 경우 일치하는 행이 없음)
+    filters = {}
+
+    if birth != None:
+        query.where('birth_datetime=%s', birth)
+        filters['birth'] = birth
+
+    if gender != None:
+        query.where('gender_concept_id=%s', lookup.GENDER.get(gender))
+        filters['gender'] = lookup.GENDER.get(gender)
+
+    if race != None:
+        query.where('race_concept_id=%s', lookup.RACE.get(race))
+        filters['race'] = lookup.RACE.get(race)
+
+    if ethnicity != None:
+        query.where('ethnicity_source_value=%s', ethnicity if ethnicity in lookup.ETHNICITY else None)
+        filters['ethnicity'] = ethnicity if ethnicity in lookup.ETHNICITY else None
+
+    if after != None:
+        query.seek('person_id > %s', *after)
+
+    query.orderBy('person_id')
+
+    # 내보내기 형식이 주어질 경우, 페이지 구분 없이 조회 결과 전체를 스트리밍합니다.
+    if exportFormat != None:
+        return Response(**export.makeStreamResponse(exportFormat, 'persons', *query.build(), lambda row: formatPerson(row, lookup)))
+
+    # 검색 결과 개수는 커서 조건과 페이지를 제외한 필터 조합으로 계산하므로, 다음 페이지에서도 캐시된 개수를 사용합니다.
+    countQuery, countArgument = query.buildCount()
+
+    # 다음 페이지가 존재하는지 확인하기 위해, 한 행 더 조회합니다.
+    query, argument = query.paginate(page, int(pageSize) + 1).build()
+
+    # --- 응답 메시지 정의 --- #
+
+    status = 'SUCCESS'
+    data   = {
+        'persons': [],
+        'has_more': False,
+        'next_cursor': None,
+        'total': None,
+        'total_method': None
+    }
+
+    # --- 데이터베이스 조회 --- #
+
+    try:
+        table = getPersonTable()
+
+        # person 테이블이 메모리에 적재되어 있을 경우, 데이터베이스 대신 적재된 배열에서 검색합니다.
+        if table != None:
+            persons = searchPerson(table, filters, None if after == None else after[0], int(page), int(pageSize) + 1)
+        else:
+            with db.connect() as connection, connection.cursor() as cursor:
+                execute(cursor, query, argument)
+                persons = cursor.fetchall()
+
+        # 한 행 더 조회되었을 경우 다음 페이지가 존재하며, 추가로 조회한 행은 반환하지 않습니다.
+        data['has_more'] = len(persons) > int(pageSize)
+        persons          = persons[:int(pageSize)]
+
+        for person in persons:
+            data['persons'].append(formatPerson(person, lookup))
+
+        # 다음 페이지가 존재할 경우, 마지막 행의 정렬 키를 다음 페이지의 커서로 반환합니다.
+        if data['has_more']:
+            data['next_cursor'] = pagination.encodeCursor([persons[-1]['person_id']])
+
+        # 메모리에 적재된 person 테이블은 전체를 세더라도 빠르므로, 항상 정확한 개수를 계산합니다.
+        if withTotal and table != None:
+            data['total'], data['total_method'] = countPerson(table, filters), 'exact'
+        elif withTotal:
+            data['total'], data['total_method'] = getTotal(countQuery, countArgument)
+    except psycopg2.DatabaseError as error:
+        status = 'DATABASE_ERROR'
+        data   = None
+
+        current_app.logger.error(error)
+
+    return Response(**api.makeResponse(status, data))
+
+@blueprint.route('/<int:personID>/timeline', methods=['GET'])
+@cached(ttl=SEARCH_TTL)
+@admit('cheap')
+def timeline(personID: int) -> Response:
+    '''
+    한 환자의 visit_occurrence, condition_occurrence, drug_exposure, death 테이블을 시간 순서의 사건 목록으로 조회하기 위한 라우터입니다.
+
+    도메인별 쿼리는 fanOut으로 서로 다른 커넥션에서 동시에 실행하며, 각 쿼리가 정렬된 결과를 반환하므로 k-way 병합으로 하나의 목록을 만듭니다.
+
+    Methods:
+        GET
+
+    Params:
+        start (%Y-%m-%d, opt, default=None): 조회 기간의 시작 날짜
+        end (%Y-%m-%d, opt, default=None): 조회 기간의 종료 날짜 (해당 날짜 포함)
+        page_size (str, opt, default=DEFAULT_TIMELINE_PAGE_SIZE): 페이지 당 출력 개수
+        cursor (str, opt, default=None): 이전 응답의 next_cursor 값으로, 지정할 경우 다음 페이지를 조회
+
+    Responses:
+        {
+            'status': <STATUS>,
+            'data': {
+                'events': [{
+                    'domain': <'visit' | 'condition' | 'drug' | 'death'>,
+                    'event_id': <EVENT ID>,
+                    'visit_id': <VISIT OCCURRENCE ID>,
+                    'concept_id': <CONCEPT ID>,
+                    'concept_name': <CONCEPT NAME>,
+                    'start_date': <START DATETIME>,
+                    'end_date': <END DATETIME>
+                }, ...],
+                'has_more': <HAS MORE>,
+                'next_cursor': <NEXT CURSOR> | None
+            }
+        }
+    '''
+
+    # 요청을 처리하는 동안 하나의 조회 테이블 스냅샷만 사용합니다.
+    lookup = getLookup()
+
+    # --- 파라미터 파싱 --- #
+
+    parameter = request.args.to_dict()
+    start     = parameter.get('start', None)
+    end       = parameter.get('end', None)
+    pageSize  = int(parameter.get('page_size', DEFAULT_TIMELINE_PAGE_SIZE))
+    after     = parameter.get('cursor', None)
+
+    if start != None:
+        start = start.split('-')
+        start = datetime(int(start[0]), int(start[1]), int(start[2]))
+
+    if end != None:
+        end = end.split('-')
+        end = datetime(int(end[0]), int(end[1]), int(end[2])) + timedelta(days=1)
+
+    if pageSize < 1:
+        return Response(**api.makeResponse('INVALID_DATA', None))
+
+    if after != None:
+        try:
+            after = pagination.decodeCursor(after, 3)
+        except ValueError:
+            return Response(**api.makeResponse('INVALID_DATA', None))
+
     # --- 응답 메시지 정의 --- #
 
     status = 'SUCCESS'
     data   = {
-        'persons': []
+        'events': [],
+        'has_more': False,
+        'next_cursor': None
     }
 
     # --- 데이터베이스 조회 --- #
 
     try:
-        with db.connection.cursor() as cursor:
-            query = '''
-                SELECT person_id, birth_datetime, gender_concept_id, race_concept_id, ethnicity_source_value
-                FROM person
-            '''
-            argument = []
-
-            # --- 키워드 파싱을 통한 동적 쿼리 구성 --- #
-
-            keywordNumber = sum([birth != None, gender != None, race != None, ethnicity != None])
-            keywordCount  = 0
-
-            if keywordNumber != 0:
-                query += ' WHERE'
-
-            if birth != None:
-                if keywordCount != 0:
-                    query += ' AND'
-
-                query        += ' birth_datetime=%s'
-                argument.append(birth)
-                keywordCount += 1
-
-            if gender != None:
-                if keywordCount != 0:
-                    query += ' AND'
-
-                if gender in GENDER:
-                    genderID = GENDER[gender]
-                else:
-                    genderID = None
-
-                query        += ' gender_concept_id=%s'
-                argument.append(genderID)
-                keywordCount += 1
-
-            if race != None:
-                if keywordCount != 0:
-                    query += ' AND'
-
-                if race in RACE:
-                    raceID = RACE[race]
-                else:
-                    raceID = None
-
-                query        += ' race_concept_id=%s'
-                argument.append(raceID)
-                keywordCount += 1
-
-            if ethnicity != None:
-                if keywordCount != 0:
-                    query += ' AND'
-
-                if ethnicity not in ETHNICITY:
-                    ethnicity = None
-
-                query        += ' ethnicity_source_value=%s'
-                argument.append(ethnicity)
-                keywordCount += 1
-
-            query += ' ORDER BY person_id OFFSET %s LIMIT %s'
-            argument.extend([page, pageSize])
-
-            cursor.execute(query, argument)
-
-            for person in cursor.fetchall():
-                data['persons'].append({
-                    'person_id': person['person_id'],
-                    'birth': person['birth_datetime'].strftime('%Y-%m-%d'),
-                    'gender_concept_id': person['gender_concept_id'],
-                    'gender_concept_name': REVERSED_GENDER[person['gender_concept_id']],
-                    'race_concept_id': person['race_concept_id'],
-                    'race_concept_name': REVERSED_RACE[person['race_concept_id']],
-                    'ethnicity': person['ethnicity_source_value']
-                })
+        # 다음 페이지가 존재하는지 확인하기 위해, 도메인마다 한 행씩 더 조회합니다.
+        result = fanOut({
+            domain: makeEventStatement(domain, personID, start, end, after, pageSize + 1) for domain in TIMELINE
+        })
+
+        results = [
+            [(getEventKey(domain, event), domain, event) for event in events] for domain, events in result.rows.items()
+        ]
+
+        events = list(islice(heapq.merge(*results, key=lambda event: event[0]), pageSize + 1))
+
+        for _, domain, event in events[:pageSize]:
+            data['events'].append(formatEvent(domain, event, lookup))
+
+        data['has_more'] = len(events) > pageSize
+
+        if data['has_more']:
+            key = events[pageSize - 1][0]
+
+            data['next_cursor'] = pagination.encodeCursor([(key[0] - EPOCH) // timedelta(microseconds=1), key[1], key[2]])
     except psycopg2.DatabaseError as error:
         status = 'DATABASE_ERROR'
         data   = None
 
-        db.connection.rollback()
         current_app.logger.error(error)
 
     return Response(**api.makeResponse(status, data))
\ No newline at end of file
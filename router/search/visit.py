@@ -14,10 +14,16 @@ import psycopg2
 
 # === 사용자 정의 모듈 임포트 === #
 
-from constant.visitType import VISIT_TYPE, REVERSED_VISIT_TYPE
+from cache.response    import SEARCH_TTL, cached
+from cache.total       import getTotal
+from constant.lookup   import Lookup, getLookup
+from database.query    import Query, execute
+from utility.admission import admit, classifySearch
 
-import database.database as db
-import utility.api       as api
+import database.database  as db
+import utility.api        as api
+import utility.export     as export
+import utility.pagination as pagination
 
 # === 상수 정의 === #
 
@@ -27,9 +33,34 @@ DEFAULT_PAGE_SIZE = 10 # 페이지 당 출력 개수에 대한 기본 값
 
 blueprint = Blueprint('search_visit', __name__, url_prefix='/search/visit')
 
+# === 함수 정의 === #
+
+def formatVisit(visit: dict, lookup: Lookup) -> dict:
+    '''
+    visit_occurrence 테이블의 행을 응답 데이터로 변환합니다.
+
+    Args:
+        visit (dict): 조회된 행
+        lookup (Lookup): 조회 테이블 스냅샷
+
+    Returns:
+        visit (dict): 응답 데이터
+    '''
+
+    return {
+        'visit_id': visit['visit_occurrence_id'],
+        'person_id': visit['person_id'],
+        'visit_concept_id': visit['visit_concept_id'],
+        'visit_concept_name': lookup.REVERSED_VISIT_TYPE[visit['visit_concept_id']],
+        'start_date': visit['visit_start_datetime'].date(),
+        'end_date': visit['visit_end_datetime'].date()
+    }
+
 # === 라우터 정의 === #
 
 @blueprint.route('/', methods=['GET'])
+@cached(ttl=SEARCH_TTL)
+@admit(classifySearch)
 def index() -> Response:
     '''
     visit_occurrence 테이블을 검색하기 위한 라우터입니다.
@@ -43,6 +74,9 @@ def index() -> Response:
         date (%Y-%m-%d~%Y-%m-%d, opt, default=None): 방문 기간 키워드
         page (str, opt, default=0): 페이지 번호
         page_size (str, opt, default=DEFAULT_PAGE_SIZE): 페이지 당 출력 개수
+        cursor (str, opt, default=None): 이전 응답의 next_cursor 값으로, 지정할 경우 page 대신 다음 페이지를 조회
+        format ('ndjson' | 'csv', opt, default=None): 내보내기 형식으로, 지정할 경우 페이지 구분 없이 조회 결과 전체를 스트리밍
+        total ('true' | 'false', opt, default='false'): true일 경우 검색 결과 개수를 함께 반환하며, CDM_LOOKUP_SEARCH_EXACT_TOTAL_LIMIT개를 넘을 경우 실행 계획의 추정치를 반환
 
     Responses:
         {
@@ -55,11 +89,18 @@ def index() -> Response:
                     'visit_concept_name': <VISIT CONCEPT NAME>,
                     'start_date': <VISIT START DATETIME>,
                     'end_date': <VISIT END DATETIME>
-                }, ...]
+                }, ...],
+                'has_more': <HAS MORE>,
+                'next_cursor': <NEXT CURSOR> | None,
+                'total': <TOTAL> | None,
+                'total_method': 'exact' | 'estimate' | None
             }
         }
     '''
 
+    # 요청을 처리하는 동안 하나의 조회 테이블 스냅샷만 사용합니다.
+    lookup = getLookup()
+
     # --- 파라미터 파싱 --- #
 
     parameter = request.args.to_dict()
@@ -68,6 +109,10 @@ def index() -> Response:
     date      = parameter.get('date', None)
     page      = parameter.get('page', 0)
     pageSize  = parameter.get('page_size', DEFAULT_PAGE_SIZE)
+    after     = parameter.get('cursor', None)
+
+    exportFormat = parameter.get('format', None)
+    withTotal    = parameter.get('total', 'false').lower() == 'true'
 
     if date != None:
         date = date.split('~')
@@ -78,81 +123,90 @@ def index() -> Response:
         endDate = date[1].split('-')
         endDate = datetime(int(endDate[0]), int(endDate[1]), int(endDate[2]))
 
+    if exportFormat != None and exportFormat not in export.EXPORT_FORMAT:
+        return Response(**api.makeResponse('INVALID_DATA', list(export.EXPORT_FORMAT.keys())))
+
+    # 내보내기는 page_size를 사용하지 않으며, 그 외에는 한 행 이상이어야 다음 페이지의 커서를 만들 수 있습니다.
+    if exportFormat == None and int(pageSize) < 1:
+        return Response(**api.makeResponse('INVALID_DATA', None))
+
+    # 커서가 주어질 경우, OFFSET 대신 정렬 키보다 뒤에 있는 행부터 조회합니다.
+    if after != None:
+        try:
+            after = pagination.decodeCursor(after, 1)
+        except ValueError:
+            return Response(**api.makeResponse('INVALID_DATA', None))
+
+        page = 0
+
     page = str(int(page) * int(pageSize))
 
+    # --- 키워드 파싱을 통한 동적 쿼리 구성 --- #
+
+    query = Query('''
+        SELECT visit_occurrence_id, person_id, visit_concept_id, visit_start_datetime, visit_end_datetime
+        FROM visit_occurrence
+    ''')
+
+    if personID != None:
+        query.where('person_id=%s', personID)
+
+    if visitType != None:
+        query.where('visit_concept_id=%s', lookup.VISIT_TYPE.get(visitType))
+
+    if date != None:
+        query.where('visit_start_datetime >= %s AND visit_end_datetime <= %s', startDate, endDate)
+
+    if after != None:
+        query.seek('visit_occurrence_id > %s', *after)
+
+    query.orderBy('visit_occurrence_id')
+
+    # 내보내기 형식이 주어질 경우, 페이지 구분 없이 조회 결과 전체를 스트리밍합니다.
+    if exportFormat != None:
+        return Response(**export.makeStreamResponse(exportFormat, 'visits', *query.build(), lambda row: formatVisit(row, lookup)))
+
+    # 검색 결과 개수는 커서 조건과 페이지를 제외한 필터 조합으로 계산하므로, 다음 페이지에서도 캐시된 개수를 사용합니다.
+    countQuery, countArgument = query.buildCount()
+
+    # 다음 페이지가 존재하는지 확인하기 위해, 한 행 더 조회합니다.
+    query, argument = query.paginate(page, int(pageSize) + 1).build()
+
     # --- 응답 메시지 정의 --- #
 
     status = 'SUCCESS'
     data   = {
-        'visits': []
+        'visits': [],
+        'has_more': False,
+        'next_cursor': None,
+        'total': None,
+        'total_method': None
     }
 
     # --- 데이터베이스 조회 --- #
 
     try:
-        with db.connection.cursor() as cursor:
-            query = '''
-                SELECT visit_occurrence_id, person_id, visit_concept_id, visit_start_datetime, visit_end_datetime
-                FROM visit_occurrence
-            '''
-            argument = []
-
-            # --- 키워드 파싱을 통한 동적 쿼리 구성 --- #
-
-            keywordNumber = sum([personID != None, visitType != None, date != None])
-            keywordCount  = 0
-
-            if keywordNumber != 0:
-                query += ' WHERE'
-
-            if personID != None:
-                if keywordCount != 0:
-                    query += ' AND'
-
-                query        += ' person_id=%s'
-                argument.append(personID)
-                keywordCount += 1
-
-            if visitType != None:
-                if keywordCount != 0:
-                    query += ' AND'
-
-                if visitType in VISIT_TYPE:
-                    visitTypeID = VISIT_TYPE[visitType]
-                else:
-                    visitTypeID = None
-
-                query        += ' visit_concept_id=%s'
-                argument.append(visitTypeID)
-                keywordCount += 1
-
-            if date != None:
-                if keywordCount != 0:
-                    query += ' AND'
-
-                query        += ' visit_start_datetime >= %s AND visit_end_datetime <= %s'
-                argument.extend([startDate, endDate])
-                keywordCount += 1
-
-            query += ' ORDER BY visit_occurrence_id OFFSET %s LIMIT %s'
-            argument.extend([page, pageSize])
-
-            cursor.execute(query, argument)
-
-            for visit in cursor.fetchall():
-                data['visits'].append({
-                    'visit_id': visit['visit_occurrence_id'],
-                    'person_id': visit['person_id'],
-                    'visit_concept_id': visit['visit_concept_id'],
-                    'visit_concept_name': REVERSED_VISIT_TYPE[visit['visit_concept_id']],
-                    'start_date': visit['visit_start_datetime'].strftime('%Y-%m-%d'),
-                    'end_date': visit['visit_end_datetime'].strftime('%Y-%m-%d')
-                })
+        with db.connect() as connection, connection.cursor() as cursor:
+            execute(cursor, query, argument)
+            visits = cursor.fetchall()
+
+            # 한 행 더 조회되었을 경우 다음 페이지가 존재하며, 추가로 조회한 행은 반환하지 않습니다.
+            data['has_more'] = len(visits) > int(pageSize)
+            visits           = visits[:int(pageSize)]
+
+            for visit in visits:
+                data['visits'].append(formatVisit(visit, lookup))
+
+            # 다음 페이지가 존재할 경우, 마지막 행의 정렬 키를 다음 페이지의 커서로 반환합니다.
+            if data['has_more']:
+                data['next_cursor'] = pagination.encodeCursor([visits[-1]['visit_occurrence_id']])
+
+        if withTotal:
+            data['total'], data['total_method'] = getTotal(countQuery, countArgument)
     except psycopg2.DatabaseError as error:
         status = 'DATABASE_ERROR'
         data   = None
 
-        db.connection.rollback()
         current_app.logger.error(error)
 
     return Response(**api.makeResponse(status, data))
\ No newline at end of file
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from collections import Counter
+
+# === 서드파티 패키지 임포트 === #
+
+from flask import Blueprint, Response, current_app, request
+
+import psycopg2
+
+# === 사용자 정의 모듈 임포트 === #
+
+from cache.response    import STATISTIC_TTL, cached
+from cache.statistic   import getFreshness, getStatistic
+from constant.lookup   import Lookup, getLookup
+from utility.admission import admit, classifyStatistic
+
+import utility.api as api
+
+# === 상수 정의 === #
+
+# 측정 값별로 사용할 수 있는 차원 (통계 스냅샷의 cube 키 순서와 같음)
+DIMENSION = {
+    'person': ['gender', 'race', 'ethnicity', 'age'],
+    'visit': ['gender', 'race', 'ethnicity', 'age', 'visit_type']
+}
+
+# === 전역 변수 정의 === #
+
+blueprint = Blueprint('statistic_cube', __name__, url_prefix='/statistic/cube')
+
+# === 함수 정의 === #
+
+def getName(dimension: str, value: object, lookup: Lookup) -> object:
+    '''
+    차원 값을 응답에 사용할 이름으로 변환합니다. 성별, 인종, 방문 유형은 concept_name으로 변환하며, 민족과 연령대는 그대로 반환합니다.
+
+    Args:
+        dimension (str): 차원 이름
+        value (object): 차원 값
+        lookup (Lookup): 조회 테이블 스냅샷
+
+    Returns:
+        name (object): 응답에 사용할 이름
+    '''
+
+    names = {
+        'gender': lookup.REVERSED_GENDER,
+        'race': lookup.REVERSED_RACE,
+        'visit_type': lookup.REVERSED_VISIT_TYPE
+    }
+
+    if dimension not in names or value == None:
+        return value
+
+    return names[dimension].get(value, str(value))
+
+# === 라우터 정의 === #
+
+@blueprint.route('/', methods=['GET'])
+@cached(ttl=STATISTIC_TTL)
+@admit(classifyStatistic)
+def index() -> Response:
+    '''
+    여러 차원의 교차 집계를 조회하기 위한 라우터입니다.
+
+    통계 스냅샷에 보관된 가장 세분화된 집계 결과를 메모리에서 다시 합산하므로, 차원 조합과 관계없이 데이터베이스를 조회하지 않습니다.
+
+    Methods:
+        GET
+
+    Params:
+        measure ('person' | 'visit', opt, default='person'): 측정 값 (환자 수 | 방문 수)
+        dimensions (str, opt, default=None): 쉼표로 구분한 차원 목록 (gender, race, ethnicity, age, visit_type)으로, 지정하지 않을 경우 전체 합계만 조회
+
+    Responses:
+        {
+            'status': <STATUS>,
+            'data': <DIMENSIONS> | {
+                'measure': <MEASURE>,
+                'dimensions': [<DIMENSION>, ...],
+                'cells': [{
+                    <DIMENSION>: <VALUE>, ...,
+                    'count': <COUNT>
+                }, ...],
+                'total': <TOTAL COUNT>,
+                'refreshed_at': <REFRESHED DATETIME>,
+                'staleness': <SECONDS SINCE REFRESH>
+            }
+        }
+    '''
+
+    # 요청을 처리하는 동안 하나의 조회 테이블 스냅샷만 사용합니다.
+    lookup = getLookup()
+
+    # --- 파라미터 파싱 --- #
+
+    parameter  = request.args.to_dict()
+    measure    = parameter.get('measure', 'person')
+    dimensions = parameter.get('dimensions', None)
+
+    if measure not in DIMENSION:
+        return Response(**api.makeResponse('INVALID_DATA', list(DIMENSION.keys())))
+
+    dimensions = [] if dimensions in (None, '') else dimensions.split(',')
+
+    # 측정 값에서 사용할 수 없거나 중복된 차원을 조회할 경우, 사용할 수 있는 차원 목록을 반환합니다.
+    if any(dimension not in DIMENSION[measure] for dimension in dimensions) or len(set(dimensions)) != len(dimensions):
+        return Response(**api.makeResponse('INVALID_DATA', DIMENSION[measure]))
+
+    positions = [DIMENSION[measure].index(dimension) for dimension in dimensions]
+
+    # --- 응답 메시지 정의 --- #
+
+    status = 'SUCCESS'
+    data   = None
+
+    # --- 통계 조회 --- #
+
+    try:
+        statistic = getStatistic()
+        cells     = Counter()
+
+        for key, count in statistic['cube'][measure].items():
+            cells[tuple(key[position] for position in positions)] += count
+
+        # 차원 값의 형식을 유지하여 정렬하므로, 연령대와 같은 숫자는 숫자 순서로, 값이 없는 셀 (None)은 마지막으로 정렬됩니다.
+        data = {
+            'measure': measure,
+            'dimensions': dimensions,
+            'cells': [
+                {
+                    **{ dimension: getName(dimension, value, lookup) for dimension, value in zip(dimensions, key) },
+                    'count': count
+                }
+                for key, count in sorted(cells.items(), key=lambda cell: [(value == None, value) for value in cell[0]])
+            ],
+            'total': sum(cells.values()),
+            **getFreshness(statistic)
+        }
+    except psycopg2.DatabaseError as error:
+        status = 'DATABASE_ERROR'
+        data   = None
+
+        current_app.logger.error(error)
+
+    return Response(**api.makeResponse(status, data))
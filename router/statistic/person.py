@@ -2,28 +2,85 @@
 #
 # Copyright (c) Sangsu Ryu
 
+# === 표준 패키지 임포트 === #
+
+from collections import Counter
+from datetime    import date
+from typing      import Any, Tuple
+
 # === 서드파티 패키지 임포트 === #
 
-from flask import Blueprint, Response, current_app
+from flask import Blueprint, Response, current_app, request
 
 import psycopg2
 
 # === 사용자 정의 모듈 임포트 === #
 
-from constant.ethnicity import ETHNICITY
-from constant.gender    import GENDER
-from constant.race      import RACE
+from cache.person      import countAge, countBy, getPersonTable
+from cache.response    import STATISTIC_TTL, cached
+from cache.statistic   import getFreshness, getStatistic
+from constant.lookup   import getLookup
+from database.estimate import ACCURACY, describeCount, describeCounts, estimatePerson
+from utility.admission import admit, classifyStatistic
 
-import database.database as db
-import utility.api       as api
+import utility.api as api
 
 # === 전역 변수 정의 === #
 
 blueprint = Blueprint('statistic_person', __name__, url_prefix='/statistic/person')
 
+# === 함수 정의 === #
+
+def getCounts(name: str, accuracy: str = 'exact') -> Tuple[Any, dict]:
+    '''
+    환자 통계를 조회합니다. person 테이블이 메모리에 적재되어 있을 경우 적재된 배열로 계산하며, 그렇지 않을 경우 통계 스냅샷을 사용합니다.
+    accuracy가 approx일 경우 플래너 통계나 표본으로 추정합니다.
+
+    Args:
+        name ('count' | 'death' | 'gender' | 'race' | 'ethnicity' | 'age'): 통계 이름
+        accuracy ('exact' | 'approx', opt, default='exact'): 정확도
+
+    Returns:
+        counts (Any): 전체 환자 수 또는 값별 환자 수
+        snapshot (dict): 통계를 계산한 스냅샷 또는 추정 결과 (갱신 시각과 계산 방법에 사용)
+
+    Raises:
+        psycopg2.DatabaseError: 통계 스냅샷 계산 또는 추정에 실패한 경우
+    '''
+
+    if accuracy == 'approx':
+        return estimatePerson(name)
+
+    person = getPersonTable()
+
+    if person != None and name != 'death':
+        if name == 'count':
+            return person['count'], person
+
+        if name == 'age':
+            return countAge(person, date.today()), person
+
+        return countBy(person, name), person
+
+    statistic = getStatistic()
+
+    # 통계 스냅샷에는 환자의 연령대별 합계가 없으므로, 교차 집계 결과를 연령대별로 합산합니다.
+    if name == 'age':
+        counts = Counter()
+
+        for (_, _, _, age), count in statistic['cube']['person'].items():
+            if age != None:
+                counts[age] += count
+
+        return counts, statistic
+
+    return statistic['person'][name], statistic
+
 # === 라우터 정의 === #
 
 @blueprint.route('/person_count', methods=['GET'])
+@cached(ttl=STATISTIC_TTL)
+@admit(classifyStatistic)
 def personCount() -> Response:
     '''
     전체 환자 수를 조회하기 위한 라우터입니다.
@@ -31,170 +88,289 @@ def personCount() -> Response:
     Methods:
         GET
 
+    Params:
+        accuracy ('exact' | 'approx', opt, default='exact'): 정확도로, approx일 경우 플래너 통계 또는 표본으로 추정하며 표본 추정은 신뢰 구간을 함께 반환
+
     Responses:
         {
             'status': <STATUS>,
             'data': {
-                'count': <COUNT>
+                'count': <COUNT>,
+                'refreshed_at': <REFRESHED DATETIME>,
+                'staleness': <SECONDS SINCE REFRESH>,
+                'method': <METHOD>
             }
         }
     '''
 
+    # --- 파라미터 파싱 --- #
+
+    accuracy = request.args.get('accuracy', 'exact')
+
+    if accuracy not in ACCURACY:
+        return Response(**api.makeResponse('INVALID_DATA', ACCURACY))
+
     # --- 응답 메시지 정의 --- #
 
     status = 'SUCCESS'
-    data   = {
-        'count': -1
-    }
+    data   = None
 
-    # --- 데이터베이스 조회 --- #
+    # --- 통계 조회 --- #
 
     try:
-        with db.connection.cursor() as cursor:
-            cursor.execute('SELECT person_id FROM person')
-            data['count'] = len(cursor.fetchall())
+        count, snapshot = getCounts('count', accuracy)
+
+        data = {
+            'count': count,
+            **getFreshness(snapshot),
+            **describeCount(snapshot, None)
+        }
     except psycopg2.DatabaseError as error:
         status = 'DATABASE_ERROR'
         data   = None
 
-        db.connection.rollback()
         current_app.logger.error(error)
 
     return Response(**api.makeResponse(status, data))
 
 @blueprint.route('/gender_count', defaults={ 'gender': None }, methods=['GET'])
 @blueprint.route('/gender_count/<string:gender>', methods=['GET'])
+@cached(ttl=STATISTIC_TTL)
+@admit(classifyStatistic)
 def genderCount(gender: str) -> Response:
     '''
-    성별 환자 수를 조회하기 위한 라우터입니다.
+    성별 환자 수를 조회하기 위한 라우터로, 성별을 지정하지 않을 경우 모든 성별의 환자 수를 조회합니다.
 
     Methods:
         GET
 
+    Params:
+        accuracy ('exact' | 'approx', opt, default='exact'): 정확도로, approx일 경우 플래너 통계 또는 표본으로 추정하며 표본 추정은 신뢰 구간을 함께 반환
+
     Responses:
         {
             'status': <STATUS>,
             'data': <GENDER> | {
-                'count': <COUNT>
+                'count': <COUNT>,
+                'refreshed_at': <REFRESHED DATETIME>,
+                'staleness': <SECONDS SINCE REFRESH>,
+                'method': <METHOD>
+            } | {
+                'counts': {
+                    <GENDER>: <COUNT>, ...
+                },
+                'refreshed_at': <REFRESHED DATETIME>,
+                'staleness': <SECONDS SINCE REFRESH>,
+                'method': <METHOD>
             }
         }
     '''
 
+    # 요청을 처리하는 동안 하나의 조회 테이블 스냅샷만 사용합니다.
+    lookup = getLookup()
+
     # 테이블에 존재하지 않는 성별을 조회할 경우, 조회 가능한 성별 목록을 반환합니다.
-    if gender not in GENDER:
-        return Response(**api.makeResponse('INVALID_DATA', list(GENDER.keys())))
+    if gender != None and gender not in lookup.GENDER:
+        return Response(**api.makeResponse('INVALID_DATA', list(lookup.GENDER.keys())))
+
+    # --- 파라미터 파싱 --- #
+
+    accuracy = request.args.get('accuracy', 'exact')
+
+    if accuracy not in ACCURACY:
+        return Response(**api.makeResponse('INVALID_DATA', ACCURACY))
 
     # --- 응답 메시지 정의 --- #
 
     status = 'SUCCESS'
-    data   = {
-        'count': -1
-    }
+    data   = None
 
-    # --- 데이터베이스 조회 --- #
+    # --- 통계 조회 --- #
 
     try:
-        with db.connection.cursor() as cursor:
-            cursor.execute('SELECT person_id FROM person WHERE gender_concept_id=%s', [GENDER[gender]])
-            data['count'] = len(cursor.fetchall())
+        counts, snapshot = getCounts('gender', accuracy)
+
+        if gender == None:
+            data = {
+                'counts': {
+                    lookup.REVERSED_GENDER.get(genderID, str(genderID)): count for genderID, count in counts.items()
+                },
+                **describeCounts(snapshot, lambda genderID: lookup.REVERSED_GENDER.get(genderID, str(genderID)))
+            }
+        else:
+            data = {
+                'count': counts.get(lookup.GENDER[gender], 0),
+                **describeCount(snapshot, lookup.GENDER[gender])
+            }
+
+        data.update(getFreshness(snapshot))
     except psycopg2.DatabaseError as error:
         status = 'DATABASE_ERROR'
         data   = None
 
-        db.connection.rollback()
         current_app.logger.error(error)
 
     return Response(**api.makeResponse(status, data))
 
 @blueprint.route('/race_count', defaults={ 'race': None }, methods=['GET'])
 @blueprint.route('/race_count/<string:race>', methods=['GET'])
+@cached(ttl=STATISTIC_TTL)
+@admit(classifyStatistic)
 def raceCount(race: str) -> Response:
     '''
-    인종별 환자 수를 조회하기 위한 라우터입니다.
+    인종별 환자 수를 조회하기 위한 라우터로, 인종을 지정하지 않을 경우 모든 인종의 환자 수를 조회합니다.
 
     Methods:
         GET
 
+    Params:
+        accuracy ('exact' | 'approx', opt, default='exact'): 정확도로, approx일 경우 플래너 통계 또는 표본으로 추정하며 표본 추정은 신뢰 구간을 함께 반환
+
     Responses:
         {
             'status': <STATUS>,
             'data': <RACE> | {
-                'count': <COUNT>
+                'count': <COUNT>,
+                'refreshed_at': <REFRESHED DATETIME>,
+                'staleness': <SECONDS SINCE REFRESH>,
+                'method': <METHOD>
+            } | {
+                'counts': {
+                    <RACE>: <COUNT>, ...
+                },
+                'refreshed_at': <REFRESHED DATETIME>,
+                'staleness': <SECONDS SINCE REFRESH>,
+                'method': <METHOD>
             }
         }
     '''
 
+    # 요청을 처리하는 동안 하나의 조회 테이블 스냅샷만 사용합니다.
+    lookup = getLookup()
+
     # 테이블에 존재하지 않는 인종을 조회할 경우, 조회 가능한 인종 목록을 반환합니다.
-    if race not in RACE:
-        return Response(**api.makeResponse('INVALID_DATA', list(RACE.keys())))
+    if race != None and race not in lookup.RACE:
+        return Response(**api.makeResponse('INVALID_DATA', list(lookup.RACE.keys())))
+
+    # --- 파라미터 파싱 --- #
+
+    accuracy = request.args.get('accuracy', 'exact')
+
+    if accuracy not in ACCURACY:
+        return Response(**api.makeResponse('INVALID_DATA', ACCURACY))
 
     # --- 응답 메시지 정의 --- #
 
     status = 'SUCCESS'
-    data   = {
-        'count': -1
-    }
+    data   = None
 
-    # --- 데이터베이스 조회 --- #
+    # --- 통계 조회 --- #
 
     try:
-        with db.connection.cursor() as cursor:
-            cursor.execute('SELECT person_id FROM person WHERE race_concept_id=%s', [RACE[race]])
-            data['count'] = len(cursor.fetchall())
+        counts, snapshot = getCounts('race', accuracy)
+
+        if race == None:
+            data = {
+                'counts': {
+                    lookup.REVERSED_RACE.get(raceID, str(raceID)): count for raceID, count in counts.items()
+                },
+                **describeCounts(snapshot, lambda raceID: lookup.REVERSED_RACE.get(raceID, str(raceID)))
+            }
+        else:
+            data = {
+                'count': counts.get(lookup.RACE[race], 0),
+                **describeCount(snapshot, lookup.RACE[race])
+            }
+
+        data.update(getFreshness(snapshot))
     except psycopg2.DatabaseError as error:
         status = 'DATABASE_ERROR'
         data   = None
 
-        db.connection.rollback()
         current_app.logger.error(error)
 
     return Response(**api.makeResponse(status, data))
 
 @blueprint.route('/ethnicity_count', defaults={ 'ethnicity': None }, methods=['GET'])
 @blueprint.route('/ethnicity_count/<string:ethnicity>', methods=['GET'])
+@cached(ttl=STATISTIC_TTL)
+@admit(classifyStatistic)
 def ethnicityCount(ethnicity: str) -> Response:
     '''
-    민족별 환자 수를 조회하기 위한 라우터입니다.
+    민족별 환자 수를 조회하기 위한 라우터로, 민족을 지정하지 않을 경우 모든 민족의 환자 수를 조회합니다.
 
     Methods:
         GET
 
+    Params:
+        accuracy ('exact' | 'approx', opt, default='exact'): 정확도로, approx일 경우 플래너 통계 또는 표본으로 추정하며 표본 추정은 신뢰 구간을 함께 반환
+
     Responses:
         {
             'status': <STATUS>,
             'data': <ETHNICITY> | {
-                'count': <COUNT>
+                'count': <COUNT>,
+                'refreshed_at': <REFRESHED DATETIME>,
+                'staleness': <SECONDS SINCE REFRESH>,
+                'method': <METHOD>
+            } | {
+                'counts': {
+                    <ETHNICITY>: <COUNT>, ...
+                },
+                'refreshed_at': <REFRESHED DATETIME>,
+                'staleness': <SECONDS SINCE REFRESH>,
+                'method': <METHOD>
             }
         }
     '''
 
+    # 요청을 처리하는 동안 하나의 조회 테이블 스냅샷만 사용합니다.
+    lookup = getLookup()
+
     # 테이블에 존재하지 않는 민족을 조회할 경우, 조회 가능한 민족 목록을 반환합니다.
-    if ethnicity not in ETHNICITY:
-        return Response(**api.makeResponse('INVALID_DATA', list(ETHNICITY)))
+    if ethnicity != None and ethnicity not in lookup.ETHNICITY:
+        return Response(**api.makeResponse('INVALID_DATA', list(lookup.ETHNICITY)))
+
+    # --- 파라미터 파싱 --- #
+
+    accuracy = request.args.get('accuracy', 'exact')
+
+    if accuracy not in ACCURACY:
+        return Response(**api.makeResponse('INVALID_DATA', ACCURACY))
 
     # --- 응답 메시지 정의 --- #
 
     status = 'SUCCESS'
-    data   = {
-        'count': -1
-    }
+    data   = None
 
-    # --- 데이터베이스 조회 --- #
+    # --- 통계 조회 --- #
 
     try:
-        with db.connection.cursor() as cursor:
-            cursor.execute('SELECT person_id FROM person WHERE ethnicity_source_value=%s', [ethnicity])
-            data['count'] = len(cursor.fetchall())
+        counts, snapshot = getCounts('ethnicity', accuracy)
+
+        if ethnicity == None:
+            data = {
+                'counts': dict(counts),
+                **describeCounts(snapshot)
+            }
+        else:
+            data = {
+                'count': counts.get(ethnicity, 0),
+                **describeCount(snapshot, ethnicity)
+            }
+
+        data.update(getFreshness(snapshot))
     except psycopg2.DatabaseError as error:
         status = 'DATABASE_ERROR'
         data   = None
 
-        db.connection.rollback()
         current_app.logger.error(error)
 
     return Response(**api.makeResponse(status, data))
 
 @blueprint.route('/death_count', methods=['GET'])
+@cached(ttl=STATISTIC_TTL)
+@admit(classifyStatistic)
 def deathCount() -> Response:
     '''
     사망 환자 수를 조회하기 위한 라우터입니다.
@@ -202,33 +378,122 @@ def deathCount() -> Response:
     Methods:
         GET
 
+    Params:
+        accuracy ('exact' | 'approx', opt, default='exact'): 정확도로, approx일 경우 플래너 통계 또는 표본으로 추정하며 표본 추정은 신뢰 구간을 함께 반환
+
     Responses:
         {
             'status': <STATUS>,
             'data': {
-                'count': <COUNT>
+                'count': <COUNT>,
+                'refreshed_at': <REFRESHED DATETIME>,
+                'staleness': <SECONDS SINCE REFRESH>,
+                'method': <METHOD>
+            }
+        }
+    '''
+
+    # --- 파라미터 파싱 --- #
+
+    accuracy = request.args.get('accuracy', 'exact')
+
+    if accuracy not in ACCURACY:
+        return Response(**api.makeResponse('INVALID_DATA', ACCURACY))
+
+    # --- 응답 메시지 정의 --- #
+
+    status = 'SUCCESS'
+    data   = None
+
+    # --- 통계 조회 --- #
+
+    try:
+        count, snapshot = getCounts('death', accuracy)
+
+        data = {
+            'count': count,
+            **getFreshness(snapshot),
+            **describeCount(snapshot, None)
+        }
+    except psycopg2.DatabaseError as error:
+        status = 'DATABASE_ERROR'
+        data   = None
+
+        current_app.logger.error(error)
+
+    return Response(**api.makeResponse(status, data))
+
+@blueprint.route('/age_count', defaults={ 'age': None }, methods=['GET'])
+@blueprint.route('/age_count/<int:age>', methods=['GET'])
+@cached(ttl=STATISTIC_TTL)
+@admit(classifyStatistic)
+def ageCount(age: int) -> Response:
+    '''
+    10살 단위의 연령대별 환자 수를 조회하기 위한 라우터로, 만 나이를 기준으로 합니다.
+    연령대를 지정하지 않을 경우 모든 연령대의 환자 수를 조회합니다.
+
+    Methods:
+        GET
+
+    Params:
+        accuracy ('exact' | 'approx', opt, default='exact'): 정확도로, approx일 경우 플래너 통계 또는 표본으로 추정하며 표본 추정은 신뢰 구간을 함께 반환
+
+    Responses:
+        {
+            'status': <STATUS>,
+            'data': [0, 10, 20, '...'] | {
+                'count': <COUNT>,
+                'refreshed_at': <REFRESHED DATETIME>,
+                'staleness': <SECONDS SINCE REFRESH>,
+                'method': <METHOD>
+            } | {
+                'counts': {
+                    <AGE>: <COUNT>, ...
+                },
+                'refreshed_at': <REFRESHED DATETIME>,
+                'staleness': <SECONDS SINCE REFRESH>,
+                'method': <METHOD>
             }
         }
     '''
 
+    # 10살 단위의 조회가 아닐 경우, 올바른 조회 방법을 반환합니다.
+    if age != None and age % 10 != 0:
+        return Response(**api.makeResponse('INVALID_DATA', [0, 10, 20, '...']))
+
+    # --- 파라미터 파싱 --- #
+
+    accuracy = request.args.get('accuracy', 'exact')
+
+    if accuracy not in ACCURACY:
+        return Response(**api.makeResponse('INVALID_DATA', ACCURACY))
+
     # --- 응답 메시지 정의 --- #
 
     status = 'SUCCESS'
-    data   = {
-        'count': -1
-    }
+    data   = None
 
-    # --- 데이터베이스 조회 --- #
+    # --- 통계 조회 --- #
 
     try:
-        with db.connection.cursor() as cursor:
-            cursor.execute('SELECT person_id FROM death')
-            data['count'] = len(cursor.fetchall())
+        counts, snapshot = getCounts('age', accuracy)
+
+        if age == None:
+            data = {
+                'counts': dict(sorted(counts.items())),
+                **describeCounts(snapshot)
+            }
+        else:
+            data = {
+                'count': counts.get(age, 0),
+                **describeCount(snapshot, age)
+            }
+
+        data.update(getFreshness(snapshot))
     except psycopg2.DatabaseError as error:
         status = 'DATABASE_ERROR'
         data   = None
 
-        db.connection.rollback()
         current_app.logger.error(error)
 
-    return Response(**api.makeResponse(status, data))
\ No newline at end of file
+    return Response(**api.makeResponse(status, data))
@@ -4,272 +4,441 @@
 
 # === 표준 패키지 임포트 === #
 
-from datetime import datetime
+from collections import Counter
+from typing      import Tuple
 
 # === 서드파티 패키지 임포트 === #
 
-from dateutil.relativedelta import relativedelta
-from flask                  import Blueprint, Response, current_app
+from flask import Blueprint, Response, current_app, request
 
 import psycopg2
 
 # === 사용자 정의 모듈 임포트 === #
 
-from constant.ethnicity import ETHNICITY
-from constant.gender    import GENDER
-from constant.race      import RACE
-from constant.visitType import VISIT_TYPE
+from cache.response    import STATISTIC_TTL, cached
+from cache.statistic   import getFreshness, getStatistic
+from constant.lookup   import getLookup
+from database.estimate import ACCURACY, describeCount, describeCounts, estimateVisit
+from utility.admission import admit, classifyStatistic
 
-import database.database as db
-import utility.api       as api
+import utility.api as api
 
 # === 전역 변수 정의 === #
 
 blueprint = Blueprint('statistic_visit', __name__, url_prefix='/statistic/visit')
 
+# === 함수 정의 === #
+
+def getCounts(name: str, accuracy: str) -> Tuple[Counter, dict]:
+    '''
+    방문 통계를 조회합니다. accuracy가 approx일 경우 플래너 통계나 표본으로 추정하며, 그렇지 않을 경우 통계 스냅샷을 사용합니다.
+
+    Args:
+        name ('visit_type' | 'gender' | 'race' | 'ethnicity' | 'age'): 통계 이름
+        accuracy ('exact' | 'approx'): 정확도
+
+    Returns:
+        counts (Counter): 값별 방문 수
+        snapshot (dict): 통계 스냅샷 또는 추정 결과 (갱신 시각과 계산 방법에 사용)
+
+    Raises:
+        psycopg2.DatabaseError: 통계 스냅샷 계산 또는 추정에 실패한 경우
+    '''
+
+    if accuracy == 'approx':
+        return estimateVisit(name)
+
+    statistic = getStatistic()
+
+    return statistic['visit'][name], statistic
+
 # === 라우터 정의 === #
 
 @blueprint.route('/visit_type_count', defaults={ 'visitType': None }, methods=['GET'])
 @blueprint.route('/visit_type_count/<string:visitType>', methods=['GET'])
+@cached(ttl=STATISTIC_TTL)
+@admit(classifyStatistic)
 def visitTypeCount(visitType: str) -> Response:
     '''
-    방문 유형 별 방문 수를 조회하기 위한 라우터입니다.
+    방문 유형 별 방문 수를 조회하기 위한 라우터로, 방문 유형을 지정하지 않을 경우 모든 방문 유형의 방문 수를 조회합니다.
 
     Methods:
         GET
 
+    Params:
+        accuracy ('exact' | 'approx', opt, default='exact'): 정확도로, approx일 경우 플래너 통계 또는 표본으로 추정하며 표본 추정은 신뢰 구간을 함께 반환
+
     Responses:
         {
             'status': <STATUS>,
             'data': <VISIT_TYPE> | {
-                'count': <COUNT>
+                'count': <COUNT>,
+                'refreshed_at': <REFRESHED DATETIME>,
+                'staleness': <SECONDS SINCE REFRESH>,
+                'method': <METHOD>
+            } | {
+                'counts': {
+                    <VISIT_TYPE>: <COUNT>, ...
+                },
+                'refreshed_at': <REFRESHED DATETIME>,
+                'staleness': <SECONDS SINCE REFRESH>,
+                'method': <METHOD>
             }
         }
     '''
 
+    # 요청을 처리하는 동안 하나의 조회 테이블 스냅샷만 사용합니다.
+    lookup = getLookup()
+
     # 테이블에 존재하지 않는 방문 유형을 조회할 경우, 조회 가능한 방문 유형을 반환합니다.
-    if visitType not in VISIT_TYPE:
-        return Response(**api.makeResponse('INVALID_DATA', list(VISIT_TYPE.keys())))
+    if visitType != None and visitType not in lookup.VISIT_TYPE:
+        return Response(**api.makeResponse('INVALID_DATA', list(lookup.VISIT_TYPE.keys())))
+
+    # --- 파라미터 파싱 --- #
+
+    accuracy = request.args.get('accuracy', 'exact')
+
+    if accuracy not in ACCURACY:
+        return Response(**api.makeResponse('INVALID_DATA', ACCURACY))
 
     # --- 응답 메시지 정의 --- #
 
     status = 'SUCCESS'
-    data   = {
-        'count': -1
-    }
+    data   = None
 
-    # --- 데이터베이스 조회 --- #
+    # --- 통계 조회 --- #
 
     try:
-        with db.connection.cursor() as cursor:
-            cursor.execute('SELECT visit_occurrence_id FROM visit_occurrence WHERE visit_concept_id=%s', [VISIT_TYPE[visitType]])
-            data['count'] = len(cursor.fetchall())
+        counts, snapshot = getCounts('visit_type', accuracy)
+
+        if visitType == None:
+            data = {
+                'counts': {
+                    lookup.REVERSED_VISIT_TYPE.get(visitTypeID, str(visitTypeID)): count for visitTypeID, count in counts.items()
+                },
+                **describeCounts(snapshot, lambda visitTypeID: lookup.REVERSED_VISIT_TYPE.get(visitTypeID, str(visitTypeID)))
+            }
+        else:
+            data = {
+                'count': counts.get(lookup.VISIT_TYPE[visitType], 0),
+                **describeCount(snapshot, lookup.VISIT_TYPE[visitType])
+            }
+
+        data.update(getFreshness(snapshot))
     except psycopg2.DatabaseError as error:
         status = 'DATABASE_ERROR'
         data   = None
 
-        db.connection.rollback()
         current_app.logger.error(error)
 
     return Response(**api.makeResponse(status, data))
 
 @blueprint.route('/gender_count', defaults={ 'gender': None }, methods=['GET'])
 @blueprint.route('/gender_count/<string:gender>', methods=['GET'])
+@cached(ttl=STATISTIC_TTL)
+@admit(classifyStatistic)
 def genderCount(gender: str) -> Response:
     '''
-    성별 방문 수를 조회하기 위한 라우터입니다.
+    성별 방문 수를 조회하기 위한 라우터로, 성별을 지정하지 않을 경우 모든 성별의 방문 수를 조회합니다.
 
     Methods:
         GET
 
+    Params:
+        accuracy ('exact' | 'approx', opt, default='exact'): 정확도로, approx일 경우 플래너 통계 또는 표본으로 추정하며 표본 추정은 신뢰 구간을 함께 반환
+
     Responses:
         {
             'status': <STATUS>,
             'data': <GENDER> | {
-                'count': <COUNT>
+                'count': <COUNT>,
+                'refreshed_at': <REFRESHED DATETIME>,
+                'staleness': <SECONDS SINCE REFRESH>,
+                'method': <METHOD>
+            } | {
+                'counts': {
+                    <GENDER>: <COUNT>, ...
+                },
+                'refreshed_at': <REFRESHED DATETIME>,
+                'staleness': <SECONDS SINCE REFRESH>,
+                'method': <METHOD>
             }
         }
     '''
 
+    # 요청을 처리하는 동안 하나의 조회 테이블 스냅샷만 사용합니다.
+    lookup = getLookup()
+
     # 테이블에 존재하지 않는 성별을 조회할 경우, 조회 가능한 성별 목록을 반환합니다.
-    if gender not in GENDER:
-        return Response(**api.makeResponse('INVALID_DATA', list(GENDER.keys())))
+    if gender != None and gender not in lookup.GENDER:
+        return Response(**api.makeResponse('INVALID_DATA', list(lookup.GENDER.keys())))
+
+    # --- 파라미터 파싱 --- #
+
+    accuracy = request.args.get('accuracy', 'exact')
+
+    if accuracy not in ACCURACY:
+        return Response(**api.makeResponse('INVALID_DATA', ACCURACY))
 
     # --- 응답 메시지 정의 --- #
 
     status = 'SUCCESS'
-    data   = {
-        'count': -1
-    }
+    data   = None
 
-    # --- 데이터베이스 조회 --- #
+    # --- 통계 조회 --- #
 
     try:
-        with db.connection.cursor() as cursor:
-            cursor.execute('''
-                SELECT v.visit_occurrence_id
-                FROM person AS p JOIN visit_occurrence AS v
-                ON p.person_id=v.person_id AND p.gender_concept_id=%s
-            ''', [GENDER[gender]])
-            data['count'] = len(cursor.fetchall())
+        counts, snapshot = getCounts('gender', accuracy)
+
+        if gender == None:
+            data = {
+                'counts': {
+                    lookup.REVERSED_GENDER.get(genderID, str(genderID)): count for genderID, count in counts.items()
+                },
+                **describeCounts(snapshot, lambda genderID: lookup.REVERSED_GENDER.get(genderID, str(genderID)))
+            }
+        else:
+            data = {
+                'count': counts.get(lookup.GENDER[gender], 0),
+                **describeCount(snapshot, lookup.GENDER[gender])
+            }
+
+        data.update(getFreshness(snapshot))
     except psycopg2.DatabaseError as error:
         status = 'DATABASE_ERROR'
         data   = None
 
-        db.connection.rollback()
         current_app.logger.error(error)
 
     return Response(**api.makeResponse(status, data))
 
 @blueprint.route('/race_count', defaults={ 'race': None }, methods=['GET'])
 @blueprint.route('/race_count/<string:race>', methods=['GET'])
+@cached(ttl=STATISTIC_TTL)
+@admit(classifyStatistic)
 def raceCount(race: str) -> Response:
     '''
-    인종별 방문 수를 조회하기 위한 라우터입니다.
+    인종별 방문 수를 조회하기 위한 라우터로, 인종을 지정하지 않을 경우 모든 인종의 방문 수를 조회합니다.
 
     Methods:
         GET
 
+    Params:
+        accuracy ('exact' | 'approx', opt, default='exact'): 정확도로, approx일 경우 플래너 통계 또는 표본으로 추정하며 표본 추정은 신뢰 구간을 함께 반환
+
     Responses:
         {
             'status': <STATUS>,
             'data': <RACE> | {
-                'count': <COUNT>
+                'count': <COUNT>,
+                'refreshed_at': <REFRESHED DATETIME>,
+                'staleness': <SECONDS SINCE REFRESH>,
+                'method': <METHOD>
+            } | {
+                'counts': {
+                    <RACE>: <COUNT>, ...
+                },
+                'refreshed_at': <REFRESHED DATETIME>,
+                'staleness': <SECONDS SINCE REFRESH>,
+                'method': <METHOD>
             }
         }
     '''
 
+    # 요청을 처리하는 동안 하나의 조회 테이블 스냅샷만 사용합니다.
+    lookup = getLookup()
+
     # 테이블에 존재하지 않는 인종을 조회할 경우, 조회 가능한 인종 목록을 반환합니다.
-    if race not in RACE:
-        return Response(**api.makeResponse('INVALID_DATA', list(RACE.keys())))
+    if race != None and race not in lookup.RACE:
+        return Response(**api.makeResponse('INVALID_DATA', list(lookup.RACE.keys())))
+
+    # --- 파라미터 파싱 --- #
+
+    accuracy = request.args.get('accuracy', 'exact')
+
+    if accuracy not in ACCURACY:
+        return Response(**api.makeResponse('INVALID_DATA', ACCURACY))
 
     # --- 응답 메시지 정의 --- #
 
     status = 'SUCCESS'
-    data   = {
-        'count': -1
-    }
+    data   = None
 
-    # --- 데이터베이스 조회 --- #
+    # --- 통계 조회 --- #
 
     try:
-        with db.connection.cursor() as cursor:
-            cursor.execute('''
-                SELECT v.visit_occurrence_id
-                FROM person AS p JOIN visit_occurrence AS v
-                ON p.person_id=v.person_id AND p.race_concept_id=%s
-            ''', [RACE[race]])
-            data['count'] = len(cursor.fetchall())
+        counts, snapshot = getCounts('race', accuracy)
+
+        if race == None:
+            data = {
+                'counts': {
+                    lookup.REVERSED_RACE.get(raceID, str(raceID)): count for raceID, count in counts.items()
+                },
+                **describeCounts(snapshot, lambda raceID: lookup.REVERSED_RACE.get(raceID, str(raceID)))
+            }
+        else:
+            data = {
+                'count': counts.get(lookup.RACE[race], 0),
+                **describeCount(snapshot, lookup.RACE[race])
+            }
+
+        data.update(getFreshness(snapshot))
     except psycopg2.DatabaseError as error:
         status = 'DATABASE_ERROR'
         data   = None
 
-        db.connection.rollback()
         current_app.logger.error(error)
 
     return Response(**api.makeResponse(status, data))
 
 @blueprint.route('/ethnicity_count', defaults={ 'ethnicity': None }, methods=['GET'])
 @blueprint.route('/ethnicity_count/<string:ethnicity>', methods=['GET'])
+@cached(ttl=STATISTIC_TTL)
+@admit(classifyStatistic)
 def ethnicityCount(ethnicity: str) -> Response:
     '''
-    민족별 방문 수를 조회하기 위한 라우터입니다.
+    민족별 방문 수를 조회하기 위한 라우터로, 민족을 지정하지 않을 경우 모든 민족의 방문 수를 조회합니다.
 
     Methods:
         GET
 
+    Params:
+        accuracy ('exact' | 'approx', opt, default='exact'): 정확도로, approx일 경우 플래너 통계 또는 표본으로 추정하며 표본 추정은 신뢰 구간을 함께 반환
+
     Responses:
         {
             'status': <STATUS>,
             'data': <ETHNICITY> | {
-                'count': <COUNT>
+                'count': <COUNT>,
+                'refreshed_at': <REFRESHED DATETIME>,
+                'staleness': <SECONDS SINCE REFRESH>,
+                'method': <METHOD>
+            } | {
+                'counts': {
+                    <ETHNICITY>: <COUNT>, ...
+                },
+                'refreshed_at': <REFRESHED DATETIME>,
+                'staleness': <SECONDS SINCE REFRESH>,
+                'method': <METHOD>
             }
         }
     '''
 
+    # 요청을 처리하는 동안 하나의 조회 테이블 스냅샷만 사용합니다.
+    lookup = getLookup()
+
     # 테이블에 존재하지 않는 민족을 조회할 경우, 조회 가능한 민족 목록을 반환합니다.
-    if ethnicity not in ETHNICITY:
-        return Response(**api.makeResponse('INVALID_DATA', list(ETHNICITY)))
+    if ethnicity != None and ethnicity not in lookup.ETHNICITY:
+        return Response(**api.makeResponse('INVALID_DATA', list(lookup.ETHNICITY)))
+
+    # --- 파라미터 파싱 --- #
+
+    accuracy = request.args.get('accuracy', 'exact')
+
+    if accuracy not in ACCURACY:
+        return Response(**api.makeResponse('INVALID_DATA', ACCURACY))
 
     # --- 응답 메시지 정의 --- #
 
     status = 'SUCCESS'
-    data   = {
-        'count': -1
-    }
+    data   = None
 
-    # --- 데이터베이스 조회 --- #
+    # --- 통계 조회 --- #
 
     try:
-        with db.connection.cursor() as cursor:
-            cursor.execute('''
-                SELECT v.visit_occurrence_id
-                FROM person AS p JOIN visit_occurrence AS v
-                ON p.person_id=v.person_id AND p.ethnicity_source_value=%s
-            ''', [ethnicity])
-            data['count'] = len(cursor.fetchall())
+        counts, snapshot = getCounts('ethnicity', accuracy)
+
+        if ethnicity == None:
+            data = {
+                'counts': dict(counts),
+                **describeCounts(snapshot)
+            }
+        else:
+            data = {
+                'count': counts.get(ethnicity, 0),
+                **describeCount(snapshot, ethnicity)
+            }
+
+        data.update(getFreshness(snapshot))
     except psycopg2.DatabaseError as error:
         status = 'DATABASE_ERROR'
         data   = None
 
-        db.connection.rollback()
         current_app.logger.error(error)
 
     return Response(**api.makeResponse(status, data))
 
 @blueprint.route('/age_count', defaults={ 'age': None }, methods=['GET'])
 @blueprint.route('/age_count/<int:age>', methods=['GET'])
+@cached(ttl=STATISTIC_TTL)
+@admit(classifyStatistic)
 def ageCount(age: int) -> Response:
     '''
     10살 단위의 연령대별 방문 수를 조회하기 위한 라우터로, 만 나이를 기준으로 합니다.
+    연령대를 지정하지 않을 경우 모든 연령대의 방문 수를 조회합니다.
 
     Methods:
         GET
 
+    Params:
+        accuracy ('exact' | 'approx', opt, default='exact'): 정확도로, approx일 경우 플래너 통계 또는 표본으로 추정하며 표본 추정은 신뢰 구간을 함께 반환
+
     Responses:
         {
             'status': <STATUS>,
             'data': [0, 10, 20, '...'] | {
-                'count': <COUNT>
+                'count': <COUNT>,
+                'refreshed_at': <REFRESHED DATETIME>,
+                'staleness': <SECONDS SINCE REFRESH>,
+                'method': <METHOD>
+            } | {
+                'counts': {
+                    <AGE>: <COUNT>, ...
+                },
+                'refreshed_at': <REFRESHED DATETIME>,
+                'staleness': <SECONDS SINCE REFRESH>,
+                'method': <METHOD>
             }
         }
     '''
 
     # 10살 단위의 조회가 아닐 경우, 올바른 조회 방법을 반환합니다.
-    if age == None or age % 10 != 0:
+    if age != None and age % 10 != 0:
         return Response(**api.makeResponse('INVALID_DATA', [0, 10, 20, '...']))
 
-    # --- 응답 메시지 정의 --- #
+    # --- 파라미터 파싱 --- #
 
-    status = 'SUCCESS'
-    data   = {
-        'count': -1
-    }
+    accuracy = request.args.get('accuracy', 'exact')
 
-    # --- 만 나이를 기준으로 생년월일 범위 산출 --- #
+    if accuracy not in ACCURACY:
+        return Response(**api.makeResponse('INVALID_DATA', ACCURACY))
 
-    offset    = age // 10
-    startDate = datetime.now() - relativedelta(years=10 * (offset + 1)) + relativedelta(days=1)
-    endDate   = datetime.now() - relativedelta(years=10 * offset)
+    # --- 응답 메시지 정의 --- #
 
-    startDate = datetime(startDate.year, startDate.month, startDate.day)
-    endDate   = datetime(endDate.year, endDate.month, endDate.day, 23, 59, 59)
+    status = 'SUCCESS'
+    data   = None
 
-    # --- 데이터베이스 조회 --- #
+    # --- 통계 조회 --- #
 
     try:
-        with db.connection.cursor() as cursor:
-            cursor.execute('''
-                SELECT v.visit_occurrence_id
-                FROM person AS p JOIN visit_occurrence AS v
-                ON p.person_id=v.person_id AND (p.birth_datetime BETWEEN %s AND %s)
-            ''', [startDate, endDate])
-            data['count'] = len(cursor.fetchall())
+        counts, snapshot = getCounts('age', accuracy)
+
+        if age == None:
+            data = {
+                'counts': dict(sorted(counts.items())),
+                **describeCounts(snapshot)
+            }
+        else:
+            data = {
+                'count': counts.get(age, 0),
+                **describeCount(snapshot, age)
+            }
+
+        data.update(getFreshness(snapshot))
     except psycopg2.DatabaseError as error:
         status = 'DATABASE_ERROR'
         data   = None
 
-        db.connection.rollback()
         current_app.logger.error(error)
 
-    return Response(**api.makeResponse(status, data))
\ No newline at end of file
+    return Response(**api.makeResponse(status, data))
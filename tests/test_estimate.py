@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from contextlib import contextmanager
+from datetime   import datetime, timedelta, timezone
+from unittest   import mock
+
+import unittest
+
+# === 사용자 정의 모듈 임포트 === #
+
+from cache.statistic import getFreshness
+
+import database.estimate as estimate
+
+# === 클래스 정의 === #
+
+class FakeCursor:
+    '''
+    정해진 행 하나를 반환하는 커서입니다.
+    '''
+
+    def __init__(self, row: dict) -> None:
+        self.row = row
+
+    def execute(self, query: str, argument: list = None) -> None:
+        pass
+
+    def fetchone(self) -> dict:
+        return self.row
+
+class FakeConnection:
+    '''
+    FakeCursor를 반환하는 커넥션입니다.
+    '''
+
+    def __init__(self, row: dict) -> None:
+        self.row = row
+
+    @contextmanager
+    def cursor(self):
+        yield FakeCursor(self.row)
+
+def fakeConnect(row: dict):
+    '''
+    db.connect 대신 사용할, 정해진 행을 반환하는 커넥션 컨텍스트 매니저를 생성합니다.
+    '''
+
+    @contextmanager
+    def connect():
+        yield FakeConnection(row)
+
+    return connect
+
+# === 테스트 정의 === #
+
+class FreshnessTest(unittest.TestCase):
+    '''
+    플래너 통계의 갱신 시각 (timestamptz)으로 응답의 갱신 시각과 경과 시간을 계산할 수 있는지 확인합니다.
+    '''
+
+    def testAnalyzedTotal(self) -> None:
+        updatedAt = datetime.now(timezone.utc) - timedelta(minutes=5)
+        row       = { 'reltuples': 1000.0, 'updated_at': updatedAt }
+
+        with mock.patch.object(estimate.db, 'connect', fakeConnect(row)):
+            count, snapshot = estimate.estimateTotal('person')
+
+        freshness = getFreshness(snapshot)
+
+        self.assertEqual(count, 1000)
+        self.assertIsNone(snapshot['timestamp'].tzinfo)
+        self.assertAlmostEqual(freshness['staleness'], 300, delta=5)
+
+    def testAnalyzedFrequency(self) -> None:
+        analyzedAt = datetime.now(timezone(timedelta(hours=9))) - timedelta(hours=1)
+        row        = {
+            'reltuples': 1000.0,
+            'null_frac': 0.0,
+            'common_values': ['8507', '8532'],
+            'common_frequencies': [0.6, 0.4],
+            'analyzed_at': analyzedAt
+        }
+
+        with mock.patch.object(estimate.db, 'connect', fakeConnect(row)):
+            counts, snapshot = estimate.estimateFrequency('person', 'gender_concept_id', int)
+
+        freshness = getFreshness(snapshot)
+
+        self.assertEqual(counts, { 8507: 600, 8532: 400 })
+        self.assertAlmostEqual(freshness['staleness'], 3600, delta=5)
+
+    def testNeverAnalyzed(self) -> None:
+        row = { 'reltuples': 1000.0, 'updated_at': None }
+
+        with mock.patch.object(estimate.db, 'connect', fakeConnect(row)):
+            _, snapshot = estimate.estimateTotal('person')
+
+        self.assertLessEqual(getFreshness(snapshot)['staleness'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from unittest import mock
+
+import re
+import unittest
+
+# === 서드파티 패키지 임포트 === #
+
+from flask import Flask
+
+import psycopg2
+
+# === 사용자 정의 모듈 임포트 === #
+
+from database.index import INDEX, Index, findIndex
+from database.query import Query
+
+import config.application
+import database.database   as db
+import router.search.concept
+import router.search.condition
+import router.search.death
+import router.search.drug
+import router.search.person
+import router.search.visit
+import utility.pagination  as pagination
+
+# === 상수 정의 === #
+
+# 키셋 페이지네이션을 사용하는 라우터와 커서의 정렬 키 개수
+KEYSET_ROUTER = {
+    '/search/concept/': 1,
+    '/search/condition/': 2,
+    '/search/death/': 1,
+    '/search/drug/': 2,
+    '/search/person/': 1,
+    '/search/visit/': 1
+}
+
+TABLE       = re.compile(r'\bFROM\s+(\w+)', re.IGNORECASE) # SELECT 구문의 테이블
+SEEK_COLUMN = re.compile(r'^\(?\s*([\w\s,]+?)\s*\)?\s*>')  # 키셋 조건의 열 목록
+
+# === 테스트 정의 === #
+
+class KeysetIndexTest(unittest.TestCase):
+    '''
+    각 라우터가 커서로 조회할 때 사용하는 키셋 조건과 정렬 키가 database/index.py의 INDEX 중 하나로 처리되는지 확인합니다.
+    '''
+
+    def setUp(self) -> None:
+        app = Flask(__name__)
+
+        for module in (router.search.concept, router.search.condition, router.search.death, router.search.drug, router.search.person, router.search.visit):
+            app.register_blueprint(module.blueprint)
+
+        self.client  = app.test_client()
+        self.queries = []
+
+        # INDEX를 실제 데이터베이스에 모두 생성한 상태로 가정합니다.
+        self.indexes = [{
+            'table': index.table,
+            'method': index.method,
+            'columns': tuple(column.lower() for column in index.columns),
+            'valid': True,
+            'partial': False
+        } for index in INDEX]
+
+    def record(self, query: Query) -> tuple:
+        self.queries.append((query.select, list(query.seeks), query.order))
+
+        return self.build(query)
+
+    def collect(self, path: str, size: int) -> list:
+        '''
+        데이터베이스에 접속하지 않고, 커서가 주어진 요청에서 라우터가 구성한 쿼리를 수집합니다.
+        '''
+
+        self.queries = []
+        self.build   = Query.build
+
+        def connect():
+            raise psycopg2.OperationalError('no database in tests')
+
+        with mock.patch.dict(config.application.admissionConfig, { 'enabled': False }), \
+             mock.patch.dict(config.application.config, { 'response_cache_size': 0 }), \
+             mock.patch.object(db, 'connect', connect), \
+             mock.patch.object(Query, 'build', lambda query: self.record(query)):
+            self.client.get(path, query_string={ 'cursor': pagination.encodeCursor([1] * size) })
+
+        return self.queries
+
+    def testKeysetIndex(self) -> None:
+        for path, size in KEYSET_ROUTER.items():
+            with self.subTest(path=path):
+                queries = [(select, seeks, order) for select, seeks, order in self.collect(path, size) if seeks]
+
+                self.assertTrue(queries)
+
+                for select, seeks, order in queries:
+                    table   = TABLE.search(select).group(1)
+                    seek    = tuple(column.strip() for column in SEEK_COLUMN.search(seeks[0]).group(1).split(','))
+                    columns = tuple(column.strip() for column in order.split(','))
+
+                    # 키셋 조건은 정렬 키와 같은 열이어야 하며, 정렬 키로 시작하는 인덱스가 있어야 정렬 없이 LIMIT만큼 읽고 멈출 수 있습니다.
+                    self.assertEqual(seek, columns[:len(seek)])
+                    self.assertIsNotNone(findIndex(Index(table, columns, path), self.indexes), f'no index on {table} ({", ".join(columns)})')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+import unittest
+
+# === 서드파티 패키지 임포트 === #
+
+from flask import Flask
+
+# === 사용자 정의 모듈 임포트 === #
+
+import router.search.concept
+import router.search.condition
+import router.search.death
+import router.search.drug
+import router.search.person
+import router.search.visit
+
+# === 테스트 정의 === #
+
+class PageSizeTest(unittest.TestCase):
+    '''
+    페이지 당 출력 개수가 1보다 작을 경우, 데이터베이스를 조회하지 않고 INVALID_DATA를 반환하는지 확인합니다.
+    '''
+
+    def setUp(self) -> None:
+        app = Flask(__name__)
+
+        for module in (router.search.concept, router.search.condition, router.search.death, router.search.drug, router.search.person, router.search.visit):
+            app.register_blueprint(module.blueprint)
+
+        self.client = app.test_client()
+
+    def testPageSize(self) -> None:
+        for path in ('/search/concept/', '/search/condition/', '/search/death/', '/search/drug/', '/search/person/', '/search/visit/'):
+            for pageSize in ('0', '-1'):
+                with self.subTest(path=path, page_size=pageSize):
+                    response = self.client.get(path, query_string={ 'page_size': pageSize })
+
+                    self.assertEqual(response.status_code, 400)
+                    self.assertEqual(response.get_json()['status'], 'INVALID_DATA')
+
+if __name__ == '__main__':
+    unittest.main()
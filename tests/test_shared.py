@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from contextlib import contextmanager
+from types      import MappingProxyType
+from unittest   import mock
+
+import tempfile
+import unittest
+
+# === 사용자 정의 모듈 임포트 === #
+
+import config.application
+import constant.condition
+import constant.lookup    as lookup
+import constant.shared    as shared
+import database.database  as db
+
+# === 상수 정의 === #
+
+# 이름이 같은 개념이 있는 (concept_id, concept_name) 목록 (ID 내림차순으로 조회되는 경우)
+CONCEPT = [(30, 'Fever'), (20, 'Cough'), (10, 'Fever'), (5, 'Cough')]
+
+# === 클래스 정의 === #
+
+class Cursor:
+    '''
+    CONCEPT를 주어진 순서대로 반환하는 커서입니다.
+    '''
+
+    def __enter__(self) -> 'Cursor':
+        return self
+
+    def __exit__(self, *args) -> None:
+        pass
+
+    def execute(self, query: str, argument: list = None) -> None:
+        pass
+
+    def fetchall(self) -> list:
+        return [{ 'concept_id': conceptID, 'concept_name': name } for conceptID, name in CONCEPT]
+
+class Connection:
+    def cursor(self) -> Cursor:
+        return Cursor()
+
+@contextmanager
+def connect():
+    yield Connection()
+
+# === 테스트 정의 === #
+
+class DuplicateNameTest(unittest.TestCase):
+    '''
+    이름이 같은 개념이 여러 개일 경우, 프로세스 내 조회 테이블과 공유 조회 테이블 모두 가장 작은 concept_id를 반환하는지 확인합니다.
+    '''
+
+    def setUp(self) -> None:
+        self.lookup = lookup.LOOKUP
+        self.mapped = shared.mapped
+
+    def tearDown(self) -> None:
+        lookup.LOOKUP = self.lookup
+        shared.mapped = self.mapped
+
+    def testProcessLookup(self) -> None:
+        with mock.patch.object(db, 'connect', connect):
+            constant.condition.refreshCondition()
+
+        self.assertEqual(dict(lookup.getLookup().CONDITION), { 'Cough': 5, 'Fever': 10 })
+        self.assertEqual(lookup.getLookup().REVERSED_CONDITION[30], 'Fever')
+
+    def testSharedLookup(self) -> None:
+        reversedCondition = MappingProxyType({ conceptID: name for conceptID, name in CONCEPT })
+
+        with tempfile.TemporaryDirectory() as directory, mock.patch.dict(config.application.config, { 'shared_directory': directory }):
+            shared.writeSharedLookup(lookup.Lookup(REVERSED_CONDITION=reversedCondition))
+
+            self.assertTrue(shared.loadSharedLookup())
+
+            condition = lookup.getLookup().CONDITION
+
+            self.assertEqual(condition['Fever'], 10)
+            self.assertEqual(condition['Cough'], 5)
+            self.assertEqual(list(condition), ['Cough', 'Fever'])
+            self.assertEqual(len(condition), 2)
+            self.assertEqual(lookup.getLookup().REVERSED_CONDITION[30], 'Fever')
+
+if __name__ == '__main__':
+    unittest.main()
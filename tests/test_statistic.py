@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from unittest import mock
+
+import tempfile
+import threading
+import unittest
+
+# === 서드파티 패키지 임포트 === #
+
+from flask import Flask
+
+# === 사용자 정의 모듈 임포트 === #
+
+import cache.statistic        as statistic
+import config.application
+import constant.shared        as shared
+import router.statistic.person
+
+# === 테스트 정의 === #
+
+class RefreshTest(unittest.TestCase):
+    '''
+    통계를 갱신하는 동안에도 이전 스냅샷을 반환하며, 갱신이 중복하여 실행되지 않는지 확인합니다.
+    '''
+
+    def setUp(self) -> None:
+        self.started  = threading.Event()
+        self.release  = threading.Event()
+        self.computed = 0
+
+        statistic.STATISTIC = None
+
+    def tearDown(self) -> None:
+        statistic.STATISTIC = None
+
+    def compute(self) -> dict:
+        self.computed += 1
+        self.started.set()
+        self.release.wait(5)
+
+        return { 'person': {}, 'visit': {}, 'cube': {} }
+
+    def testReadDuringRefresh(self) -> None:
+        with mock.patch.object(statistic, 'computeStatistic', self.compute):
+            self.release.set()
+            statistic.refreshStatistic()
+
+            previous = statistic.getStatistic()
+
+            self.started.clear()
+            self.release.clear()
+
+            refresher = threading.Thread(target=statistic.refreshStatistic)
+            refresher.start()
+
+            self.assertTrue(self.started.wait(5))
+
+            # 갱신 중에는 잠금을 기다리지 않고 이전 스냅샷을 반환하며, 두 번째 갱신은 실행하지 않습니다.
+            self.assertIs(statistic.getStatistic(), previous)
+
+            statistic.refreshStatistic()
+
+            self.release.set()
+            refresher.join(5)
+
+        self.assertEqual(self.computed, 2)
+        self.assertEqual(statistic.getStatistic()['version'], previous['version'] + 1)
+
+    def testWaitForFirstSnapshot(self) -> None:
+        with mock.patch.object(statistic, 'computeStatistic', self.compute):
+            refresher = threading.Thread(target=statistic.refreshStatistic)
+            refresher.start()
+
+            self.assertTrue(self.started.wait(5))
+
+            result = []
+            reader = threading.Thread(target=lambda: result.append(statistic.getStatistic()))
+            reader.start()
+
+            self.release.set()
+            reader.join(5)
+            refresher.join(5)
+
+        # 첫 스냅샷은 실행 중인 갱신이 끝날 때까지 기다려 받으며, 다시 계산하지 않습니다.
+        self.assertEqual(self.computed, 1)
+        self.assertEqual(result[0]['version'], 1)
+
+class NotReadyTest(unittest.TestCase):
+    '''
+    통계 스냅샷이 아직 없을 경우, 요청 중에 계산하지 않고 백그라운드 갱신을 요청한 후 503 (NOT_READY)을 반환하는지 확인합니다.
+    '''
+
+    def setUp(self) -> None:
+        app = Flask(__name__)
+        app.register_blueprint(router.statistic.person.blueprint)
+
+        self.client = app.test_client()
+
+        statistic.STATISTIC = None
+
+    def testNotReady(self) -> None:
+        with mock.patch.dict(config.application.admissionConfig, { 'enabled': True }), \
+             mock.patch.dict(config.application.config, { 'response_cache_size': 0 }), \
+             mock.patch.object(statistic, 'requestRefresh') as requestRefresh, \
+             mock.patch.object(statistic, 'computeStatistic') as computeStatistic:
+            response = self.client.get('/statistic/person/person_count')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.get_json()['status'], 'NOT_READY')
+        self.assertIn('Retry-After', response.headers)
+
+        requestRefresh.assert_called_once()
+        computeStatistic.assert_not_called()
+
+class SharedRefreshTest(unittest.TestCase):
+    '''
+    공유 디렉터리가 설정된 경우, 갱신 잠금을 얻은 하나의 프로세스만 집계하고 나머지 프로세스는 기록된 스냅샷을 읽는지 확인합니다.
+    '''
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.computed  = 0
+
+        self.patcher = mock.patch.dict(config.application.config, { 'shared_directory': self.directory.name })
+        self.patcher.start()
+
+        self.reset()
+
+    def tearDown(self) -> None:
+        self.reset()
+        self.patcher.stop()
+        self.directory.cleanup()
+
+    def reset(self) -> None:
+        '''
+        다른 프로세스처럼 스냅샷과 마지막으로 읽은 파일 정보를 비웁니다.
+        '''
+
+        statistic.STATISTIC = None
+        statistic.loaded    = None
+
+    def compute(self) -> dict:
+        self.computed += 1
+
+        return { 'person': { 'count': self.computed }, 'visit': {}, 'cube': {} }
+
+    def testSingleRefresher(self) -> None:
+        with mock.patch.object(statistic, 'computeStatistic', self.compute):
+            statistic.refreshStatistic()
+
+            refreshed = statistic.getStatistic()['timestamp']
+
+            # 파일이 갱신 주기의 절반보다 최근에 기록되었으므로, 다른 프로세스는 집계하지 않고 같은 스냅샷을 읽습니다.
+            self.reset()
+            statistic.refreshStatistic()
+
+        self.assertEqual(self.computed, 1)
+        self.assertEqual(statistic.getStatistic()['person']['count'], 1)
+        self.assertEqual(statistic.getStatistic()['timestamp'], refreshed)
+
+    def testElection(self) -> None:
+        # 다른 프로세스가 갱신 잠금을 잡고 집계하는 동안에는 집계하지 않으며, 기록이 끝난 후 확인 주기에 스냅샷을 읽습니다.
+        with mock.patch.object(statistic, 'computeStatistic', self.compute):
+            with shared.refreshLock(True, statistic.LOCK_NAME):
+                statistic.refreshStatistic()
+
+                self.assertIsNone(statistic.STATISTIC)
+
+                statistic.writeStatistic(self.compute())
+
+            self.assertTrue(statistic.loadStatistic())
+            self.assertFalse(statistic.loadStatistic())
+
+        self.assertEqual(self.computed, 1)
+        self.assertEqual(statistic.getStatistic()['person']['count'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from functools import wraps
+from typing    import Callable, Optional, Union
+
+import threading
+import time
+
+# === 서드파티 패키지 임포트 === #
+
+from flask import Response, request
+
+# === 사용자 정의 모듈 임포트 === #
+
+import cache.statistic
+import config.application
+import database.database as db
+import utility.api       as api
+
+# === 클래스 정의 === #
+
+class CostClass:
+    '''
+    비용 등급 하나의 동시 실행 개수와 대기열을 관리합니다.
+
+    동시 실행 중인 요청이 concurrency개일 경우 최대 queue개의 요청이 queue_timeout 동안 순서를 기다리며, 대기열이 가득 찼거나 대기 시간이 지난 요청은 거절합니다.
+    제한은 프로세스마다 적용되므로, uWSGI의 processes 값을 고려하여 설정합니다.
+
+    Args:
+        name (str): 비용 등급 이름
+        concurrency (int): 동시에 실행할 수 있는 최대 요청 개수
+        queue (int): 대기할 수 있는 최대 요청 개수
+        statement_timeout (float): 요청의 쿼리에 적용할 statement_timeout (초)
+        retry_after (int): 거절한 요청의 Retry-After 값 (초)
+    '''
+
+    def __init__(self, name: str, concurrency: int, queue: int, statement_timeout: float, retry_after: int) -> None:
+        self.name             = name
+        self.concurrency      = concurrency
+        self.queue            = queue
+        self.statementTimeout = statement_timeout
+        self.retryAfter       = retry_after
+
+        self._condition = threading.Condition()
+        self._active    = 0 # 실행 중인 요청 개수
+        self._waiting   = 0 # 대기 중인 요청 개수
+
+        self._statistic = {
+            'admitted': 0,
+            'queued': 0,
+            'rejected': 0,
+            'timeouts': 0
+        }
+
+    def acquire(self, timeout: float) -> bool:
+        '''
+        실행 순서를 할당받습니다.
+
+        Args:
+            timeout (float): 대기열에서 기다릴 최대 시간 (초)
+
+        Returns:
+            admitted (bool): 실행 순서를 할당받았는지 여부
+        '''
+
+        with self._condition:
+            # 대기 중인 요청이 있을 경우, 새 요청이 먼저 실행되지 않도록 대기열 뒤에서 기다립니다.
+            if self._active < self.concurrency and self._waiting == 0:
+                self._active                += 1
+                self._statistic['admitted'] += 1
+
+                return True
+
+            if self._waiting >= self.queue:
+                self._statistic['rejected'] += 1
+
+                return False
+
+            deadline = time.monotonic() + timeout
+
+            self._waiting             += 1
+            self._statistic['queued'] += 1
+
+            try:
+                while self._active >= self.concurrency:
+                    remaining = deadline - time.monotonic()
+
+                    if remaining <= 0:
+                        self._statistic['timeouts'] += 1
+
+                        return False
+
+                    self._condition.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+            self._active                += 1
+            self._statistic['admitted'] += 1
+
+            return True
+
+    def release(self) -> None:
+        '''
+        실행 순서를 반환하고, 대기 중인 요청 하나를 깨웁니다.
+        '''
+
+        with self._condition:
+            self._active -= 1
+            self._condition.notify()
+
+    def statistic(self) -> dict:
+        '''
+        실행 중인 요청 개수, 대기 중인 요청 개수와 허용, 대기, 거절, 대기 시간 초과 횟수를 반환합니다.
+        '''
+
+        with self._condition:
+            return {
+                'active': self._active,
+                'waiting': self._waiting,
+                **self._statistic
+            }
+
+# === 전역 변수 정의 === #
+
+COST_CLASS = {
+    name: CostClass(name, **setting) for name, setting in config.application.admissionConfig['classes'].items()
+}
+
+# === 함수 정의 === #
+
+def classifySearch() -> str:
+    '''
+    검색 라우터의 비용 등급을 반환합니다. 내보내기와 CDM_LOOKUP_ADMISSION_DEEP_OFFSET보다 깊은 OFFSET 페이지는 heavy로, 나머지는 cheap으로 분류합니다.
+    '''
+
+    if 'format' in request.args:
+        return 'heavy'
+
+    page     = request.args.get('page', '0')
+    pageSize = request.args.get('page_size', '10')
+
+    # 커서가 주어진 요청은 OFFSET 없이 조회하며, 올바르지 않은 값은 라우터에서 처리합니다.
+    if 'cursor' in request.args or not page.isdigit() or not pageSize.isdigit():
+        return 'cheap'
+
+    if int(page) * int(pageSize) >= config.application.admissionConfig['deep_offset']:
+        return 'heavy'
+
+    return 'cheap'
+
+def classifyStatistic() -> Optional[str]:
+    '''
+    통계 라우터의 비용 등급을 반환합니다.
+
+    통계 스냅샷이 아직 계산되지 않은 경우, 요청의 statement_timeout 안에서는 스냅샷을 계산할 수 없으므로 백그라운드 갱신을 요청하고 None (준비 중)을 반환하며,
+    나머지는 cheap으로 분류합니다.
+    '''
+
+    if request.args.get('accuracy', 'exact') == 'exact' and cache.statistic.STATISTIC == None:
+        cache.statistic.requestRefresh()
+
+        return None
+
+    return 'cheap'
+
+def admit(cost: Union[str, Callable[[], Optional[str]]]) -> Callable:
+    '''
+    라우터를 비용 등급의 동시 실행 개수 안에서 실행하는 데코레이터입니다.
+
+    실행 순서를 할당받지 못한 요청은 쿼리를 실행하지 않고 503 (OVERLOADED)과 Retry-After를 바로 반환하며,
+    비용 등급 대신 None을 반환한 요청은 필요한 데이터가 준비될 때까지 503 (NOT_READY)과 heavy 등급의 Retry-After를 반환합니다.
+    할당받은 요청의 쿼리에는 비용 등급의 statement_timeout을 적용합니다. 스트리밍 응답은 전송이 끝날 때 실행 순서를 반환합니다.
+    응답 캐시에 적중한 요청이 실행 순서를 차지하지 않도록, cached 데코레이터 안쪽에 적용합니다.
+
+    Args:
+        cost (str | Callable[[], Optional[str]]): 비용 등급 이름 또는 요청별로 비용 등급 이름 (준비 중일 경우 None)을 반환하는 함수
+
+    Returns:
+        decorator (Callable): 데코레이터
+    '''
+
+    def decorator(router: Callable[..., Response]) -> Callable[..., Response]:
+        @wraps(router)
+        def wrapper(*args, **kwargs) -> Response:
+            if not config.application.admissionConfig['enabled']:
+                return router(*args, **kwargs)
+
+            name = cost() if callable(cost) else cost
+
+            if name == None:
+                retryAfter = COST_CLASS['heavy'].retryAfter
+
+                response = Response(**api.makeResponse('NOT_READY', { 'retry_after': retryAfter }))
+                response.headers['Retry-After'] = str(retryAfter)
+
+                return response
+
+            costClass = COST_CLASS[name]
+
+            if not costClass.acquire(config.application.admissionConfig['queue_timeout']):
+                response = Response(**api.makeResponse('OVERLOADED', { 'cost': costClass.name, 'retry_after': costClass.retryAfter }))
+                response.headers['Retry-After'] = str(costClass.retryAfter)
+
+                return response
+
+            def finish() -> None:
+                db.statementTimeout.set(None)
+                costClass.release()
+
+            db.statementTimeout.set(costClass.statementTimeout)
+
+            try:
+                response = router(*args, **kwargs)
+            except BaseException:
+                finish()
+                raise
+
+            # 스트리밍 응답은 라우터가 반환된 이후에 쿼리를 실행하므로, 전송이 끝날 때까지 실행 순서와 statement_timeout을 유지합니다.
+            if response.is_streamed:
+                response.call_on_close(finish)
+            else:
+                finish()
+
+            return response
+
+        return wrapper
+
+    return decorator
+
+def statistic() -> dict:
+    '''
+    비용 등급별 실행 중인 요청 개수, 대기 중인 요청 개수와 허용, 대기, 거절, 대기 시간 초과 횟수를 반환합니다.
+
+    Returns:
+        statistic (dict): <비용 등급>_<항목> 이름별 값
+    '''
+
+    return {
+        f'{name}_{key}': value for name, costClass in COST_CLASS.items() for key, value in costClass.statistic().items()
+    }
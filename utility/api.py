@@ -4,20 +4,134 @@
 
 # === 표준 패키지 임포트 === #
 
-from typing import Any
+from datetime import date
+from typing   import Any, Iterator
 
 import json
+import time
+
+# === 서드파티 패키지 임포트 === #
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # === 사용자 정의 모듈 임포트 === #
 
 from constant.statusCode import STATUS_CODE
 
+import utility.metric as metric
+
+# === 상수 정의 === #
+
+ENCODER = 'orjson' if orjson != None else 'json' # 사용 중인 JSON 인코더
+
+ITERENCODE_THRESHOLD = 500 # 표준 라이브러리 인코더를 사용할 때, 점진적으로 인코딩할 목록의 최소 길이
+BATCH_SIZE           = 250 # 점진적 인코딩 시 한 번에 인코딩하는 행 개수
+
+# 상태별로 미리 인코딩한 응답 메시지의 앞부분
+ENVELOPE = {
+    status: ('{"status":"' + status + '","data":').encode() for status in STATUS_CODE
+}
+
 # === 함수 정의 === #
 
+def encodeDefault(value: Any) -> Any:
+    '''
+    표준 라이브러리 인코더가 직렬화할 수 없는 값을 변환합니다. 날짜는 %Y-%m-%d 형식의 문자열로 변환합니다.
+    '''
+
+    if isinstance(value, date):
+        return value.isoformat()
+
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+encoder = json.JSONEncoder(default=encodeDefault, separators=(',', ':'), check_circular=False) # 표준 라이브러리 인코더
+
+def encode(data: Any) -> bytes:
+    '''
+    응답 데이터를 JSON으로 인코딩합니다. orjson이 설치되어 있을 경우 orjson을, 그렇지 않을 경우 표준 라이브러리를 사용합니다.
+
+    Args:
+        data (Any): 응답 데이터
+
+    Returns:
+        encoded (bytes): 인코딩된 응답 데이터
+    '''
+
+    if orjson != None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+
+    return encoder.encode(data).encode()
+
+def isLarge(data: Any) -> bool:
+    '''
+    응답 데이터에 ITERENCODE_THRESHOLD 이상의 목록이 포함되어 있는지 확인합니다.
+    '''
+
+    if isinstance(data, list):
+        return len(data) >= ITERENCODE_THRESHOLD
+
+    if isinstance(data, dict):
+        return any(isinstance(value, list) and len(value) >= ITERENCODE_THRESHOLD for value in data.values())
+
+    return False
+
+def iterencode(envelope: bytes, data: Any) -> Iterator[bytes]:
+    '''
+    큰 목록이 포함된 응답 메시지를 BATCH_SIZE 행 단위로 점진적으로 인코딩합니다.
+
+    각 묶음은 표준 라이브러리의 C 인코더로 한 번에 인코딩하므로, 전체를 한 번에 인코딩할 때와 속도는 같으면서 메모리 사용량과 첫 바이트까지의 시간이 줄어듭니다.
+
+    Args:
+        envelope (bytes): 미리 인코딩한 응답 메시지의 앞부분
+        data (Any): 응답 데이터 (목록 또는 값이 목록인 딕셔너리)
+
+    Yields:
+        chunk (bytes): 인코딩된 응답 메시지의 일부
+    '''
+
+    def encodeList(items: list) -> Iterator[str]:
+        yield '['
+
+        for index in range(0, len(items), BATCH_SIZE):
+            if index != 0:
+                yield ','
+
+            yield encoder.encode(items[index:index + BATCH_SIZE])[1:-1]
+
+        yield ']'
+
+    yield envelope
+
+    if isinstance(data, list):
+        for chunk in encodeList(data):
+            yield chunk.encode()
+    else:
+        yield b'{'
+
+        for index, (key, value) in enumerate(data.items()):
+            prefix = (',' if index != 0 else '') + encoder.encode(str(key)) + ':'
+
+            if isinstance(value, list) and len(value) >= ITERENCODE_THRESHOLD:
+                yield prefix.encode()
+
+                for chunk in encodeList(value):
+                    yield chunk.encode()
+            else:
+                yield (prefix + encoder.encode(value)).encode()
+
+        yield b'}'
+
+    yield b'}'
+
 def makeResponse(status: str, data: Any) -> dict:
     '''
     JSON 형식의 응답 메시지를 생성합니다.
 
+    날짜 (datetime.date)는 %Y-%m-%d 형식으로 직렬화하며, 표준 라이브러리 인코더를 사용할 때 큰 목록이 포함된 응답은 점진적으로 인코딩하여 전송합니다.
+
     Args:
         status (str): 상태 문자열
         data (Any): 응답 데이터
@@ -32,11 +146,18 @@ def makeResponse(status: str, data: Any) -> dict:
         status = 'STATUS_ERROR'
         data   = None
 
+    start = time.perf_counter()
+
+    # 점진적으로 인코딩하는 응답은 전송 중에 인코딩되므로, 인코딩 시간이 지표에 포함되지 않습니다.
+    if orjson == None and isLarge(data):
+        response = iterencode(ENVELOPE[status], data)
+    else:
+        response = ENVELOPE[status] + encode(data) + b'}'
+
+    metric.add('serialization', time.perf_counter() - start)
+
     return {
         'status': STATUS_CODE[status],
         'mimetype': 'application/json',
-        'response': json.dumps({
-            'status': status,
-            'data': data
-        })
-    }
\ No newline at end of file
+        'response': response
+    }
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from typing import Callable, Iterator
+
+import csv
+import io
+import uuid
+
+# === 서드파티 패키지 임포트 === #
+
+from flask import current_app, stream_with_context
+
+import psycopg2
+
+# === 사용자 정의 모듈 임포트 === #
+
+from constant.statusCode import STATUS_CODE
+
+import database.database as db
+import utility.api       as api
+
+# === 상수 정의 === #
+
+EXPORT_FORMAT = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+BATCH_SIZE = 2000 # 서버 측 커서에서 한 번에 가져오는 행 개수
+
+# === 함수 정의 === #
+
+def makeStreamResponse(exportFormat: str, name: str, query: str, argument: list, serialize: Callable[[dict], dict]) -> dict:
+    '''
+    조회 결과 전체를 NDJSON 또는 CSV 형식으로 스트리밍하는 응답 메시지를 생성합니다.
+
+    서버 측 커서 (named cursor)를 이용하여 BATCH_SIZE 단위로 결과를 가져오므로, 결과 크기와 관계없이 메모리 사용량이 일정합니다.
+    전송 중에 데이터베이스 조회에 실패할 경우, NDJSON 형식은 마지막 행으로 {"error": "DATABASE_ERROR"}를 전송하며, 두 형식 모두 응답을 정상적으로 종료하지 않고 연결을 중단합니다.
+
+    Args:
+        exportFormat (str): 내보내기 형식 ('ndjson' | 'csv')
+        name (str): 내보내기 파일 이름
+        query (str): 조회 쿼리
+        argument (list): 조회 쿼리 인자
+        serialize (Callable[[dict], dict]): 조회된 행을 응답 데이터로 변환하는 함수
+
+    Returns:
+        response (dict): 응답 메시지
+    '''
+
+    def generate() -> Iterator[str]:
+        buffer = io.StringIO()
+
+        try:
+            with db.connect() as connection, connection.cursor(name=f'export_{uuid.uuid4().hex}') as cursor:
+                cursor.itersize = BATCH_SIZE
+                cursor.execute(query, argument)
+
+                writer = None
+                count  = 0
+
+                for row in cursor:
+                    item = serialize(row)
+
+                    if exportFormat == 'csv':
+                        if writer == None:
+                            writer = csv.DictWriter(buffer, fieldnames=list(item.keys()))
+                            writer.writeheader()
+
+                        writer.writerow(item)
+                    else:
+                        buffer.write(api.encode(item).decode())
+                        buffer.write('\n')
+
+                    count += 1
+
+                    # 첫 행은 바로 전송하여 응답이 즉시 시작되도록 하고, 이후에는 BATCH_SIZE 단위로 전송합니다.
+                    if count == 1 or count % BATCH_SIZE == 0:
+                        yield buffer.getvalue()
+
+                        buffer.seek(0)
+                        buffer.truncate()
+
+                yield buffer.getvalue()
+        except psycopg2.DatabaseError as error:
+            current_app.logger.error(error)
+
+            # 응답 헤더가 이미 전송된 이후이므로, 지금까지 변환한 행 뒤에 오류 행을 전송하고 예외를 다시 발생시켜
+            # 청크 전송이 종료 청크 없이 중단되도록 합니다. 클라이언트는 잘린 내보내기를 완료된 것으로 처리하지 않습니다.
+            if exportFormat == 'ndjson':
+                buffer.write(api.encode({ 'error': 'DATABASE_ERROR' }).decode())
+                buffer.write('\n')
+
+            yield buffer.getvalue()
+
+            raise
+
+    return {
+        'status': STATUS_CODE['SUCCESS'],
+        'mimetype': EXPORT_FORMAT[exportFormat],
+        'headers': {
+            'Content-Disposition': f'attachment; filename={name}.{exportFormat}'
+        },
+        'response': stream_with_context(generate())
+    }
@@ -0,0 +1,450 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from bisect    import bisect_left
+from functools import wraps
+from typing    import Any, Callable, Iterable, List
+
+import atexit
+import contextvars
+import json
+import os
+import threading
+import time
+
+# === 사용자 정의 모듈 임포트 === #
+
+import config.application
+
+# === 상수 정의 === #
+
+PREFIX = 'cdm_lookup_' # 지표 이름의 접두사
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10) # 요청 시간 구간 (초)
+JOB_BUCKETS     = (1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)             # 갱신 작업 시간 구간 (초)
+
+FLUSH_INTERVAL = 5  # 프로세스별 지표 파일 기록 주기 (초)
+STALE_AFTER    = 30 # 기록되지 않은 지 이 시간이 지난 지표 파일은 종료된 프로세스의 파일로 판단 (초)
+
+# 지표 이름별 (유형, 설명, 구간)
+METRIC = {
+    'request_duration_seconds': ('histogram', 'Request latency until the response is created', REQUEST_BUCKETS),
+    'request_db_duration_seconds': ('histogram', 'Time spent in query execution and row fetching per request (summed over concurrent queries)', REQUEST_BUCKETS),
+    'request_serialization_duration_seconds': ('histogram', 'Time spent encoding the response body per request', REQUEST_BUCKETS),
+    'request_rows_total': ('counter', 'Rows fetched from the database', None),
+    'response_bytes_total': ('counter', 'Response body bytes (streamed responses excluded)', None),
+    'job_duration_seconds': ('histogram', 'Scheduled job duration', JOB_BUCKETS),
+    'job_failures_total': ('counter', 'Scheduled job failures', None)
+}
+
+# === 전역 변수 정의 === #
+
+requestMetric = contextvars.ContextVar('metric', default=None) # 현재 요청의 지표 ({'start', 'db', 'rows', 'serialization'})
+
+lock = threading.Lock() # 지표 갱신 잠금
+
+# 프로세스별 지표 (fork된 프로세스에서는 getState가 새로 초기화)
+state = {
+    'pid': None,
+    'file': None,
+    'histogram': {}, # (이름, 레이블) -> [구간별 개수, ..., +Inf 구간 개수, 합계]
+    'counter': {}    # (이름, 레이블) -> 값
+}
+
+collectors = {} # 이름 -> (수집 함수, 누적 값인 키 목록)
+
+# === 함수 정의 === #
+
+def getState() -> dict:
+    '''
+    현재 프로세스의 지표를 반환합니다.
+
+    uWSGI는 애플리케이션을 불러온 마스터 프로세스를 fork하여 워커를 만들므로, 프로세스 ID가 바뀌면 상속된 값을 버리고 새로 시작합니다.
+    지표 디렉터리가 설정되어 있을 경우, 프로세스마다 지표 파일을 주기적으로 기록하는 스레드를 시작합니다.
+    '''
+
+    pid = os.getpid()
+
+    if state['pid'] == pid:
+        return state
+
+    with lock:
+        if state['pid'] != pid:
+            directory = config.application.config['metric_directory']
+
+            state['pid']       = pid
+            state['histogram'] = {}
+            state['counter']   = {}
+            state['file']      = None
+
+            if directory != None:
+                # 종료된 워커의 누적 값이 같은 프로세스 ID를 재사용한 워커에 덮어써지지 않도록 시작 시각을 파일 이름에 포함합니다.
+                state['file'] = os.path.join(directory, f'metric-{pid}-{int(time.time() * 1000)}.json')
+
+                threading.Thread(target=flushPeriodically, daemon=True).start()
+
+    return state
+
+def getLabel(labels: dict) -> tuple:
+    '''
+    레이블 딕셔너리를 정렬된 튜플로 변환합니다.
+    '''
+
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def observe(name: str, value: float, **labels: Any) -> None:
+    '''
+    히스토그램에 값 하나를 기록합니다.
+    '''
+
+    buckets = METRIC[name][2]
+    process = getState()
+    key     = (name, getLabel(labels))
+
+    with lock:
+        values = process['histogram'].setdefault(key, [0] * (len(buckets) + 2))
+
+        values[bisect_left(buckets, value)] += 1
+        values[-1]                          += value
+
+def increment(name: str, value: float = 1, **labels: Any) -> None:
+    '''
+    카운터를 value만큼 증가시킵니다.
+    '''
+
+    process = getState()
+    key     = (name, getLabel(labels))
+
+    with lock:
+        process['counter'][key] = process['counter'].get(key, 0) + value
+
+def register(name: str, collect: Callable[[], dict], counters: Iterable[str] = ()) -> None:
+    '''
+    지표를 노출할 때마다 호출할 수집 함수를 등록합니다.
+
+    수집 함수가 반환한 딕셔너리의 숫자 값은 <PREFIX><name>_<key> 이름으로 노출하며, counters에 포함된 키는 카운터로, 나머지는 게이지로 노출합니다.
+
+    Args:
+        name (str): 수집 대상 이름
+        collect (Callable[[], dict]): 수집 함수
+        counters (Iterable[str]): 누적 값인 키 목록
+    '''
+
+    collectors[name] = (collect, frozenset(counters))
+
+# --- 요청 지표 --- #
+
+def begin() -> None:
+    '''
+    현재 요청의 지표 기록을 시작합니다.
+    '''
+
+    requestMetric.set({ 'start': time.perf_counter(), 'db': 0.0, 'rows': 0, 'serialization': 0.0 })
+
+def add(key: str, value: float) -> None:
+    '''
+    현재 요청의 지표에 값을 더합니다. 요청을 처리하는 중이 아닐 경우 (갱신 작업 등) 무시합니다.
+
+    fanOut의 쿼리는 다른 스레드에서 실행되지만 요청의 컨텍스트를 복사하여 실행하므로, 같은 지표에 더해집니다.
+    '''
+
+    metric = requestMetric.get()
+
+    if metric != None:
+        with lock:
+            metric[key] += value
+
+def finish(route: str, method: str, status: int, size: int) -> None:
+    '''
+    현재 요청의 지표를 라우터별 히스토그램과 카운터에 기록합니다.
+
+    Args:
+        route (str): 경로 규칙 (예: /search/person/<int:personID>/timeline)
+        method (str): 메서드
+        status (int): 응답 상태 코드
+        size (int): 응답 본문 크기 (바이트, 스트리밍 응답은 None)
+    '''
+
+    metric = requestMetric.get()
+
+    if metric == None:
+        return
+
+    requestMetric.set(None)
+
+    observe('request_duration_seconds', time.perf_counter() - metric['start'], route=route, method=method, status=status)
+    observe('request_db_duration_seconds', metric['db'], route=route, method=method)
+    observe('request_serialization_duration_seconds', metric['serialization'], route=route, method=method)
+    increment('request_rows_total', metric['rows'], route=route, method=method)
+
+    if size != None:
+        increment('response_bytes_total', size, route=route, method=method)
+
+# --- 갱신 작업 지표 --- #
+
+def timeJob(name: str, job: Callable) -> Callable:
+    '''
+    작업 함수의 실행 시간과 실패 횟수를 기록하는 함수를 반환합니다. 예외는 그대로 다시 발생시킵니다.
+
+    Args:
+        name (str): 작업 이름
+        job (Callable): 작업 함수
+
+    Returns:
+        job (Callable): 지표를 기록하는 작업 함수
+    '''
+
+    @wraps(job)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+
+        try:
+            return job(*args, **kwargs)
+        except Exception:
+            increment('job_failures_total', job=name)
+            raise
+        finally:
+            observe('job_duration_seconds', time.perf_counter() - start, job=name)
+
+    return wrapper
+
+# --- 지표 파일 --- #
+
+def snapshot() -> dict:
+    '''
+    현재 프로세스의 지표와 수집 함수의 값을 직렬화할 수 있는 형식으로 반환합니다.
+    '''
+
+    process = getState()
+    gauges  = []
+    counter = []
+
+    for name, (collect, counters) in list(collectors.items()):
+        for key, value in collect().items():
+            if isinstance(value, bool):
+                value = int(value)
+
+            if not isinstance(value, (int, float)):
+                continue
+
+            (counter if key in counters else gauges).append([f'{name}_{key}', [], value])
+
+    with lock:
+        histogram = [[name, list(label), list(values)] for (name, label), values in process['histogram'].items()]
+        counter  += [[name, list(label), value] for (name, label), value in process['counter'].items()]
+
+    return {
+        'pid': process['pid'],
+        'histogram': histogram,
+        'counter': counter,
+        'gauge': gauges
+    }
+
+def flush() -> None:
+    '''
+    현재 프로세스의 지표를 지표 파일에 기록합니다. 읽는 쪽이 기록 중인 파일을 읽지 않도록 임시 파일을 교체합니다.
+    '''
+
+    process = getState()
+
+    if process['file'] == None:
+        return
+
+    temporary = f'{process["file"]}.tmp'
+
+    with open(temporary, 'w') as file:
+        json.dump(snapshot(), file)
+
+    os.replace(temporary, process['file'])
+
+def flushPeriodically() -> None:
+    '''
+    FLUSH_INTERVAL마다 지표 파일을 기록합니다.
+    '''
+
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+
+        try:
+            flush()
+        except OSError:
+            pass
+
+def isAlive(pid: int) -> bool:
+    '''
+    프로세스가 실행 중인지 확인합니다.
+    '''
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+
+    return True
+
+def remove() -> None:
+    '''
+    현재 프로세스의 지표 파일을 삭제합니다.
+    '''
+
+    if state['pid'] != os.getpid() or state['file'] == None:
+        return
+
+    try:
+        os.remove(state['file'])
+    except OSError:
+        pass
+
+def loadSnapshots() -> List[dict]:
+    '''
+    현재 프로세스의 지표와 지표 디렉터리에 기록된 실행 중인 다른 프로세스의 지표를 반환합니다.
+
+    종료된 프로세스 (프로세스 ID가 없거나 STALE_AFTER 동안 기록되지 않은 파일)의 지표 파일은 합산하지 않고 삭제하므로,
+    워커가 다시 시작되면 해당 워커의 카운터는 초기화됩니다.
+    '''
+
+    process   = getState()
+    snapshots = [snapshot()]
+    directory = config.application.config['metric_directory']
+
+    if directory == None:
+        return snapshots
+
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+
+        if not name.startswith('metric-') or not name.endswith('.json') or path == process['file']:
+            continue
+
+        try:
+            with open(path) as file:
+                item = json.load(file)
+
+            stale = time.time() - os.stat(path).st_mtime > STALE_AFTER
+        except (OSError, ValueError):
+            continue
+
+        if stale or not isAlive(item['pid']):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+            continue
+
+        snapshots.append(item)
+
+    return snapshots
+
+# --- Prometheus 텍스트 형식 --- #
+
+def escape(value: str) -> str:
+    '''
+    레이블 값을 Prometheus 텍스트 형식에 맞게 이스케이프합니다.
+    '''
+
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def formatLabel(labels: list, extra: dict = {}) -> str:
+    '''
+    레이블 목록을 {key="value", ...} 형식으로 변환합니다.
+    '''
+
+    pairs = [*labels, *extra.items()]
+
+    if not pairs:
+        return ''
+
+    return '{' + ','.join(f'{key}="{escape(str(value))}"' for key, value in pairs) + '}'
+
+def formatNumber(value: float) -> str:
+    '''
+    숫자를 Prometheus 텍스트 형식으로 변환합니다.
+    '''
+
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+
+    return repr(value)
+
+def render() -> str:
+    '''
+    모든 프로세스의 지표를 합쳐 Prometheus 텍스트 형식으로 반환합니다.
+
+    히스토그램과 카운터는 실행 중인 모든 프로세스의 값을 더하며, 게이지는 pid 레이블을 붙여 프로세스별로 노출합니다.
+
+    Returns:
+        text (str): Prometheus 텍스트 형식의 지표
+    '''
+
+    histogram = {}
+    counter   = {}
+    gauges    = {}
+
+    for item in loadSnapshots():
+        for name, label, values in item['histogram']:
+            key = (name, tuple(map(tuple, label)))
+
+            if key in histogram:
+                histogram[key] = [total + value for total, value in zip(histogram[key], values)]
+            else:
+                histogram[key] = values
+
+        for name, label, value in item['counter']:
+            key          = (name, tuple(map(tuple, label)))
+            counter[key] = counter.get(key, 0) + value
+
+        for name, label, value in item['gauge']:
+            gauges.setdefault(name, []).append((label, item['pid'], value))
+
+    lines = []
+
+    for name, (kind, description, buckets) in METRIC.items():
+        if kind == 'histogram':
+            series = sorted((label, values) for (metric, label), values in histogram.items() if metric == name)
+        else:
+            series = sorted((label, value) for (metric, label), value in counter.items() if metric == name)
+
+        if not series:
+            continue
+
+        lines.append(f'# HELP {PREFIX}{name} {description}')
+        lines.append(f'# TYPE {PREFIX}{name} {kind}')
+
+        for label, values in series:
+            if kind == 'counter':
+                lines.append(f'{PREFIX}{name}{formatLabel(label)} {formatNumber(values)}')
+                continue
+
+            cumulative = 0
+
+            for bucket, count in zip([*buckets, '+Inf'], values[:-1]):
+                cumulative += count
+                lines.append(f'{PREFIX}{name}_bucket{formatLabel(label, { "le": bucket })} {cumulative}')
+
+            lines.append(f'{PREFIX}{name}_sum{formatLabel(label)} {formatNumber(values[-1])}')
+            lines.append(f'{PREFIX}{name}_count{formatLabel(label)} {cumulative}')
+
+    # 수집 함수의 누적 값은 METRIC에 없는 카운터로 노출합니다.
+    for name in sorted({ metric for metric, _ in counter if metric not in METRIC }):
+        lines.append(f'# TYPE {PREFIX}{name} counter')
+
+        for (metric, label), value in sorted(counter.items()):
+            if metric == name:
+                lines.append(f'{PREFIX}{name}{formatLabel(label)} {formatNumber(value)}')
+
+    for name in sorted(gauges):
+        lines.append(f'# TYPE {PREFIX}{name} gauge')
+
+        for label, pid, value in sorted(gauges[name], key=lambda gauge: gauge[1]):
+            lines.append(f'{PREFIX}{name}{formatLabel(label, { "pid": pid })} {formatNumber(value)}')
+
+    return '\n'.join(lines) + '\n'
+
+# 종료되는 프로세스의 지표 파일이 남아 다른 프로세스의 합계에 계속 더해지지 않도록 삭제합니다.
+atexit.register(remove)
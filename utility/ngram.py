@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from array     import array
+from bisect    import bisect_right
+from itertools import islice
+from typing    import Iterable, List, Sequence, Tuple
+
+# === 상수 정의 === #
+
+NGRAM_SIZE = 3 # 색인 단위 문자열 길이
+
+# === 클래스 정의 === #
+
+class NgramIndex:
+    '''
+    문자열 부분 일치 검색을 위한 n-gram 역색인입니다.
+
+    ID 오름차순으로 정렬된 (ID, 문자열) 목록을 받아 각 n-gram이 등장하는 위치 목록을 만들고,
+    검색 시에는 가장 짧은 위치 목록만 순회하며 실제 부분 일치 여부를 확인합니다.
+
+    Args:
+        items (Iterable[Tuple[int, str]]): ID 오름차순으로 정렬된 (ID, 문자열) 목록
+    '''
+
+    def __init__(self, items: Iterable[Tuple[int, str]]) -> None:
+        self.ids   = array('q')
+        self.names = []
+
+        postings = {}
+
+        for position, (itemID, name) in enumerate(items):
+            if self.ids and itemID <= self.ids[-1]:
+                raise ValueError('items must be sorted by unique id')
+
+            self.ids.append(itemID)
+            self.names.append(name)
+
+            for gram in self.split(name):
+                if gram not in postings:
+                    postings[gram] = array('I')
+
+                postings[gram].append(position)
+
+        self.postings = postings
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def split(text: str) -> set:
+        '''
+        문자열을 구성하는 n-gram 집합을 반환합니다.
+
+        Args:
+            text (str): 문자열
+
+        Returns:
+            grams (set): n-gram 집합
+        '''
+
+        return { text[index:index + NGRAM_SIZE] for index in range(len(text) - NGRAM_SIZE + 1) }
+
+    def getCandidates(self, keyword: str) -> Sequence[int]:
+        '''
+        keyword를 포함할 수 있는 항목의 위치를 오름차순으로 반환합니다. 실제 부분 일치 여부는 확인하지 않습니다.
+
+        Args:
+            keyword (str): 검색 키워드
+
+        Returns:
+            candidates (Sequence[int]): 후보 위치 목록
+        '''
+
+        # n-gram보다 짧은 키워드는 색인을 사용할 수 없으므로, 전체 목록을 순서대로 확인합니다.
+        if len(keyword) < NGRAM_SIZE:
+            return range(len(self.ids))
+
+        lists = []
+
+        for gram in self.split(keyword):
+            if gram not in self.postings:
+                return []
+
+            lists.append(self.postings[gram])
+
+        return min(lists, key=len)
+
+    def search(self, keyword: str, after: int = None, offset: int = 0, limit: int = None) -> List[int]:
+        '''
+        keyword를 부분 문자열로 포함하는 항목의 ID를 오름차순으로 반환합니다.
+
+        Args:
+            keyword (str): 검색 키워드
+            after (int, opt, default=None): 지정할 경우, 이 값보다 큰 ID만 반환
+            offset (int, opt, default=0): 건너뛸 결과 개수
+            limit (int, opt, default=None): 반환할 최대 결과 개수
+
+        Returns:
+            ids (List[int]): 검색된 ID 목록
+        '''
+
+        start      = 0 if after == None else bisect_right(self.ids, after)
+        candidates = self.getCandidates(keyword)
+        candidates = islice(candidates, bisect_right(candidates, start - 1), None)
+
+        result = []
+
+        for position in candidates:
+            if keyword not in self.names[position]:
+                continue
+
+            if offset > 0:
+                offset -= 1
+                continue
+
+            result.append(self.ids[position])
+
+            if limit != None and len(result) >= limit:
+                break
+
+        return result
+
+    def count(self, keyword: str, limit: int) -> Tuple[int, str]:
+        '''
+        keyword를 부분 문자열로 포함하는 항목의 개수를 계산합니다.
+
+        limit개까지만 정확히 세며, 그보다 많을 경우 limit + 1개를 찾을 때까지 확인한 후보 중 일치한 비율로 전체 후보의 일치 개수를 추정합니다.
+
+        Args:
+            keyword (str): 검색 키워드
+            limit (int): 정확히 셀 최대 개수
+
+        Returns:
+            total (int): 검색 결과 개수
+            method ('exact' | 'estimate'): 계산 방법
+        '''
+
+        candidates = self.getCandidates(keyword)
+        total      = 0
+
+        for scanned, position in enumerate(candidates, 1):
+            if keyword not in self.names[position]:
+                continue
+
+            total += 1
+
+            if total > limit:
+                return max(round(total * len(candidates) / scanned), limit + 1), 'estimate'
+
+        return total, 'exact'
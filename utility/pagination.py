@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+import base64
+import binascii
+import json
+
+# === 함수 정의 === #
+
+def encodeCursor(key: list) -> str:
+    '''
+    마지막으로 반환한 행의 정렬 키를 다음 페이지 조회를 위한 커서 문자열로 변환합니다.
+
+    Args:
+        key (list): 정렬 키 값 목록
+
+    Returns:
+        cursor (str): 커서 문자열
+    '''
+
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(',', ':')).encode()).decode().rstrip('=')
+
+def decodeCursor(cursor: str, size: int) -> list:
+    '''
+    커서 문자열을 정렬 키 값 목록으로 변환합니다.
+
+    Args:
+        cursor (str): 커서 문자열
+        size (int): 정렬 키를 구성하는 컬럼 개수
+
+    Returns:
+        key (list): 정렬 키 값 목록
+
+    Raises:
+        ValueError: 올바르지 않은 커서인 경우
+    '''
+
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as error:
+        raise ValueError(f'invalid cursor: {cursor}') from error
+
+    if not isinstance(key, list) or len(key) != size or not all(type(value) == int for value in key):
+        raise ValueError(f'invalid cursor: {cursor}')
+
+    return key
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) Sangsu Ryu
+
+# === 표준 패키지 임포트 === #
+
+from typing import Callable, Dict
+
+import logging
+import threading
+import time
+
+# === 상수 정의 === #
+
+RETRY_INTERVAL     = 5   # 실패한 작업의 첫 재시도 대기 시간 (초)
+MAX_RETRY_INTERVAL = 300 # 재시도 대기 시간의 최대 값 (초)
+
+# === 전역 변수 정의 === #
+
+logger = logging.getLogger(__name__)
+
+lock = threading.Lock() # 준비 상태 갱신 잠금
+
+state = {
+    'ready': False,
+    'started_at': None,
+    'finished_at': None,
+    'pending': [],
+    'failed': {},
+    'elapsed': {}
+}
+
+# === 함수 정의 === #
+
+def getReadiness() -> dict:
+    '''
+    준비 상태를 반환합니다.
+
+    Returns:
+        readiness (dict): 준비 상태 (모든 준비 작업이 한 번 이상 성공한 경우 ready=True)
+    '''
+
+    with lock:
+        return {
+            'ready': state['ready'],
+            'started_at': state['started_at'],
+            'finished_at': state['finished_at'],
+            'pending': list(state['pending']),
+            'failed': dict(state['failed']),
+            'elapsed': dict(state['elapsed'])
+        }
+
+def runTask(name: str, task: Callable[[], None], retry: bool) -> bool:
+    '''
+    준비 작업 하나를 실행하고 결과를 준비 상태에 기록합니다.
+
+    Args:
+        name (str): 작업 이름
+        task (Callable[[], None]): 작업 함수
+        retry (bool): 실패할 경우 성공할 때까지 재시도할지 여부
+
+    Returns:
+        success (bool): 작업 성공 여부
+    '''
+
+    interval = RETRY_INTERVAL
+
+    while True:
+        start = time.monotonic()
+
+        try:
+            task()
+        except Exception as error:
+            logger.error(f'warm-up task {name} failed: {error}')
+
+            with lock:
+                state['failed'][name] = str(error)
+
+            if not retry:
+                return False
+
+            time.sleep(interval)
+
+            interval = min(interval * 2, MAX_RETRY_INTERVAL)
+            continue
+
+        with lock:
+            state['elapsed'][name] = round(time.monotonic() - start, 3)
+            state['failed'].pop(name, None)
+            state['pending'].remove(name)
+
+        return True
+
+def warmUp(tasks: Dict[str, Callable[[], None]], background: bool = False) -> bool:
+    '''
+    준비 작업을 병렬로 실행합니다.
+
+    background=True일 경우 작업을 백그라운드 스레드에서 실행하고 실패한 작업은 성공할 때까지 재시도하며,
+    False일 경우 모든 작업이 끝날 때까지 대기한 후 결과를 반환합니다.
+
+    Args:
+        tasks (Dict[str, Callable[[], None]]): 작업 이름과 작업 함수
+        background (bool, opt, default=False): 백그라운드 실행 여부
+
+    Returns:
+        success (bool): 모든 작업의 성공 여부 (background=True일 경우 항상 True)
+    '''
+
+    with lock:
+        state['ready']       = False
+        state['started_at']  = time.strftime('%Y-%m-%d %H:%M:%S')
+        state['finished_at'] = None
+        state['pending']     = list(tasks.keys())
+        state['failed']      = {}
+        state['elapsed']     = {}
+
+    def run() -> bool:
+        results = {}
+        threads = []
+
+        # 각 작업은 서로 다른 커넥션을 사용하므로, 작업 개수만큼의 스레드로 동시에 실행합니다.
+        # 재시도 중인 작업이 프로세스 종료를 막지 않도록 데몬 스레드를 사용합니다.
+        for name, task in tasks.items():
+            thread = threading.Thread(
+                target=lambda name=name, task=task: results.__setitem__(name, runTask(name, task, background)),
+                name=f'warmup_{name}',
+                daemon=True
+            )
+            thread.start()
+            threads.append(thread)
+
+        for thread in threads:
+            thread.join()
+
+        success = all(results.get(name, False) for name in tasks)
+
+        with lock:
+            state['ready']       = success
+            state['finished_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+
+        return success
+
+    if not background:
+        return run()
+
+    threading.Thread(target=run, name='warmup', daemon=True).start()
+
+    return True